@@ -0,0 +1,97 @@
+"""Benchmark BVH build, refit and ray queries, checked against brute force.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_bvh --faces 200000 --rays 100000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.bench_subdivide import make_triangle_torus
+from core.bvh import BVH, _moller_trumbore
+
+
+def make_rays(vertices, triangles, count, rng):
+    """Rays from outside the mesh, half aimed near random triangles
+
+    The other half aim just past a triangle's corner, in its plane, so they
+    enter the leaf box of that triangle without hitting it.
+    """
+    corners = vertices[triangles[rng.integers(len(triangles), size=count)]]
+    centroids = corners.mean(axis=1)
+    targets = centroids.copy()
+    past = np.arange(count) % 2 == 1
+    targets[past] = corners[past, 0] + 0.5 * (corners[past, 0] - centroids[past])
+
+    origins = rng.normal(size=(count, 3))
+    origins *= 5.0 / np.linalg.norm(origins, axis=1, keepdims=True)
+    return origins, targets - origins
+
+
+def brute_force(vertices, triangles, origins, directions):
+    """Nearest hit distance of every ray against every triangle"""
+    corners = vertices[triangles]
+    best = np.full(len(origins), np.inf)
+    for i in range(len(origins)):
+        t = _moller_trumbore(np.broadcast_to(origins[i], (len(corners), 3)),
+                             np.broadcast_to(directions[i], (len(corners), 3)), corners)
+        best[i] = t[t >= 0].min(initial=np.inf)
+    return best
+
+
+def check(bvh, vertices, triangles, origins, directions):
+    """Assert BVH hits match brute force; misses must report (inf, -1)"""
+    t, triangle = bvh.intersect(origins, directions)
+    expected = brute_force(vertices, triangles, origins, directions)
+    assert np.array_equal(np.isfinite(expected), triangle >= 0)
+    assert np.allclose(t, expected)
+    return int(np.count_nonzero(triangle < 0))
+
+
+def run(face_count, ray_count, check_count):
+    rng = np.random.default_rng(0)
+
+    # A ray past the corner of a single triangle enters its box but misses
+    single = BVH(np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0]]), [[0, 1, 2]])
+    t, triangle = single.intersect([[0.9, 0.9, -1.0]], [[0.0, 0.0, 1.0]])
+    assert np.isinf(t[0]) and triangle[0] == -1
+
+    mesh = make_triangle_torus(face_count)
+    vertices = mesh.vertices
+    triangles, _ = mesh.faces.triangulate()
+
+    start = time.perf_counter()
+    bvh = BVH(vertices, triangles)
+    build = time.perf_counter() - start
+
+    moved = vertices * 1.01
+    start = time.perf_counter()
+    bvh.refit(moved)
+    refit = time.perf_counter() - start
+
+    origins, directions = make_rays(moved, triangles, ray_count, rng)
+    start = time.perf_counter()
+    bvh.intersect(origins, directions)
+    query = time.perf_counter() - start
+
+    misses = check(bvh, moved, triangles, origins[:check_count], directions[:check_count])
+
+    print(f"{'triangles':>10} {'build s':>9} {'refit s':>9} {'rays':>8} {'query s':>9} {'us/ray':>8}")
+    print(f"{len(triangles):>10} {build:>9.3f} {refit:>9.3f} {ray_count:>8} {query:>9.3f} "
+          f"{query / max(ray_count, 1) * 1e6:>8.2f}")
+    print(f"checked {min(check_count, ray_count)} rays against brute force ({misses} misses)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--faces", type=int, default=200000, help="Triangles in the test torus.")
+    parser.add_argument("--rays", type=int, default=100000, help="Rays per query batch.")
+    parser.add_argument("--check", type=int, default=200, help="Rays checked against brute force.")
+    args = parser.parse_args(argv)
+    run(args.faces, args.rays, args.check)
+
+
+if __name__ == "__main__":
+    main()
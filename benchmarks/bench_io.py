@@ -0,0 +1,113 @@
+"""Benchmark mesh import and export throughput.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_io --faces 2000000
+    python -m benchmarks.bench_io --faces 200000 --batch 16
+
+A synthetic quad torus is written to a temporary directory in each format
+first, then imported back and timed, followed by the exporters.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.bench_subdivide import make_quad_torus
+from core.io.mesh_io import MeshIO
+
+
+def write_obj(mesh, filename):
+    """Write a quad mesh as OBJ with np.savetxt (reference writer)"""
+    with open(filename, "wb") as f:
+        np.savetxt(f, mesh.vertices, fmt="v %.6f %.6f %.6f")
+        np.savetxt(f, mesh.faces.array + 1, fmt="f %d %d %d %d")
+
+
+def time_import(label, func, path, repeat):
+    """Print the best import time of a file"""
+    size_mb = os.path.getsize(path) / (1 << 20)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        loaded = func(path)
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:>8} {size_mb:>8.1f} {len(loaded.vertices):>10} {len(loaded.faces):>10} "
+          f"{best:>9.2f} {size_mb / best:>8.1f}")
+    return loaded
+
+
+def time_batch(paths, repeat):
+    """Print serial vs. process pool import time for a list of files"""
+    total_mb = sum(os.path.getsize(path) for path in paths) / (1 << 20)
+    for label, func in (("serial", lambda: [MeshIO.import_file(path) for path in paths]),
+                        ("batch", lambda: MeshIO.import_batch(paths))):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        print(f"{label:>8} {total_mb:>8.1f} {len(paths):>10} {'files':>10} {best:>9.2f} {total_mb / best:>8.1f}")
+
+
+def run(face_count, repeat, directory, batch_files=0):
+    # Indented records and trailing comments are read like plain records
+    small_path = os.path.join(directory, "small.obj")
+    with open(small_path, "w") as f:
+        f.write("v 0 0 0\n  v 1 0 0 # x\n\tv 1 1 0\nv 0 1 0#\n  f 1/1 2/1 3/1 4/1 # quad/1\n")
+    small = MeshIO.import_obj(small_path)
+    assert np.array_equal(small.vertices, [[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0]])
+    assert np.array_equal(small.faces.array, [[0, 1, 2, 3]])
+
+    mesh = make_quad_torus(face_count)
+    obj_path = os.path.join(directory, "bench.obj")
+    stl_path = os.path.join(directory, "bench.stl")
+    meshbin_path = os.path.join(directory, "bench.meshbin")
+    write_obj(mesh, obj_path)
+    MeshIO.export_stl(mesh, stl_path)
+    MeshIO.export_meshbin(mesh, meshbin_path)
+
+    print(f"{'format':>8} {'MB':>8} {'vertices':>10} {'faces':>10} {'seconds':>9} {'MB/s':>8}")
+    loaded = time_import("obj", MeshIO.import_obj, obj_path, repeat)
+    assert np.array_equal(loaded.faces.array, mesh.faces.array)
+    loaded = time_import("stl", MeshIO.import_stl, stl_path, repeat)
+    assert len(loaded.vertices) == len(mesh.vertices)
+    # Opening maps the file; summing touches every vertex page once
+    loaded = time_import("meshbin", lambda path: _touch(MeshIO.import_meshbin(path)), meshbin_path, repeat)
+    assert loaded.faces == mesh.faces
+
+    print()
+    print(f"{'export':>8} {'MB':>8} {'seconds':>9} {'MB/s':>8}")
+    for extension in ("obj", "ply", "stl", "meshbin"):
+        path = os.path.join(directory, f"export.{extension}")
+        start = time.perf_counter()
+        MeshIO.export_file(mesh, path)
+        seconds = time.perf_counter() - start
+        size_mb = os.path.getsize(path) / (1 << 20)
+        print(f"{extension:>8} {size_mb:>8.1f} {seconds:>9.2f} {size_mb / seconds:>8.1f}")
+
+    if batch_files:
+        paths = [obj_path] * batch_files
+        time_batch(paths, repeat)
+
+
+def _touch(mesh):
+    mesh.vertices.sum()
+    return mesh
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--faces", type=int, default=2000000, help="Faces in the test mesh.")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per format (best is reported).")
+    parser.add_argument("--batch", type=int, default=0,
+                        help="Also import this many OBJ files serially and with MeshIO.import_batch.")
+    args = parser.parse_args(argv)
+    with tempfile.TemporaryDirectory() as directory:
+        run(args.faces, args.repeat, directory, args.batch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Benchmark the polygon and z-buffer desktop render backends.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_raster --triangles 10000 100000 1000000
+
+Rendering happens on an offscreen surface, so no window is opened.
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from core.engine import Engine
+from core.mesh import Mesh
+from ui.desktop.desktop_renderer import DesktopRenderer
+
+
+def make_triangle_sphere(triangle_count):
+    """Create a closed triangulated sphere with roughly triangle_count faces"""
+    rings = max(2, int(np.sqrt(triangle_count / 4)))
+    segments = max(3, triangle_count // (2 * rings))
+
+    # Ring vertices plus the two poles
+    phi = np.pi * np.arange(1, rings + 1) / (rings + 1)
+    theta = 2 * np.pi * np.arange(segments) / segments
+    phi, theta = np.meshgrid(phi, theta, indexing="ij")
+    ring_vertices = np.stack([np.sin(phi) * np.cos(theta), np.cos(phi), np.sin(phi) * np.sin(theta)], axis=-1)
+    vertices = np.vstack([[0, 1, 0], ring_vertices.reshape(-1, 3), [0, -1, 0]])
+
+    grid = 1 + np.arange(rings * segments).reshape(rings, segments)
+    right = np.roll(grid, -1, axis=1)
+    top_cap = np.stack([np.zeros(segments, dtype=int), grid[0], right[0]], axis=1)
+    bottom = len(vertices) - 1
+    bottom_cap = np.stack([np.full(segments, bottom), right[-1], grid[-1]], axis=1)
+    quads_a = np.stack([grid[:-1], right[:-1], right[1:]], axis=-1).reshape(-1, 3)
+    quads_b = np.stack([grid[:-1], right[1:], grid[1:]], axis=-1).reshape(-1, 3)
+
+    mesh = Mesh("Sphere")
+    mesh.vertices = vertices
+    mesh.faces = np.vstack([top_cap, quads_a, quads_b, bottom_cap])
+    return mesh
+
+
+def time_call(func, repeat):
+    """Return the best wall time of several calls, in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000.0
+
+
+def run(sizes, backends, repeat, show_vertices):
+    pygame.init()
+    pygame.display.set_mode((800, 600))
+
+    engine = Engine()
+    engine.initialize()
+    for obj in list(engine.scene.root.children):
+        if isinstance(obj, Mesh):
+            engine.scene.remove_object(obj)
+
+    renderer = DesktopRenderer(engine.scene)
+    renderer.scale = 2
+    renderer.show_vertices = show_vertices
+    renderer.set_standard_view("home")
+    camera = engine.scene.active_camera
+
+    print(f"{'triangles':>10} " + " ".join(f"{name + ' ms':>12}" for name in backends))
+    for size in sizes:
+        mesh = make_triangle_sphere(size)
+        engine.scene.add_object(mesh)
+
+        timings = []
+        for backend in backends:
+            renderer.render_backend = backend
+            timings.append(time_call(lambda: renderer.render(camera), repeat))
+
+        print(f"{len(mesh.faces):>10} " + " ".join(f"{ms:>12.1f}" for ms in timings))
+        engine.scene.remove_object(mesh)
+
+    pygame.quit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--triangles", type=int, nargs="+", default=[10000, 100000, 1000000],
+                        help="Triangle counts to benchmark.")
+    parser.add_argument("--backends", nargs="+", default=["polygon", "zbuffer"],
+                        help="Render backends to compare.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size (best is reported).")
+    parser.add_argument("--vertices", action="store_true", help="Also draw vertex dots.")
+    args = parser.parse_args(argv)
+    run(args.triangles, args.backends, args.repeat, args.vertices)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Benchmark desktop viewport frame time against mesh vertex count.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_render --sizes 1000 10000 50000 200000
+
+Rendering happens on an offscreen surface, so no window is opened.
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from core.engine import Engine
+from core.mesh import Mesh
+from ui.desktop.desktop_renderer import DesktopRenderer
+
+
+def make_sphere(vertex_count):
+    """Create a UV sphere with roughly the requested number of vertices"""
+    rings = max(2, int(np.sqrt(vertex_count / 2)))
+    segments = max(3, (vertex_count - 2) // rings)
+    mesh = Mesh("Sphere")
+    mesh._create_sphere(2.0, segments=segments, rings=rings)
+    return mesh
+
+
+def time_call(func, repeat):
+    """Return the best wall time of several calls, in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000.0
+
+
+def run(sizes, repeat):
+    pygame.init()
+    pygame.display.set_mode((800, 600))
+
+    engine = Engine()
+    engine.initialize()
+    renderer = DesktopRenderer(engine.scene)
+    renderer.scale = 100
+    renderer.set_standard_view("home")
+
+    # Replace the default cube with the benchmark mesh
+    for obj in list(engine.scene.root.children):
+        if isinstance(obj, Mesh):
+            engine.scene.remove_object(obj)
+
+    print(f"{'vertices':>10} {'faces':>10} {'project ms':>12} {'frame ms':>10} {'fps':>8}")
+    for size in sizes:
+        mesh = make_sphere(size)
+        engine.scene.add_object(mesh)
+
+        project_ms = time_call(
+            lambda: renderer._project_vertices(renderer._transform_vertices(mesh)), repeat)
+        frame_ms = time_call(lambda: renderer.render(engine.scene.active_camera), repeat)
+
+        print(f"{len(mesh.vertices):>10} {len(mesh.faces):>10} {project_ms:>12.2f} "
+              f"{frame_ms:>10.1f} {1000.0 / frame_ms:>8.1f}")
+        engine.scene.remove_object(mesh)
+
+    pygame.quit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000, 200000],
+                        help="Vertex counts to benchmark.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size (best is reported).")
+    args = parser.parse_args(argv)
+    run(args.sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
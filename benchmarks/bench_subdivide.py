@@ -0,0 +1,70 @@
+"""Benchmark Catmull-Clark and Loop subdivision.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_subdivide --faces 50000 --level 3
+"""
+import argparse
+import time
+
+import numpy as np
+
+from core.mesh import Mesh
+from core.mesh_operations import subdivide
+
+
+def make_quad_torus(face_count):
+    """Create a closed quad torus with roughly face_count faces"""
+    rings = max(3, int(np.sqrt(face_count / 2)))
+    segments = max(3, face_count // rings)
+
+    u = 2 * np.pi * np.arange(rings) / rings
+    v = 2 * np.pi * np.arange(segments) / segments
+    u, v = np.meshgrid(u, v, indexing="ij")
+    radius = 1.0 + 0.3 * np.cos(v)
+    vertices = np.stack([radius * np.cos(u), 0.3 * np.sin(v), radius * np.sin(u)], axis=-1)
+
+    grid = np.arange(rings * segments).reshape(rings, segments)
+    right = np.roll(grid, -1, axis=1)
+    down = np.roll(grid, -1, axis=0)
+    down_right = np.roll(right, -1, axis=0)
+
+    mesh = Mesh("Torus")
+    mesh.vertices = vertices.reshape(-1, 3)
+    mesh.faces = np.stack([grid, right, down_right, down], axis=-1).reshape(-1, 4)
+    return mesh
+
+
+def make_triangle_torus(face_count):
+    """Create a closed triangle torus with roughly face_count faces"""
+    mesh = make_quad_torus(face_count // 2)
+    quads = mesh.faces.array
+    mesh.faces = np.concatenate([quads[:, [0, 1, 2]], quads[:, [0, 2, 3]]])
+    mesh.name = "Triangle Torus"
+    return mesh
+
+
+def run(face_count, level, repeat):
+    print(f"{'scheme':>14} {'faces in':>10} {'faces out':>12} {'vertices out':>14} {'seconds':>9}")
+    for scheme, factory in (("catmull-clark", make_quad_torus), ("loop", make_triangle_torus)):
+        best = float("inf")
+        for _ in range(repeat):
+            mesh = factory(face_count)
+            faces_in = len(mesh.faces)
+            start = time.perf_counter()
+            subdivide(mesh, level)
+            best = min(best, time.perf_counter() - start)
+        print(f"{scheme:>14} {faces_in:>10} {len(mesh.faces):>12} {len(mesh.vertices):>14} {best:>9.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--faces", type=int, default=50000, help="Faces in the input mesh.")
+    parser.add_argument("--level", type=int, default=3, help="Subdivision levels.")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per scheme (best is reported).")
+    args = parser.parse_args(argv)
+    run(args.faces, args.level, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
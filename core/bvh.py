@@ -0,0 +1,180 @@
+
+import numpy as np
+
+DEFAULT_LEAF_SIZE = 8  # Triangles per leaf
+
+
+class BVH:
+    """Bounding volume hierarchy over the triangles of a mesh
+
+    Built as a linear BVH: triangles are sorted along a Morton curve of
+    their centroids and split into leaves of ``leaf_size`` consecutive
+    triangles, so every internal node splits its range at the median. The
+    tree is a complete binary tree stored in flat heap order (node ``i``
+    has children ``2i + 1`` and ``2i + 2``), with the leaf count padded to
+    a power of two by empty leaves, so no child pointers are needed.
+
+    Building is a sort plus vectorized reductions. After the vertices
+    move, refit recomputes the boxes in O(T) without re-sorting.
+    """
+
+    def __init__(self, vertices, triangles, triangle_faces=None, leaf_size=DEFAULT_LEAF_SIZE):
+        vertices = np.asarray(vertices, dtype=float).reshape(-1, 3)
+        self.triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+        self.triangle_faces = (np.arange(len(self.triangles)) if triangle_faces is None
+                               else np.asarray(triangle_faces))
+        self.leaf_size = leaf_size
+
+        count = len(self.triangles)
+        leaves = max(1, -(-count // leaf_size))
+        self.depth = int(np.ceil(np.log2(leaves)))
+        self.leaf_count = 1 << self.depth
+        self.node_min = np.empty((2 * self.leaf_count - 1, 3))
+        self.node_max = np.empty((2 * self.leaf_count - 1, 3))
+
+        # Triangles in leaf order
+        if count > 0:
+            centroids = vertices[self.triangles].mean(axis=1)
+            self.order = np.argsort(_morton_codes(centroids), kind="stable")
+        else:
+            self.order = np.zeros(0, dtype=np.int64)
+        self._sorted_triangles = self.triangles[self.order]
+        self.refit(vertices)
+
+    @classmethod
+    def from_mesh(cls, mesh, leaf_size=DEFAULT_LEAF_SIZE):
+        """Build over the fan-triangulated faces of a mesh"""
+        triangles, triangle_faces = mesh.faces.triangulate()
+        return cls(mesh.vertices, triangles, triangle_faces, leaf_size)
+
+    @property
+    def nbytes(self):
+        """Memory used by the node and triangle arrays, in bytes"""
+        arrays = (self.triangles, self.triangle_faces, self.order, self._sorted_triangles,
+                  self.node_min, self.node_max)
+        return sum(array.nbytes for array in arrays)
+
+    def refit(self, vertices):
+        """Recompute all boxes for new vertex positions (same triangles)"""
+        self.vertices = np.asarray(vertices, dtype=float).reshape(-1, 3)
+        first_leaf = self.leaf_count - 1
+        self.node_min[first_leaf:] = np.inf
+        self.node_max[first_leaf:] = -np.inf
+
+        count = len(self._sorted_triangles)
+        if count > 0:
+            corners = self.vertices[self._sorted_triangles]
+            starts = np.arange(0, count, self.leaf_size)
+            used = first_leaf + len(starts)
+            self.node_min[first_leaf:used] = np.minimum.reduceat(corners.min(axis=1), starts)
+            self.node_max[first_leaf:used] = np.maximum.reduceat(corners.max(axis=1), starts)
+
+        # The children of heap nodes [start, stop) are [2 start + 1, 2 stop + 1)
+        for level in range(self.depth - 1, -1, -1):
+            start, stop = (1 << level) - 1, (1 << (level + 1)) - 1
+            np.minimum(self.node_min[2 * start + 1:2 * stop + 1:2], self.node_min[2 * start + 2:2 * stop + 2:2],
+                       out=self.node_min[start:stop])
+            np.maximum(self.node_max[2 * start + 1:2 * stop + 1:2], self.node_max[2 * start + 2:2 * stop + 2:2],
+                       out=self.node_max[start:stop])
+
+        # Padding leaves (and nodes over them only) have inverted boxes,
+        # which the slab test alone would report as hit
+        self._nonempty = self.node_min[:, 0] <= self.node_max[:, 0]
+
+    def intersect(self, origins, directions, t_min=0.0, t_max=np.inf):
+        """Find the nearest triangle hit by each of R rays
+
+        Rays are ``origins + t * directions`` for ``t_min <= t <= t_max``.
+        All rays walk the tree together, one level at a time, keeping only
+        the (ray, node) pairs whose box the ray enters; the triangles of the
+        leaves reached are tested with Moller-Trumbore (two sided).
+
+        Returns an (R,) array of hit distances (inf for a miss) and an (R,)
+        array of triangle indices into ``triangles`` (-1 for a miss).
+        """
+        origins = np.asarray(origins, dtype=float).reshape(-1, 3)
+        directions = np.asarray(directions, dtype=float).reshape(-1, 3)
+        ray_count = len(origins)
+        best_t = np.full(ray_count, np.inf)
+        best_triangle = np.full(ray_count, -1, dtype=np.int64)
+        if len(self._sorted_triangles) == 0 or ray_count == 0:
+            return best_t, best_triangle
+
+        with np.errstate(divide="ignore"):
+            inverse = 1.0 / directions
+
+        rays = np.arange(ray_count)
+        nodes = np.zeros(ray_count, dtype=np.int64)
+        for level in range(self.depth + 1):
+            # Slab test; fmin/fmax skip the NaNs of 0 * inf for rays
+            # parallel to a box face
+            with np.errstate(invalid="ignore"):
+                low = (self.node_min[nodes] - origins[rays]) * inverse[rays]
+                high = (self.node_max[nodes] - origins[rays]) * inverse[rays]
+            enter = np.fmax.reduce(np.fmin(low, high), axis=1)
+            leave = np.fmin.reduce(np.fmax(low, high), axis=1)
+            hit = (enter <= leave) & (leave >= t_min) & (enter <= t_max) & self._nonempty[nodes]
+            rays, nodes = rays[hit], nodes[hit]
+            if level < self.depth:
+                rays = np.repeat(rays, 2)
+                nodes = (2 * nodes[:, None] + np.array([1, 2])).ravel()
+
+        # Expand the leaves reached into (ray, sorted triangle) pairs
+        slots = (nodes - (self.leaf_count - 1))[:, None] * self.leaf_size + np.arange(self.leaf_size)
+        rays = np.repeat(rays, self.leaf_size)
+        slots = slots.ravel()
+        valid = slots < len(self._sorted_triangles)
+        rays, slots = rays[valid], slots[valid]
+
+        t = _moller_trumbore(origins[rays], directions[rays], self.vertices[self._sorted_triangles[slots]])
+        # Moller-Trumbore reports a miss as inf, which t_max = inf allows
+        hit = np.isfinite(t) & (t >= t_min) & (t <= t_max)
+        rays, slots, t = rays[hit], slots[hit], t[hit]
+        if len(rays) == 0:
+            return best_t, best_triangle
+
+        # Nearest hit per ray: sort by ray, then distance, take the first
+        order = np.lexsort((t, rays))
+        rays, slots, t = rays[order], slots[order], t[order]
+        first = np.ones(len(rays), dtype=bool)
+        first[1:] = rays[1:] != rays[:-1]
+        best_t[rays[first]] = t[first]
+        best_triangle[rays[first]] = self.order[slots[first]]
+        return best_t, best_triangle
+
+
+def _moller_trumbore(origins, directions, corners, epsilon=1e-12):
+    """Ray/triangle distances for matching rows of rays and (K, 3, 3) corners
+
+    Returns the distance along each ray, or inf where it misses.
+    """
+    v0 = corners[:, 0]
+    edge1 = corners[:, 1] - v0
+    edge2 = corners[:, 2] - v0
+    p = np.cross(directions, edge2)
+    det = np.einsum("ij,ij->i", edge1, p)
+    parallel = np.abs(det) < epsilon
+    inverse_det = 1.0 / np.where(parallel, 1.0, det)
+
+    s = origins - v0
+    u = np.einsum("ij,ij->i", s, p) * inverse_det
+    q = np.cross(s, edge1)
+    v = np.einsum("ij,ij->i", directions, q) * inverse_det
+    t = np.einsum("ij,ij->i", edge2, q) * inverse_det
+
+    inside = ~parallel & (u >= 0) & (v >= 0) & (u + v <= 1)
+    return np.where(inside, t, np.inf)
+
+
+def _morton_codes(points):
+    """30-bit Morton codes of points quantized to a 1024^3 grid over their bounds"""
+    low = points.min(axis=0)
+    extent = np.maximum(points.max(axis=0) - low, 1e-30)
+    cells = np.minimum((points - low) / extent * 1024, 1023).astype(np.int64)
+
+    # Spread the 10 bits of each coordinate to every third bit
+    cells = (cells | (cells << 16)) & 0x030000FF
+    cells = (cells | (cells << 8)) & 0x0300F00F
+    cells = (cells | (cells << 4)) & 0x030C30C3
+    cells = (cells | (cells << 2)) & 0x09249249
+    return (cells[:, 0] << 2) | (cells[:, 1] << 1) | cells[:, 2]
@@ -1,3 +1,7 @@
+import numpy as np
+from core.mesh_operations import bevel_edges, extrude_faces
+
+
 class Command:
     def execute(self):
         pass
@@ -10,12 +14,14 @@ class CommandManager:
     def __init__(self):
         self.history = []
         self.future = []
+        self.version = 0  # Bumped on every execute/undo/redo
 
     def execute(self, command):
         """Execute a command and add to history"""
         command.execute()
         self.history.append(command)
         self.future.clear()
+        self.version += 1
 
     def undo(self):
         """Undo the last command"""
@@ -23,6 +29,7 @@ class CommandManager:
             command = self.history.pop()
             command.undo()
             self.future.append(command)
+            self.version += 1
             return True
         return False
 
@@ -32,6 +39,7 @@ class CommandManager:
             command = self.future.pop()
             command.execute()
             self.history.append(command)
+            self.version += 1
             return True
         return False
 
@@ -45,28 +53,97 @@ class MoveVertexCommand(Command):
 
     def execute(self):
         self.mesh.vertices[self.vertex_idx] = self.new_pos
+        self.mesh.mark_vertices_changed()
 
     def undo(self):
         self.mesh.vertices[self.vertex_idx] = self.old_pos
+        self.mesh.mark_vertices_changed()
 
 
 class MoveVerticesCommand(Command):
-    """Command to move multiple vertices"""
+    """Command to move multiple vertices
 
-    def __init__(self, mesh, old_positions, new_positions):
+    Stores the moved vertex indices with their (K, 3) positions before and
+    after the move, so a whole drag is one command of three arrays.
+    """
+
+    def __init__(self, mesh, indices, old_positions, new_positions):
         self.mesh = mesh
-        self.old_positions = old_positions  # Dictionary of {vertex_idx: old_pos}
-        self.new_positions = new_positions  # Dictionary of {vertex_idx: new_pos}
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.old_positions = np.array(old_positions, dtype=float)
+        self.new_positions = np.array(new_positions, dtype=float)
 
     def execute(self):
         """Apply the new positions"""
-        for idx, pos in self.new_positions.items():
-            self.mesh.vertices[idx] = pos.copy()
+        self.mesh.vertices[self.indices] = self.new_positions
+        self.mesh.mark_vertices_changed()
 
     def undo(self):
         """Restore the old positions"""
-        for idx, pos in self.old_positions.items():
-            self.mesh.vertices[idx] = pos.copy()
+        self.mesh.vertices[self.indices] = self.old_positions
+        self.mesh.mark_vertices_changed()
+
+
+class MeshGeometryCommand(Command):
+    """Base for commands that rebuild a mesh's vertices and faces
+
+    The first execute runs the operation and keeps the geometry from before
+    and after it, so undo and redo just swap the arrays back in.
+    """
+
+    def __init__(self, mesh):
+        self.mesh = mesh
+        self.before = None
+        self.after = None
+
+    def apply(self):
+        """Run the operation on self.mesh"""
+        pass
+
+    def execute(self):
+        if self.after is None:
+            self.before = self._snapshot()
+            self.apply()
+            self.after = self._snapshot()
+        else:
+            self._restore(self.after)
+
+    def undo(self):
+        self._restore(self.before)
+
+    def _snapshot(self):
+        mesh = self.mesh
+        return np.array(mesh.vertices, dtype=float), mesh.faces.copy(), mesh.edges.copy()
+
+    def _restore(self, snapshot):
+        vertices, faces, edges = snapshot
+        self.mesh.vertices = vertices.copy()
+        self.mesh.faces = faces
+        self.mesh.edges = edges
+
+
+class ExtrudeFacesCommand(MeshGeometryCommand):
+    """Command to extrude a selection of faces"""
+
+    def __init__(self, mesh, face_indices, amount):
+        super().__init__(mesh)
+        self.face_indices = np.array(face_indices, dtype=np.int64)
+        self.amount = amount
+
+    def apply(self):
+        extrude_faces(self.mesh, self.face_indices, self.amount)
+
+
+class BevelEdgesCommand(MeshGeometryCommand):
+    """Command to bevel a selection of edges"""
+
+    def __init__(self, mesh, edge_indices, amount):
+        super().__init__(mesh)
+        self.edge_indices = np.array(edge_indices, dtype=np.int64)
+        self.amount = amount
+
+    def apply(self):
+        bevel_edges(self.mesh, self.edge_indices, self.amount)
 
 
 class ScaleObjectCommand(Command):
@@ -10,7 +10,11 @@ class Engine:
         self.scene = Scene()
         self.command_manager = CommandManager()
         self.settings = Settings()
-        self.resource_manager = ResourceManager()
+        self.resource_manager = ResourceManager(
+            cache_dir=self.settings.resource_settings["cache_dir"],
+            cache_imports=self.settings.resource_settings["cache_imports"],
+            memory_budget=self.settings.resource_settings["memory_budget"],
+            loader_threads=self.settings.resource_settings["loader_threads"])
 
     def initialize(self):
         """Initialize the engine with default objects"""
@@ -0,0 +1,196 @@
+
+import numpy as np
+
+
+class FaceArray:
+    """Compact storage for mesh faces or edges
+
+    Pure triangle or quad meshes (any single polygon size) are stored as an
+    (F, k) int32 array. Mixed polygons are stored in CSR form: ``indices``
+    holds the vertex indices of all faces back to back and ``offsets`` holds
+    F + 1 positions into it, so face ``i`` is
+    ``indices[offsets[i]:offsets[i + 1]]``.
+
+    The object also behaves like the old list of tuples (len, indexing and
+    iteration yield tuples of ints) so existing code keeps working.
+    """
+
+    def __init__(self, faces=(), width=3):
+        self._array = None
+        self._offsets = None
+        self._indices = None
+
+        if isinstance(faces, FaceArray):
+            self._array = faces._array
+            self._offsets = faces._offsets
+            self._indices = faces._indices
+            return
+
+        if isinstance(faces, np.ndarray) and faces.ndim == 2:
+            self._array = np.ascontiguousarray(faces, dtype=np.int32)
+            return
+
+        faces = [tuple(face) for face in faces]
+        sizes = {len(face) for face in faces}
+        if len(sizes) <= 1:
+            width = sizes.pop() if sizes else width
+            self._array = np.array(faces, dtype=np.int32).reshape(-1, width)
+        else:
+            lengths = np.fromiter((len(face) for face in faces), dtype=np.int64, count=len(faces))
+            self._offsets = np.zeros(len(faces) + 1, dtype=np.int64)
+            np.cumsum(lengths, out=self._offsets[1:])
+            self._indices = np.fromiter(
+                (index for face in faces for index in face), dtype=np.int32, count=int(self._offsets[-1]))
+
+    @classmethod
+    def from_csr(cls, offsets, indices):
+        """Create from CSR arrays, using fixed-width storage when possible"""
+        offsets = np.asarray(offsets, dtype=np.int64)
+        indices = np.asarray(indices, dtype=np.int32)
+        result = cls()
+        sizes = np.diff(offsets)
+        if len(sizes) == 0:
+            return result
+        if np.all(sizes == sizes[0]) and offsets[0] == 0:
+            result._array = indices[:offsets[-1]].reshape(-1, int(sizes[0]))
+        else:
+            result._array = None
+            result._offsets = offsets
+            result._indices = indices
+        return result
+
+    # ------------------------------------------------------------------
+    # Array access
+    # ------------------------------------------------------------------
+    @property
+    def array(self):
+        """The (F, k) int32 array, or None if faces have mixed sizes"""
+        return self._array
+
+    @property
+    def arity(self):
+        """Number of vertices per face, or None if faces have mixed sizes"""
+        return None if self._array is None else self._array.shape[1]
+
+    @property
+    def offsets(self):
+        """CSR offsets, an (F + 1,) int64 array"""
+        if self._array is not None:
+            count, width = self._array.shape
+            return np.arange(count + 1, dtype=np.int64) * width
+        return self._offsets
+
+    @property
+    def indices(self):
+        """CSR vertex indices of all faces back to back, an int32 array"""
+        if self._array is not None:
+            return self._array.reshape(-1)
+        return self._indices
+
+    @property
+    def sizes(self):
+        """Number of vertices in each face"""
+        if self._array is not None:
+            count, width = self._array.shape
+            return np.full(count, width, dtype=np.int64)
+        return np.diff(self._offsets)
+
+    @property
+    def corner_faces(self):
+        """Face index of every entry in ``indices``"""
+        if self._array is not None:
+            count, width = self._array.shape
+            return np.repeat(np.arange(count, dtype=np.int32), width)
+        return np.repeat(np.arange(len(self), dtype=np.int32), self.sizes)
+
+    @property
+    def next_corners(self):
+        """Position in ``indices`` of the next corner within the same face"""
+        offsets = self.offsets
+        corners = np.arange(offsets[-1], dtype=np.int64) + 1
+        # The last corner of every face wraps around to the first one
+        corners[offsets[1:] - 1] = offsets[:-1]
+        return corners
+
+    @property
+    def nbytes(self):
+        """Memory used by the index arrays, in bytes"""
+        if self._array is not None:
+            return self._array.nbytes
+        return self._offsets.nbytes + self._indices.nbytes
+
+    def triangulate(self):
+        """Fan-triangulate all faces
+
+        Returns a (T, 3) int32 array of triangles and a (T,) array with the
+        index of the face each triangle came from.
+        """
+        if self.arity == 3:
+            return self._array, np.arange(len(self), dtype=np.int32)
+
+        offsets = self.offsets
+        indices = self.indices
+        sizes = self.sizes
+        tri_counts = np.maximum(sizes - 2, 0)
+        tri_faces = np.repeat(np.arange(len(self), dtype=np.int32), tri_counts)
+
+        # Position of each triangle within its face's fan (0, 1, ...)
+        tri_starts = np.zeros(len(self) + 1, dtype=np.int64)
+        np.cumsum(tri_counts, out=tri_starts[1:])
+        fan = np.arange(tri_starts[-1], dtype=np.int64) - tri_starts[tri_faces]
+
+        first = offsets[tri_faces]
+        triangles = np.empty((len(tri_faces), 3), dtype=np.int32)
+        triangles[:, 0] = indices[first]
+        triangles[:, 1] = indices[first + fan + 1]
+        triangles[:, 2] = indices[first + fan + 2]
+        return triangles, tri_faces
+
+    def copy(self):
+        """Create a copy with its own index arrays"""
+        if self._array is not None:
+            return FaceArray(self._array.copy())
+        return FaceArray.from_csr(self._offsets.copy(), self._indices.copy())
+
+    def tolist(self):
+        """Convert to a list of vertex index lists"""
+        if self._array is not None:
+            return self._array.tolist()
+        indices = self._indices.tolist()
+        bounds = self._offsets.tolist()
+        return [indices[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+    # ------------------------------------------------------------------
+    # List-of-tuples compatibility
+    # ------------------------------------------------------------------
+    def __len__(self):
+        if self._array is not None:
+            return self._array.shape[0]
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("face index out of range")
+        if self._array is not None:
+            return tuple(self._array[index].tolist())
+        return tuple(self._indices[self._offsets[index]:self._offsets[index + 1]].tolist())
+
+    def __iter__(self):
+        return iter([tuple(face) for face in self.tolist()])
+
+    def __eq__(self, other):
+        if isinstance(other, FaceArray):
+            return (np.array_equal(self.offsets, other.offsets)
+                    and np.array_equal(self.indices, other.indices))
+        if isinstance(other, (list, tuple)):
+            return [tuple(face) for face in self.tolist()] == [tuple(face) for face in other]
+        return NotImplemented
+
+    def __repr__(self):
+        if self._array is not None:
+            return f"FaceArray({len(self)} x {self.arity})"
+        return f"FaceArray({len(self)} mixed, {len(self._indices)} indices)"
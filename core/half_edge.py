@@ -0,0 +1,242 @@
+
+import numpy as np
+from core.face_array import FaceArray
+
+
+class HalfEdgeMesh:
+    """Array-backed half-edge topology
+
+    Every face corner becomes a half-edge. Half-edge ``h`` runs from
+    ``vertex[h]`` to ``vertex[next[h]]`` along the border of ``face[h]``, and
+    ``twin[h]`` is the half-edge running the other way in the neighboring
+    face (-1 on a boundary). ``edge[h]`` numbers the undirected edges.
+
+    All arrays are int32 (int64 for counts that can exceed 2**31), and the
+    structure is built from a FaceArray with sorts and searches only, so
+    construction is O(H log H) and neighbor queries are O(1) per step.
+    Non-manifold edges (more than two faces) are left without twins.
+    """
+
+    def __init__(self, vertex, next, twin, face, face_half_edge, vertex_count):
+        self.vertex = vertex
+        self.next = next
+        self.twin = twin
+        self.face = face
+        self.face_half_edge = face_half_edge
+        self.vertex_count = vertex_count
+
+        half_edges = np.arange(len(vertex), dtype=np.int32)
+
+        self.prev = np.empty_like(next)
+        self.prev[next] = half_edges
+
+        # Undirected edges: each pair of twins (or lone boundary half-edge)
+        # is represented by its lower-numbered half-edge
+        primary = np.where((twin < 0) | (half_edges < twin), half_edges, twin)
+        is_primary = primary == half_edges
+        edge_ids = np.cumsum(is_primary, dtype=np.int64).astype(np.int32) - 1
+        self.edge = edge_ids[primary]
+        self.edge_half_edge = half_edges[is_primary]
+
+        # One outgoing half-edge per vertex. On boundary vertices pick the
+        # one whose previous half-edge is a boundary, so walking around the
+        # vertex from it visits the whole fan
+        self.vertex_half_edge = np.full(vertex_count, -1, dtype=np.int32)
+        self.vertex_half_edge[vertex] = half_edges
+        starts = half_edges[twin[self.prev] < 0]
+        self.vertex_half_edge[vertex[starts]] = starts
+
+    @classmethod
+    def from_faces(cls, faces, vertex_count):
+        """Build from a FaceArray (or list of faces) over vertex_count vertices"""
+        faces = faces if isinstance(faces, FaceArray) else FaceArray(faces)
+        vertex = faces.indices.astype(np.int32)
+        next_half_edge = faces.next_corners.astype(np.int32)
+        face = faces.corner_faces.astype(np.int32)
+        face_half_edge = faces.offsets[:-1].astype(np.int32)
+
+        # Match each half-edge (a -> b) with the half-edge (b -> a)
+        origin = vertex.astype(np.int64)
+        target = origin[next_half_edge]
+        keys = origin * vertex_count + target
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+
+        twin_keys = target * vertex_count + origin
+        pos = np.searchsorted(sorted_keys, twin_keys)
+        pos = np.minimum(pos, len(sorted_keys) - 1)
+        found = sorted_keys[pos] == twin_keys if len(keys) else np.zeros(0, dtype=bool)
+        twin = np.where(found, order[pos], -1).astype(np.int32)
+
+        # Repeated directed edges (non-manifold or inconsistently wound
+        # faces) can produce one-sided matches; treat those as boundaries
+        half_edges = np.arange(len(vertex), dtype=np.int32)
+        paired = twin >= 0
+        paired[paired] = twin[twin[paired]] == half_edges[paired]
+        twin[~paired] = -1
+
+        return cls(vertex, next_half_edge, twin, face, face_half_edge, vertex_count)
+
+    @classmethod
+    def from_mesh(cls, mesh):
+        """Build from a Mesh's faces"""
+        return cls.from_faces(mesh.faces, len(mesh.vertices))
+
+    # ------------------------------------------------------------------
+    # Sizes
+    # ------------------------------------------------------------------
+    @property
+    def half_edge_count(self):
+        return len(self.vertex)
+
+    @property
+    def face_count(self):
+        return len(self.face_half_edge)
+
+    @property
+    def edge_count(self):
+        return len(self.edge_half_edge)
+
+    @property
+    def nbytes(self):
+        """Memory used by the topology arrays, in bytes"""
+        arrays = (self.vertex, self.next, self.twin, self.face, self.face_half_edge,
+                  self.prev, self.edge, self.edge_half_edge, self.vertex_half_edge)
+        return sum(array.nbytes for array in arrays)
+
+    # ------------------------------------------------------------------
+    # Bulk queries
+    # ------------------------------------------------------------------
+    @property
+    def target(self):
+        """Vertex each half-edge points to"""
+        return self.vertex[self.next]
+
+    def edge_vertices(self):
+        """Endpoints of every undirected edge as an (E, 2) array"""
+        half_edges = self.edge_half_edge
+        return np.stack([self.vertex[half_edges], self.vertex[self.next[half_edges]]], axis=1)
+
+    def edge_faces(self):
+        """Faces on both sides of every edge as an (E, 2) array (-1 if none)"""
+        half_edges = self.edge_half_edge
+        twins = self.twin[half_edges]
+        other = np.where(twins >= 0, self.face[np.maximum(twins, 0)], -1)
+        return np.stack([self.face[half_edges], other], axis=1)
+
+    def boundary_half_edges(self):
+        """Half-edges without a twin"""
+        return np.flatnonzero(self.twin < 0).astype(np.int32)
+
+    def vertex_valences(self):
+        """Number of edges touching each vertex"""
+        ends = self.edge_vertices().ravel()
+        return np.bincount(ends, minlength=self.vertex_count)
+
+    def face_sizes(self):
+        """Number of half-edges around each face"""
+        return np.bincount(self.face, minlength=self.face_count)
+
+    # ------------------------------------------------------------------
+    # Local neighborhood queries
+    # ------------------------------------------------------------------
+    def face_half_edges(self, face_idx):
+        """Half-edges around a face, in order"""
+        start = int(self.face_half_edge[face_idx])
+        result = [start]
+        h = int(self.next[start])
+        while h != start:
+            result.append(h)
+            h = int(self.next[h])
+        return result
+
+    def face_vertices(self, face_idx):
+        """Vertices of a face, in order"""
+        return [int(self.vertex[h]) for h in self.face_half_edges(face_idx)]
+
+    def face_neighbors(self, face_idx):
+        """Faces sharing an edge with a face"""
+        twins = self.twin[self.face_half_edges(face_idx)]
+        return [int(f) for f in self.face[twins[twins >= 0]]]
+
+    def vertex_outgoing(self, vertex_idx):
+        """Outgoing half-edges around a vertex, walking from face to face"""
+        start = int(self.vertex_half_edge[vertex_idx])
+        if start < 0:
+            return []
+        result = []
+        h = start
+        while True:
+            result.append(h)
+            t = int(self.twin[h])
+            if t < 0:
+                break
+            h = int(self.next[t])
+            if h == start:
+                break
+        return result
+
+    def vertex_neighbors(self, vertex_idx):
+        """Vertices connected to a vertex by an edge"""
+        outgoing = self.vertex_outgoing(vertex_idx)
+        neighbors = [int(self.vertex[self.next[h]]) for h in outgoing]
+        # On a boundary, the incoming boundary edge adds one more neighbor
+        if outgoing and self.twin[self.prev[outgoing[0]]] < 0:
+            neighbors.append(int(self.vertex[self.prev[outgoing[0]]]))
+        return neighbors
+
+    def vertex_faces(self, vertex_idx):
+        """Faces around a vertex"""
+        return [int(self.face[h]) for h in self.vertex_outgoing(vertex_idx)]
+
+    # ------------------------------------------------------------------
+    # Selection growing
+    # ------------------------------------------------------------------
+    def grow_face_selection(self, face_mask):
+        """Add every face that shares an edge with a selected face"""
+        face_mask = np.asarray(face_mask, dtype=bool)
+        selected = face_mask[self.face] & (self.twin >= 0)
+        grown = face_mask.copy()
+        grown[self.face[self.twin[selected]]] = True
+        return grown
+
+    def grow_vertex_selection(self, vertex_mask):
+        """Add every vertex that shares an edge with a selected vertex"""
+        vertex_mask = np.asarray(vertex_mask, dtype=bool)
+        ends = self.edge_vertices()
+        grown = vertex_mask.copy()
+        grown[ends[vertex_mask[ends[:, 0]], 1]] = True
+        grown[ends[vertex_mask[ends[:, 1]], 0]] = True
+        return grown
+
+    # ------------------------------------------------------------------
+    # Conversion back to faces
+    # ------------------------------------------------------------------
+    def to_faces(self):
+        """Walk the next pointers of every face and return a FaceArray"""
+        starts = self.face_half_edge.astype(np.int64)
+        sizes = np.ones(len(starts), dtype=np.int64)
+        current = self.next[starts]
+        active = current != starts
+        while np.any(active):
+            sizes[active] += 1
+            current[active] = self.next[current[active]]
+            active &= current != starts
+
+        offsets = np.zeros(len(starts) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=offsets[1:])
+        indices = np.empty(offsets[-1], dtype=np.int32)
+
+        current = starts.copy()
+        for step in range(int(sizes.max()) if len(sizes) else 0):
+            walking = step < sizes
+            indices[offsets[:-1][walking] + step] = self.vertex[current[walking]]
+            current[walking] = self.next[current[walking]]
+
+        return FaceArray.from_csr(offsets, indices)
+
+    def to_mesh(self, mesh):
+        """Write faces and edges back into a Mesh"""
+        mesh.faces = self.to_faces()
+        mesh.edges = self.edge_vertices()
+        return mesh
@@ -0,0 +1,123 @@
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from core.io import meshbin
+
+
+class _AttachedSharedMemory(shared_memory.SharedMemory):
+    """Shared memory block that mesh arrays are viewing
+
+    The block is closed when the mesh owning it goes away. If arrays from
+    it are still in use elsewhere at that moment, close() refuses with a
+    BufferError and the mapping stays until they are gone; that is expected
+    here, so it is not reported from __del__.
+    """
+
+    def __del__(self):
+        try:
+            self.close()
+        except (BufferError, OSError):
+            pass
+
+
+def import_batch(filenames, max_workers=None, progress=None):
+    """Import many mesh files in parallel worker processes
+
+    Each worker parses one file with MeshIO.import_file and copies the mesh
+    arrays into a new shared memory block. The main process only receives
+    the block name and array layout, and builds the Mesh from views into the
+    block, so the geometry is never pickled or copied again.
+
+    ``progress(done, total, filename, stats)`` is called as files finish.
+    Returns the meshes in the order of ``filenames`` and a list with the
+    stats of every file (path, bytes, parse seconds, MB/s, counts).
+    """
+    filenames = [os.path.abspath(filename) for filename in filenames]
+    meshes = [None] * len(filenames)
+    stats = [None] * len(filenames)
+    errors = []
+
+    # Start the resource tracker here so the workers share it; otherwise
+    # each worker's own tracker would try to clean up the blocks it created
+    # (and this process unlinked) when the pool shuts down
+    resource_tracker.ensure_running()
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(_import_to_shared_memory, filename): i
+                   for i, filename in enumerate(filenames)}
+        for done, future in enumerate(as_completed(futures), 1):
+            i = futures[future]
+            try:
+                block_name, name, entries, file_stats = future.result()
+            except Exception as error:
+                errors.append((filenames[i], error))
+                continue
+
+            meshes[i] = _attach_mesh(block_name, name, entries)
+            stats[i] = dict(file_stats, path=filenames[i])
+            if progress is not None:
+                progress(done, len(filenames), filenames[i], stats[i])
+
+    if errors:
+        filename, error = errors[0]
+        raise RuntimeError(f"Failed to import {filename}: {error}") from error
+    return meshes, stats
+
+
+def _import_to_shared_memory(filename):
+    """Worker: parse a file and publish its arrays in shared memory"""
+    from core.io.mesh_io import MeshIO
+
+    start_time = time.perf_counter()
+    mesh = MeshIO.import_file(filename)
+    arrays = meshbin.mesh_arrays(mesh)
+    entries, size = meshbin.layout_arrays(arrays)
+
+    block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    try:
+        for name, array in arrays.items():
+            entry = entries[name]
+            target = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf, offset=entry["offset"])
+            target[...] = array
+            del target
+    except BaseException:
+        block.close()
+        block.unlink()
+        raise
+    block.close()
+
+    seconds = time.perf_counter() - start_time
+    file_size = os.path.getsize(filename)
+    file_stats = {
+        "bytes": file_size,
+        "seconds": seconds,
+        "mb_per_s": file_size / (1 << 20) / max(seconds, 1e-9),
+        "vertices": len(mesh.vertices),
+        "faces": len(mesh.faces),
+    }
+    return block.name, mesh.name, entries, file_stats
+
+
+def _attach_mesh(block_name, name, entries):
+    """Build a Mesh whose arrays are views into a worker's shared memory"""
+    block = _AttachedSharedMemory(name=block_name)
+    # Drop the name right away: the memory stays valid while mapped and is
+    # released by the OS once the mesh is gone
+    block.unlink()
+
+    # np.frombuffer holds a buffer export, so the block refuses to close
+    # while any of these arrays (or views of them) are alive
+    arrays = {}
+    for array_name, entry in entries.items():
+        shape = tuple(entry["shape"])
+        count = int(np.prod(shape, dtype=np.int64))
+        arrays[array_name] = np.frombuffer(block.buf, dtype=np.dtype(entry["dtype"]), count=count,
+                                           offset=entry["offset"]).reshape(shape)
+    mesh = meshbin.mesh_from_arrays(name, arrays)
+    mesh.storage = block
+    return mesh
@@ -0,0 +1,81 @@
+
+import numpy as np
+
+
+class GrowableArray:
+    """Preallocated NumPy array that grows by doubling as rows are appended
+
+    Appending a block copies it straight into spare capacity, so building an
+    array from many chunks costs amortized O(1) per row instead of a full
+    copy per chunk (as np.concatenate would).
+    """
+
+    def __init__(self, dtype, columns=None, capacity=1024):
+        self.dtype = np.dtype(dtype)
+        self.columns = columns
+        self.size = 0
+        self._data = np.empty(self._shape(max(1, capacity)), dtype=self.dtype)
+
+    def _shape(self, rows):
+        return (rows,) if self.columns is None else (rows, self.columns)
+
+    def reserve(self, rows):
+        """Make room for at least ``rows`` rows in total"""
+        if rows > len(self._data):
+            capacity = max(rows, 2 * len(self._data))
+            data = np.empty(self._shape(capacity), dtype=self.dtype)
+            data[:self.size] = self._data[:self.size]
+            self._data = data
+
+    def append(self, block):
+        """Append rows (or a single row) to the end"""
+        block = np.asarray(block, dtype=self.dtype).reshape(self._shape(-1))
+        self.reserve(self.size + len(block))
+        self._data[self.size:self.size + len(block)] = block
+        self.size += len(block)
+
+    def view(self):
+        """The filled part of the buffer (shares memory with it)"""
+        return self._data[:self.size]
+
+    def finish(self):
+        """Return the filled rows, releasing unused capacity"""
+        if len(self._data) != self.size:
+            self._data = self._data[:self.size].copy()
+        return self._data
+
+    def __len__(self):
+        return self.size
+
+
+def iter_line_chunks(f, chunk_size):
+    """Yield blocks of complete lines read from a binary file
+
+    Each block holds roughly ``chunk_size`` bytes and ends with a newline;
+    a partial last line is carried over to the next block.
+    """
+    tail = b""
+    while True:
+        block = f.read(chunk_size)
+        if not block:
+            break
+        data = tail + block
+        cut = data.rfind(b"\n") + 1
+        data, tail = data[:cut], data[cut:]
+        if data:
+            yield data
+    if tail:
+        yield tail + b"\n"
+
+
+def per_vertex(values, vertex_count, columns=3):
+    """Return values as an (N, columns) array if it has one row per vertex
+
+    Writers use this to decide which attributes to export, so every format
+    agrees on it. Returns None for anything else.
+    """
+    if not isinstance(values, np.ndarray) or len(values) != vertex_count or vertex_count == 0:
+        return None
+    if values.ndim != 2 or values.shape[1] < columns:
+        return None
+    return values[:, :columns]
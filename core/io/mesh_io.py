@@ -1,28 +1,119 @@
 
-import numpy as np
-import json
+import os
+import time
+
+from core.io import batch_import, meshbin, obj_io, ply_io, stl_io
+
 
 class MeshIO:
+    # Timing of the most recent import (bytes, seconds, mb_per_s, ...)
+    last_stats = None
+    # Per-file timing of the most recent batch import
+    last_batch_stats = None
+
     @staticmethod
-    def import_obj(filename):
-        """Import a mesh from an OBJ file"""
-        # Will implement later
-        pass
+    def import_obj(filename, chunk_size=obj_io.DEFAULT_CHUNK_SIZE, verbose=False):
+        """Import a mesh from an OBJ file
+
+        The file is streamed in chunks and parsed with vectorized NumPy
+        tokenization; see core.io.obj_io.read_obj.
+        """
+        mesh, stats = obj_io.read_obj(filename, chunk_size)
+        MeshIO._report(filename, stats, verbose)
+        return mesh
 
     @staticmethod
-    def export_obj(mesh, filename):
-        """Export a mesh to an OBJ file"""
-        # Will implement later
-        pass
+    def export_obj(mesh, filename, block_rows=obj_io.DEFAULT_BLOCK_ROWS, verbose=False):
+        """Export a mesh to an OBJ file
+
+        Rows are formatted and written in blocks of ``block_rows``, so memory
+        use does not grow with the mesh; see core.io.obj_io.write_obj.
+        """
+        stats = obj_io.write_obj(mesh, filename, block_rows)
+        MeshIO._report(filename, stats, verbose)
 
     @staticmethod
-    def import_stl(filename):
-        """Import a mesh from an STL file"""
-        # Will implement later
-        pass
+    def export_ply(mesh, filename, verbose=False):
+        """Export a mesh to a binary little-endian PLY file"""
+        stats = ply_io.write_ply(mesh, filename)
+        MeshIO._report(filename, stats, verbose)
+
+    @staticmethod
+    def import_stl(filename, weld=True, verbose=False):
+        """Import a mesh from a binary or ASCII STL file
+
+        Binary files are memory mapped; with ``weld`` coincident corners are
+        merged into shared vertices. See core.io.stl_io.read_stl.
+        """
+        mesh, stats = stl_io.read_stl(filename, weld)
+        MeshIO._report(filename, stats, verbose)
+        return mesh
 
     @staticmethod
     def export_stl(mesh, filename):
-        """Export a mesh to an STL file"""
-        # Will implement later
-        pass
+        """Export a mesh to a binary STL file"""
+        stl_io.write_stl(mesh, filename)
+
+    @staticmethod
+    def import_meshbin(filename):
+        """Open a native .meshbin file (memory mapped, copy-on-write)"""
+        return meshbin.read_meshbin(filename)
+
+    @staticmethod
+    def export_meshbin(mesh, filename, metadata=None):
+        """Export a mesh to the native .meshbin format"""
+        meshbin.write_meshbin(mesh, filename, metadata)
+
+    @staticmethod
+    def import_file(filename, verbose=False):
+        """Import a mesh, picking the reader from the file extension"""
+        extension = os.path.splitext(filename)[1].lower()
+        if extension == ".obj":
+            return MeshIO.import_obj(filename, verbose=verbose)
+        if extension == ".stl":
+            return MeshIO.import_stl(filename, verbose=verbose)
+        if extension == meshbin.EXTENSION:
+            return MeshIO.import_meshbin(filename)
+        raise ValueError(f"Unsupported mesh format: {extension}")
+
+    @staticmethod
+    def export_file(mesh, filename, verbose=False):
+        """Export a mesh, picking the writer from the file extension"""
+        extension = os.path.splitext(filename)[1].lower()
+        if extension == ".obj":
+            MeshIO.export_obj(mesh, filename, verbose=verbose)
+        elif extension == ".ply":
+            MeshIO.export_ply(mesh, filename, verbose=verbose)
+        elif extension == ".stl":
+            MeshIO.export_stl(mesh, filename)
+        elif extension == meshbin.EXTENSION:
+            MeshIO.export_meshbin(mesh, filename)
+        else:
+            raise ValueError(f"Unsupported mesh format: {extension}")
+
+    @staticmethod
+    def import_batch(filenames, max_workers=None, progress=None, verbose=False):
+        """Import many files in parallel worker processes
+
+        Geometry comes back through shared memory rather than pickling; see
+        core.io.batch_import.import_batch. ``progress(done, total, filename,
+        stats)`` is called as each file finishes. Returns the meshes in the
+        order of ``filenames``.
+        """
+        start_time = time.perf_counter()
+        meshes, stats = batch_import.import_batch(filenames, max_workers, progress)
+        MeshIO.last_batch_stats = stats
+        if verbose:
+            total_bytes = sum(entry["bytes"] for entry in stats)
+            seconds = time.perf_counter() - start_time
+            print(f"{len(meshes)} files, {total_bytes / (1 << 20):.1f} MB in {seconds:.2f} s "
+                  f"({total_bytes / (1 << 20) / max(seconds, 1e-9):.1f} MB/s)")
+        return meshes
+
+    @staticmethod
+    def _report(filename, stats, verbose):
+        """Remember the stats of the last operation and optionally print them"""
+        MeshIO.last_stats = stats
+        if verbose:
+            print(f"{filename}: {stats['bytes'] / (1 << 20):.1f} MB in {stats['seconds']:.2f} s "
+                  f"({stats['mb_per_s']:.1f} MB/s), {stats['vertices']} vertices, {stats['faces']} faces")
@@ -0,0 +1,152 @@
+
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from core.face_array import FaceArray
+from core.mesh import Mesh
+
+# File layout:
+#   8 bytes   magic
+#   4 bytes   format version (uint32)
+#   4 bytes   header length in bytes (uint32)
+#   header    UTF-8 JSON describing every array (dtype, shape, offset)
+#   arrays    raw little-endian data, each starting on a 64-byte boundary
+MAGIC = b"MESHBIN\0"
+VERSION = 1
+ALIGNMENT = 64
+PREAMBLE_SIZE = 16
+
+EXTENSION = ".meshbin"
+
+
+def _aligned(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def mesh_arrays(mesh):
+    """The arrays stored for a mesh, keyed by name
+
+    Faces are stored as a (F, k) array when all faces have the same size and
+    as CSR offsets plus indices otherwise. Optional attributes are only
+    included when they are arrays with data.
+    """
+    arrays = {"vertices": np.asarray(mesh.vertices, dtype="<f8").reshape(-1, 3)}
+    faces = mesh.faces
+    if faces.array is not None:
+        arrays["faces"] = faces.array.astype("<i4", copy=False)
+    else:
+        arrays["face_offsets"] = faces.offsets.astype("<i8", copy=False)
+        arrays["face_indices"] = faces.indices.astype("<i4", copy=False)
+    if len(mesh.edges) > 0:
+        arrays["edges"] = mesh.edges.array.astype("<i4", copy=False)
+    for name in ("normals", "uvs", "colors"):
+        value = getattr(mesh, name)
+        if isinstance(value, np.ndarray) and value.size > 0:
+            arrays[name] = value.astype("<f8", copy=False)
+    return arrays
+
+
+def layout_arrays(arrays, start=0):
+    """Place arrays back to back on aligned offsets
+
+    Returns a dict of {name: {"dtype", "shape", "offset"}} entries and the
+    total size in bytes.
+    """
+    offset = _aligned(start)
+    entries = {}
+    for name, array in arrays.items():
+        entries[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _aligned(offset + array.nbytes)
+    return entries, offset
+
+
+def write_meshbin(mesh, filename, metadata=None):
+    """Write a mesh to a .meshbin file
+
+    ``metadata`` is an optional JSON-serializable dict stored in the header
+    (the resource cache keeps the source file's identity there). The file is
+    written to a temporary name first and renamed, so readers never see a
+    partial file.
+    """
+    arrays = mesh_arrays(mesh)
+
+    # Lay out the arrays after the header; the header size depends on the
+    # offsets, so grow the reserved space until it fits
+    reserved = ALIGNMENT
+    while True:
+        entries, offset = layout_arrays(arrays, PREAMBLE_SIZE + reserved)
+        header = json.dumps({
+            "name": mesh.name,
+            "arrays": entries,
+            "metadata": metadata or {},
+        }).encode("utf-8")
+        if len(header) <= reserved:
+            break
+        reserved = _aligned(len(header))
+
+    preamble = MAGIC + np.array([VERSION, len(header)], dtype="<u4").tobytes()
+    # A unique temporary name, since loader threads may write the same
+    # cache entry at once
+    descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(filename)),
+                                             suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as f:
+            f.write(preamble)
+            f.write(header)
+            for name, array in arrays.items():
+                f.seek(entries[name]["offset"])
+                np.ascontiguousarray(array).tofile(f)
+            f.truncate(max(offset, f.tell()))
+        os.replace(temporary, filename)
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+
+def read_header(filename):
+    """Read the JSON header of a .meshbin file without touching the arrays"""
+    with open(filename, "rb") as f:
+        preamble = f.read(PREAMBLE_SIZE)
+        if len(preamble) != PREAMBLE_SIZE or preamble[:8] != MAGIC:
+            raise ValueError(f"{filename} is not a meshbin file")
+        version, header_length = np.frombuffer(preamble, dtype="<u4", offset=8).tolist()
+        if version != VERSION:
+            raise ValueError(f"Unsupported meshbin version {version}")
+        return json.loads(f.read(header_length).decode("utf-8"))
+
+
+def read_meshbin(filename, mode="c"):
+    """Open a .meshbin file as a Mesh backed by a memory map
+
+    The arrays are views into one ``np.memmap`` of the file, so opening is
+    instant and pages are only read when used. The default copy-on-write
+    mode lets the mesh be edited in memory without changing the file.
+    """
+    header = read_header(filename)
+    mapped = np.memmap(filename, dtype=np.uint8, mode=mode)
+
+    arrays = {}
+    for name, entry in header["arrays"].items():
+        arrays[name] = np.ndarray(tuple(entry["shape"]), dtype=np.dtype(entry["dtype"]),
+                                  buffer=mapped, offset=entry["offset"])
+
+    return mesh_from_arrays(header["name"], arrays)
+
+
+def mesh_from_arrays(name, arrays):
+    """Create a Mesh that uses the given arrays (as made by mesh_arrays) directly"""
+    mesh = Mesh(name)
+    mesh.vertices = arrays["vertices"]
+    if "faces" in arrays:
+        mesh.faces = FaceArray(arrays["faces"])
+    else:
+        mesh.faces = FaceArray.from_csr(arrays["face_offsets"], arrays["face_indices"])
+    if "edges" in arrays:
+        mesh.edges = FaceArray(arrays["edges"])
+    for attribute in ("normals", "uvs", "colors"):
+        if attribute in arrays:
+            setattr(mesh, attribute, arrays[attribute])
+    return mesh
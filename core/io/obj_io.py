@@ -0,0 +1,263 @@
+
+import os
+import time
+
+import numpy as np
+
+from core.face_array import FaceArray
+from core.io.buffers import GrowableArray, iter_line_chunks, per_vertex
+from core.mesh import Mesh
+
+DEFAULT_CHUNK_SIZE = 16 << 20  # Bytes read and parsed per step
+
+_SPACE = ord(" ")
+_SLASH = ord("/")
+_HASH = ord("#")
+_NEWLINE = ord("\n")
+
+
+def read_obj(filename, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Read an OBJ file into a Mesh
+
+    The file is read in binary chunks of ``chunk_size`` bytes, cut at the
+    last newline. Within a chunk, lines are classified by their first bytes
+    and all lines of one record type are parsed together by a single
+    ``np.fromstring`` call, so no Python code runs per line.
+
+    Supports ``v`` (with optional vertex colors), ``vt``, ``vn`` and ``f``
+    records, including ``v/vt/vn`` corners and negative indices. Other
+    records are skipped. Returns the mesh and a dict of timing stats.
+    """
+    start_time = time.perf_counter()
+    file_size = os.path.getsize(filename)
+    estimate = max(1024, file_size // 64)
+
+    reader = _ObjReader(estimate)
+    with open(filename, "rb") as f:
+        for data in iter_line_chunks(f, chunk_size):
+            reader.parse_chunk(data)
+
+    mesh = reader.build(os.path.splitext(os.path.basename(filename))[0])
+    seconds = time.perf_counter() - start_time
+    stats = {
+        "bytes": file_size,
+        "seconds": seconds,
+        "mb_per_s": file_size / (1 << 20) / max(seconds, 1e-9),
+        "vertices": len(mesh.vertices),
+        "faces": len(mesh.faces),
+    }
+    return mesh, stats
+
+
+class _ObjReader:
+    """Accumulates OBJ records chunk by chunk into growable arrays"""
+
+    def __init__(self, capacity):
+        self.vertices = GrowableArray(np.float64, 3, capacity)
+        self.colors = GrowableArray(np.float64, 3, 0)
+        self.uvs = GrowableArray(np.float64, 2, 0)
+        self.normals = GrowableArray(np.float64, 3, 0)
+        self.face_sizes = GrowableArray(np.int64, None, capacity)
+        self.face_indices = GrowableArray(np.int32, None, 4 * capacity)
+
+    def parse_chunk(self, data):
+        """Parse a block of complete lines"""
+        buf = np.frombuffer(data, dtype=np.uint8)
+        line_ends = np.flatnonzero(buf == _NEWLINE)
+        line_starts = np.empty_like(line_ends)
+        line_starts[0] = 0
+        line_starts[1:] = line_ends[:-1] + 1
+
+        # Records are classified on the first non-blank bytes of each line,
+        # so indented records are read too
+        keywords = line_starts
+        indented = buf[line_starts] <= _SPACE
+        if np.any(indented):
+            positions = np.arange(len(buf), dtype=np.int64)
+            next_filled = np.where(buf > _SPACE, positions, len(buf) - 1)
+            next_filled = np.minimum.accumulate(next_filled[::-1])[::-1]
+            keywords = np.minimum(next_filled[line_starts], line_ends)
+        indents = keywords - line_starts
+
+        first = buf[keywords]
+        second = buf[np.minimum(keywords + 1, len(buf) - 1)]
+        blank = (second == _SPACE) | (second == ord("\t"))
+        is_v = (first == ord("v")) & blank
+        is_vt = (first == ord("v")) & (second == ord("t"))
+        is_vn = (first == ord("v")) & (second == ord("n"))
+        is_f = (first == ord("f")) & blank
+
+        lengths = line_ends - line_starts + 1
+        vertex_base = len(self.vertices)
+
+        if np.any(is_v):
+            values, starts, counts = _parse_lines(buf, lengths, indents, is_v, 1, np.float64)
+            if np.any(counts < 3):
+                raise ValueError("OBJ vertex with fewer than 3 coordinates")
+            self.vertices.append(values[starts[:, None] + np.arange(3)])
+            if np.all(counts >= 6):
+                self.colors.append(values[starts[:, None] + np.arange(3, 6)])
+        if np.any(is_vt):
+            values, starts, counts = _parse_lines(buf, lengths, indents, is_vt, 2, np.float64)
+            if np.any(counts < 2):
+                raise ValueError("OBJ texture coordinate with fewer than 2 values")
+            self.uvs.append(values[starts[:, None] + np.arange(2)])
+        if np.any(is_vn):
+            values, starts, counts = _parse_lines(buf, lengths, indents, is_vn, 2, np.float64)
+            if np.any(counts < 3):
+                raise ValueError("OBJ normal with fewer than 3 values")
+            self.normals.append(values[starts[:, None] + np.arange(3)])
+        if np.any(is_f):
+            values, starts, counts = _parse_lines(buf, lengths, indents, is_f, 1, np.int64, drop_slashes=True)
+
+            # Negative indices count back from the vertices read so far
+            vertices_before = vertex_base + np.cumsum(is_v)[is_f]
+            relative = np.repeat(vertices_before, counts)
+            values = np.where(values < 0, relative + values, values - 1)
+            self.face_sizes.append(counts)
+            self.face_indices.append(values)
+
+    def build(self, name):
+        """Create the Mesh from everything parsed so far"""
+        mesh = Mesh(name)
+        mesh.vertices = self.vertices.finish()
+
+        sizes = self.face_sizes.finish()
+        offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=offsets[1:])
+        mesh.faces = FaceArray.from_csr(offsets, self.face_indices.finish())
+
+        if len(self.colors) == len(mesh.vertices) and len(self.colors) > 0:
+            mesh.colors = self.colors.finish()
+        if len(self.uvs) > 0:
+            mesh.uvs = self.uvs.finish()
+        if len(self.normals) > 0:
+            mesh.normals = self.normals.finish()
+        return mesh
+
+
+def _parse_lines(buf, lengths, indents, mask, prefix, dtype, drop_slashes=False):
+    """Parse all lines selected by mask with one np.fromstring call
+
+    ``prefix`` bytes after the ``indents`` leading blanks of each line (the
+    record keyword) are blanked out first, as are comments from '#' to the
+    end of the line. With ``drop_slashes``, everything from a '/' to the
+    next whitespace is blanked too, keeping only the first index of each
+    ``v/vt/vn`` corner. Returns the values, the position of each line's
+    first value and the number of values on each line.
+    """
+    text = buf[np.repeat(mask, lengths)]
+    line_lengths = lengths[mask]
+    line_starts = np.zeros(len(line_lengths), dtype=np.int64)
+    np.cumsum(line_lengths[:-1], out=line_starts[1:])
+    keywords = line_starts + indents[mask]
+    for i in range(prefix):
+        text[keywords + i] = _SPACE
+
+    positions = np.arange(len(text), dtype=np.int64)
+    if _HASH in text:
+        last_newline = np.maximum.accumulate(np.where(text == _NEWLINE, positions, -1))
+        last_hash = np.maximum.accumulate(np.where(text == _HASH, positions, -1))
+        text[last_hash > last_newline] = _SPACE
+
+    whitespace = text <= _SPACE
+    if drop_slashes and _SLASH in text:
+        last_blank = np.maximum.accumulate(np.where(whitespace, positions, -1))
+        last_slash = np.maximum.accumulate(np.where(text == _SLASH, positions, -1))
+        text[last_slash > last_blank] = _SPACE
+
+    # Count tokens per line: a token starts where whitespace is followed by
+    # anything else (line starts are always blank after the prefix)
+    token_starts = np.zeros(len(text), dtype=bool)
+    token_starts[1:] = whitespace[:-1] & ~whitespace[1:]
+    counts = np.add.reduceat(token_starts, line_starts, dtype=np.int32).astype(np.int64)
+
+    values = np.fromstring(text.tobytes(), dtype=dtype, sep=" ")
+    if len(values) != counts.sum():
+        raise ValueError("Malformed OBJ record")
+
+    value_starts = np.zeros(len(counts), dtype=np.int64)
+    np.cumsum(counts[:-1], out=value_starts[1:])
+    return values, value_starts, counts
+
+
+DEFAULT_BLOCK_ROWS = 1 << 16  # Vertex or face rows formatted per write
+
+
+def write_obj(mesh, filename, block_rows=DEFAULT_BLOCK_ROWS):
+    """Write a mesh as OBJ, streaming fixed-size blocks of rows
+
+    Every block is formatted with one ``%`` over a repeated row format and
+    written straight away, so memory use is bounded by ``block_rows`` rather
+    than by the mesh size. Per-vertex colors, uvs and normals are included
+    when they are arrays with one row per vertex. Returns timing stats.
+    """
+    start_time = time.perf_counter()
+    vertices = np.asarray(mesh.vertices, dtype=float).reshape(-1, 3)
+    vertex_count = len(vertices)
+    colors = per_vertex(mesh.colors, vertex_count, 3)
+    uvs = per_vertex(mesh.uvs, vertex_count, 2)
+    normals = per_vertex(mesh.normals, vertex_count, 3)
+
+    # Corner format: with per-vertex uvs/normals every corner references
+    # the same index three times (v/vt/vn)
+    if uvs is not None and normals is not None:
+        corner, repeat = " %d/%d/%d", 3
+    elif uvs is not None:
+        corner, repeat = " %d/%d", 2
+    elif normals is not None:
+        corner, repeat = " %d//%d", 2
+    else:
+        corner, repeat = " %d", 1
+
+    faces = mesh.faces
+    with open(filename, "wb") as f:
+        f.write(f"# mesh_editor\no {mesh.name}\n".encode("utf-8"))
+
+        vertex_rows = vertices if colors is None else np.hstack([vertices, colors])
+        vertex_format = "v %.6f %.6f %.6f\n" if colors is None else "v %.6f %.6f %.6f %.6f %.6f %.6f\n"
+        _write_rows(f, vertex_rows, vertex_format, block_rows)
+        if uvs is not None:
+            _write_rows(f, uvs, "vt %.6f %.6f\n", block_rows)
+        if normals is not None:
+            _write_rows(f, normals, "vn %.6f %.6f %.6f\n", block_rows)
+
+        if faces.arity is not None:
+            indices = faces.array
+            row_format = "f" + corner * faces.arity + "\n"
+            for start in range(0, len(indices), block_rows):
+                block = indices[start:start + block_rows].astype(np.int64) + 1
+                if repeat > 1:
+                    block = np.repeat(block, repeat, axis=1)
+                f.write(((row_format * len(block)) % tuple(block.ravel().tolist())).encode("ascii"))
+        else:
+            offsets = faces.offsets
+            indices = faces.indices
+            formats = {}
+            for start in range(0, len(faces), block_rows):
+                stop = min(start + block_rows, len(faces))
+                sizes = np.diff(offsets[start:stop + 1]).tolist()
+                block = indices[offsets[start]:offsets[stop]].astype(np.int64) + 1
+                if repeat > 1:
+                    block = np.repeat(block, repeat)
+                for size in set(sizes) - formats.keys():
+                    formats[size] = "f" + corner * size + "\n"
+                text = "".join([formats[size] for size in sizes]) % tuple(block.tolist())
+                f.write(text.encode("ascii"))
+
+    file_size = os.path.getsize(filename)
+    seconds = time.perf_counter() - start_time
+    return {
+        "bytes": file_size,
+        "seconds": seconds,
+        "mb_per_s": file_size / (1 << 20) / max(seconds, 1e-9),
+        "vertices": vertex_count,
+        "faces": len(faces),
+    }
+
+
+def _write_rows(f, rows, row_format, block_rows):
+    """Format and write an array one block of rows at a time"""
+    for start in range(0, len(rows), block_rows):
+        block = rows[start:start + block_rows]
+        f.write(((row_format * len(block)) % tuple(block.ravel().tolist())).encode("ascii"))
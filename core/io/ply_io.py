@@ -0,0 +1,99 @@
+
+import os
+import time
+
+import numpy as np
+
+from core.io.buffers import per_vertex
+
+DEFAULT_BLOCK_ROWS = 1 << 20  # Vertices or faces packed per tofile call
+
+
+def write_ply(mesh, filename, block_rows=DEFAULT_BLOCK_ROWS):
+    """Write a mesh as binary little-endian PLY
+
+    Vertex rows (position plus optional per-vertex normals and colors) are
+    packed into a structured array and face rows into raw bytes, a block at
+    a time, and written with tofile. Returns timing stats.
+    """
+    start_time = time.perf_counter()
+    vertices = np.asarray(mesh.vertices, dtype=float).reshape(-1, 3)
+    vertex_count = len(vertices)
+    normals = per_vertex(mesh.normals, vertex_count)
+    colors = per_vertex(mesh.colors, vertex_count)
+    faces = mesh.faces
+
+    fields = [("x", "<f4"), ("y", "<f4"), ("z", "<f4")]
+    if normals is not None:
+        fields += [("nx", "<f4"), ("ny", "<f4"), ("nz", "<f4")]
+    if colors is not None:
+        fields += [("red", "u1"), ("green", "u1"), ("blue", "u1")]
+    vertex_dtype = np.dtype(fields)
+
+    ply_types = {"<f4": "float", "u1": "uchar"}
+    header = ["ply", "format binary_little_endian 1.0", "comment mesh_editor",
+              f"element vertex {vertex_count}"]
+    header += [f"property {ply_types[kind]} {name}" for name, kind in fields]
+    header += [f"element face {len(faces)}", "property list uchar int vertex_indices", "end_header"]
+
+    with open(filename, "wb") as f:
+        f.write(("\n".join(header) + "\n").encode("ascii"))
+
+        for start in range(0, vertex_count, block_rows):
+            stop = min(start + block_rows, vertex_count)
+            block = np.empty(stop - start, dtype=vertex_dtype)
+            block["x"], block["y"], block["z"] = vertices[start:stop].T
+            if normals is not None:
+                block["nx"], block["ny"], block["nz"] = normals[start:stop].T
+            if colors is not None:
+                rgb = colors[start:stop]
+                # Colors stored as 0..1 floats are scaled to bytes
+                if rgb.dtype.kind == "f":
+                    rgb = np.rint(np.clip(rgb, 0.0, 1.0) * 255)
+                block["red"], block["green"], block["blue"] = rgb.astype(np.uint8).T
+            block.tofile(f)
+
+        offsets = faces.offsets
+        indices = faces.indices
+        for start in range(0, len(faces), block_rows):
+            stop = min(start + block_rows, len(faces))
+            _face_block(offsets[start:stop + 1], indices).tofile(f)
+
+    file_size = os.path.getsize(filename)
+    seconds = time.perf_counter() - start_time
+    return {
+        "bytes": file_size,
+        "seconds": seconds,
+        "mb_per_s": file_size / (1 << 20) / max(seconds, 1e-9),
+        "vertices": vertex_count,
+        "faces": len(faces),
+    }
+
+
+def _face_block(offsets, indices):
+    """Pack faces as PLY list rows: a uint8 count followed by int32 indices"""
+    sizes = np.diff(offsets)
+    if np.any(sizes > 255):
+        raise ValueError("PLY face lists are limited to 255 vertices")
+    corners = indices[offsets[0]:offsets[-1]].astype("<i4")
+
+    if len(sizes) > 0 and sizes.min() == sizes.max():
+        # Same-size faces map onto a packed structured dtype directly
+        width = int(sizes[0])
+        rows = np.empty(len(sizes), dtype=np.dtype([("count", "u1"), ("indices", "<i4", (width,))]))
+        rows["count"] = width
+        rows["indices"] = corners.reshape(-1, width)
+        return rows
+
+    # Byte position of every row: each previous row takes 1 + 4 * size bytes
+    row_starts = np.zeros(len(sizes), dtype=np.int64)
+    np.cumsum(1 + 4 * sizes[:-1], out=row_starts[1:])
+    packed = np.empty(len(sizes) + 4 * len(corners), dtype=np.uint8)
+    packed[row_starts] = sizes
+
+    # Corner j of a row starts 1 + 4 * j bytes after the row
+    corner_rows = np.repeat(np.arange(len(sizes)), sizes)
+    corner_index = np.arange(len(corners)) - (offsets[:-1] - offsets[0])[corner_rows]
+    corner_starts = row_starts[corner_rows] + 1 + 4 * corner_index
+    packed[corner_starts[:, None] + np.arange(4)] = corners.view(np.uint8).reshape(-1, 4)
+    return packed
@@ -0,0 +1,193 @@
+
+import os
+import time
+
+import numpy as np
+
+from core.face_array import FaceArray
+from core.io.buffers import GrowableArray, iter_line_chunks
+from core.mesh import Mesh
+
+# One binary STL triangle: normal, three corners and an attribute word,
+# packed into exactly 50 bytes
+STL_RECORD = np.dtype([
+    ("normal", "<f4", (3,)),
+    ("vertices", "<f4", (3, 3)),
+    ("attributes", "<u2"),
+])
+HEADER_SIZE = 84  # 80 byte header plus uint32 triangle count
+
+DEFAULT_CHUNK_SIZE = 16 << 20
+DEFAULT_WELD_TOLERANCE = 1e-6  # Relative to the bounding box size
+
+_VERTEX = np.frombuffer(b"vertex", dtype=np.uint8)
+_SPACE = ord(" ")
+
+
+def is_binary_stl(filename):
+    """Check whether an STL file is binary
+
+    Some binary files also start with "solid", so the size implied by the
+    triangle count is what decides.
+    """
+    size = os.path.getsize(filename)
+    if size < HEADER_SIZE:
+        return False
+    with open(filename, "rb") as f:
+        header = f.read(HEADER_SIZE)
+    count = int(np.frombuffer(header, dtype="<u4", count=1, offset=80)[0])
+    if size == HEADER_SIZE + count * STL_RECORD.itemsize:
+        return True
+    return not header.lstrip().startswith(b"solid")
+
+
+def read_stl(filename, weld=True, tolerance=DEFAULT_WELD_TOLERANCE, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Read a binary or ASCII STL file into a Mesh
+
+    Binary files are memory mapped as an array of STL_RECORD, so there is no
+    per-triangle Python work. ASCII files are streamed in chunks. With
+    ``weld`` the three separate corners of every triangle are merged into
+    shared vertices. Returns the mesh and a dict of timing stats.
+    """
+    start_time = time.perf_counter()
+    file_size = os.path.getsize(filename)
+
+    if is_binary_stl(filename):
+        count = (file_size - HEADER_SIZE) // STL_RECORD.itemsize
+        if count > 0:
+            records = np.memmap(filename, dtype=STL_RECORD, mode="r", offset=HEADER_SIZE, shape=(count,))
+            corners = np.asarray(records["vertices"], dtype=float).reshape(-1, 3)
+            del records
+        else:
+            corners = np.zeros((0, 3))
+    else:
+        corners = _read_ascii_corners(filename, chunk_size)
+
+    if weld:
+        vertices, faces = weld_vertices(corners, tolerance)
+    else:
+        vertices = corners
+        faces = np.arange(len(corners), dtype=np.int32).reshape(-1, 3)
+
+    mesh = Mesh(os.path.splitext(os.path.basename(filename))[0])
+    mesh.vertices = vertices
+    mesh.faces = FaceArray(faces)
+
+    seconds = time.perf_counter() - start_time
+    stats = {
+        "bytes": file_size,
+        "seconds": seconds,
+        "mb_per_s": file_size / (1 << 20) / max(seconds, 1e-9),
+        "vertices": len(mesh.vertices),
+        "faces": len(mesh.faces),
+    }
+    return mesh, stats
+
+
+def _read_ascii_corners(filename, chunk_size):
+    """Collect the "vertex x y z" records of an ASCII STL file"""
+    corners = GrowableArray(np.float64, 3, max(1024, os.path.getsize(filename) // 80))
+    with open(filename, "rb") as f:
+        for data in iter_line_chunks(f, chunk_size):
+            values = _parse_vertex_lines(np.frombuffer(data, dtype=np.uint8))
+            if len(values) > 0:
+                corners.append(values.reshape(-1, 3))
+    if len(corners) % 3:
+        raise ValueError("ASCII STL has an incomplete facet")
+    return corners.finish()
+
+
+def _parse_vertex_lines(buf):
+    """Parse the numbers after every "vertex" keyword in a block of lines
+
+    The keywords are found with array comparisons and the rest of their
+    lines are gathered and handed to one np.fromstring call, so no Python
+    code runs per line or per token.
+    """
+    # The keyword is followed by at least a newline, so candidates never
+    # run past the end of the block
+    candidates = np.flatnonzero(buf[:len(buf) - len(_VERTEX)] == _VERTEX[0])
+    if len(candidates) == 0:
+        return np.zeros(0)
+    matches = np.all(buf[candidates[:, None] + np.arange(len(_VERTEX))] == _VERTEX, axis=1)
+    keywords = candidates[matches]
+
+    # Only keywords that are the first token of their line and end in
+    # whitespace (not "vertex" inside a solid's name)
+    line_ends = np.flatnonzero(buf == ord("\n"))
+    lines = np.searchsorted(line_ends, keywords)
+    line_starts = np.where(lines > 0, line_ends[np.maximum(lines - 1, 0)] + 1, 0)
+    printable = np.zeros(len(buf) + 1, dtype=np.int64)
+    np.cumsum(buf > _SPACE, out=printable[1:])
+    first = printable[keywords] == printable[line_starts]
+    separated = buf[keywords + len(_VERTEX)] <= _SPACE
+    keywords, lines = keywords[first & separated], lines[first & separated]
+    if len(keywords) == 0:
+        return np.zeros(0)
+
+    # Everything from the end of the keyword up to and including the newline
+    starts = keywords + len(_VERTEX)
+    stops = line_ends[lines] + 1
+    lengths = stops - starts
+    offsets = np.zeros(len(lengths), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=offsets[1:])
+    text = buf[np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())]
+
+    values = np.fromstring(text.tobytes(), dtype=np.float64, sep=" ")
+    if len(values) != 3 * len(keywords):
+        raise ValueError("Malformed ASCII STL vertex")
+    return values
+
+
+def weld_vertices(corners, tolerance=DEFAULT_WELD_TOLERANCE):
+    """Merge coincident triangle corners into shared vertices
+
+    Positions are quantized to ``tolerance`` times the bounding box size and
+    deduplicated with np.unique. Returns the vertices (first corner of each
+    group) and (T, 3) faces; triangles that collapse are dropped.
+    """
+    corners = np.asarray(corners, dtype=float)
+    if len(corners) == 0:
+        return np.zeros((0, 3)), np.zeros((0, 3), dtype=np.int32)
+
+    low = corners.min(axis=0)
+    extent = max(float((corners.max(axis=0) - low).max()), 1e-30)
+    quantized = np.rint((corners - low) / (extent * tolerance)).astype(np.int64)
+
+    # Pack the three cell indices into one int64 key when they fit in 21
+    # bits each, which makes the unique a plain 1D sort
+    if quantized.max() < (1 << 21):
+        keys = (quantized[:, 0] << 42) | (quantized[:, 1] << 21) | quantized[:, 2]
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    else:
+        _, first, inverse = np.unique(quantized, axis=0, return_index=True, return_inverse=True)
+
+    faces = inverse.reshape(-1, 3).astype(np.int32)
+    valid = (faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 2] != faces[:, 0])
+    return corners[first], faces[valid]
+
+
+def write_stl(mesh, filename):
+    """Write a mesh as binary STL
+
+    Faces are fan-triangulated, the records are filled with array
+    operations and written with a single tofile call.
+    """
+    triangles, _ = mesh.faces.triangulate()
+    vertices = np.asarray(mesh.vertices, dtype=float).reshape(-1, 3)
+
+    records = np.zeros(len(triangles), dtype=STL_RECORD)
+    corners = vertices[triangles]
+    records["vertices"] = corners
+    normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    records["normal"] = normals / np.where(lengths > 0, lengths, 1.0)
+
+    header = np.zeros(80, dtype=np.uint8)
+    name = mesh.name.encode("ascii", "replace")[:80]
+    header[:len(name)] = np.frombuffer(name, dtype=np.uint8)
+
+    with open(filename, "wb") as f:
+        header.tofile(f)
+        np.array([len(records)], dtype="<u4").tofile(f)
+        records.tofile(f)
@@ -1,22 +1,232 @@
 import numpy as np
 from core.scene_object import SceneObject
+from core.face_array import FaceArray
+from core.half_edge import HalfEdgeMesh
+from core.bvh import BVH
 
 
 class Mesh(SceneObject):
     def __init__(self, name="Mesh"):
         super().__init__(name)
+        # Bumped whenever vertex positions or faces change, so derived data
+        # such as normals can be cached until the mesh is edited
+        self.vertex_version = 0
+        self.topology_version = 0
+        self._normals_cache = None
+        self._half_edge_cache = None
+        self._bvh_cache = None
+        self._vertex_selection = None
+
         self.vertices = np.array([], dtype=float)
         self.faces = []
-        self.edges = []
+        self.edges = FaceArray(width=2)
         self.materials = []
         self.uvs = []
         self.normals = []
         self.colors = []
+        # Object owning externally allocated array memory (such as a shared
+        # memory block), kept alive for as long as the mesh uses it
+        self.storage = None
+
+    @property
+    def vertices(self):
+        """Vertex positions as an (N, 3) array"""
+        return self._vertices
+
+    @vertices.setter
+    def vertices(self, vertices):
+        self._vertices = vertices
+        self.vertex_version += 1
+
+    @property
+    def faces(self):
+        """Faces as a FaceArray (compatible with the old list of tuples)"""
+        return self._faces
+
+    @faces.setter
+    def faces(self, faces):
+        self._faces = faces if isinstance(faces, FaceArray) else FaceArray(faces)
+        self.topology_version += 1
+
+    def mark_vertices_changed(self):
+        """Flag vertex positions as edited in place (e.g. mesh.vertices[i] = p)"""
+        self.vertex_version += 1
+
+    @property
+    def edges(self):
+        """Edges as an (E, 2) FaceArray (compatible with the old list of tuples)"""
+        return self._edges
+
+    @edges.setter
+    def edges(self, edges):
+        self._edges = edges if isinstance(edges, FaceArray) else FaceArray(edges, width=2)
+
+    @property
+    def face_offsets(self):
+        """CSR face offsets into face_indices"""
+        return self._faces.offsets
+
+    @property
+    def face_indices(self):
+        """CSR vertex indices of all faces back to back"""
+        return self._faces.indices
+
+    @property
+    def vertex_selection(self):
+        """Boolean mask of the selected vertices
+
+        Starts empty, and is cleared when the number of vertices changes.
+        """
+        if self._vertex_selection is None or len(self._vertex_selection) != len(self.vertices):
+            self._vertex_selection = np.zeros(len(self.vertices), dtype=bool)
+        return self._vertex_selection
+
+    @vertex_selection.setter
+    def vertex_selection(self, mask):
+        mask = np.asarray(mask, dtype=bool)
+        if mask.shape != (len(self.vertices),):
+            raise ValueError("Selection mask needs one entry per vertex")
+        self._vertex_selection = mask
+
+    def selected_vertex_indices(self):
+        """Sorted indices of the selected vertices"""
+        return np.flatnonzero(self.vertex_selection)
+
+    def get_half_edges(self):
+        """Get the half-edge topology of the current faces (cached)"""
+        if self._half_edge_cache is None or self._half_edge_cache[0] != self.topology_version:
+            self._half_edge_cache = (self.topology_version, HalfEdgeMesh.from_mesh(self))
+        return self._half_edge_cache[1]
+
+    def set_half_edges(self, half_edges, faces):
+        """Replace faces and edges with ones whose half-edges are already known"""
+        self.faces = faces
+        self.edges = half_edges.edge_vertices()
+        self._half_edge_cache = (self.topology_version, half_edges)
+
+    def get_edges(self):
+        """Edge endpoints as an (E, 2) array
+
+        The stored edges, or the edges of the faces when there are none
+        (the importers only fill vertices and faces).
+        """
+        if len(self.edges):
+            return self.edges.array
+        return self.get_half_edges().edge_vertices()
+
+    def get_edge_faces(self):
+        """Faces on both sides of every get_edges() edge as (E, 2), -1 if none"""
+        half_edges = self.get_half_edges()
+        edge_faces = half_edges.edge_faces()
+        if not len(self.edges):
+            return edge_faces
+
+        # Match the stored edges to the face edges by their endpoint pairs
+        count = max(len(self.vertices), 1)
+        face_edges = np.sort(half_edges.edge_vertices().astype(np.int64), axis=1)
+        face_keys = face_edges[:, 0] * count + face_edges[:, 1]
+        order = np.argsort(face_keys)
+        face_keys = face_keys[order]
+        stored = np.sort(self.edges.array.astype(np.int64), axis=1)
+        keys = stored[:, 0] * count + stored[:, 1]
+        slots = np.minimum(np.searchsorted(face_keys, keys), max(len(face_keys) - 1, 0))
+        found = face_keys[slots] == keys if len(face_keys) else np.zeros(len(keys), dtype=bool)
+
+        result = np.full((len(keys), 2), -1, dtype=edge_faces.dtype)
+        result[found] = edge_faces[order[slots[found]]]
+        return result
+
+    def get_bvh(self):
+        """Get a BVH over the triangulated faces
+
+        Rebuilt when the faces change and refit when only the vertices
+        moved (edit them through the setter or mark_vertices_changed).
+        """
+        cache = self._bvh_cache
+        if cache is None or cache[0] != self.topology_version:
+            self._bvh_cache = (self.topology_version, self.vertex_version, BVH.from_mesh(self))
+        elif cache[1] != self.vertex_version:
+            cache[2].refit(self.vertices)
+            self._bvh_cache = (cache[0], self.vertex_version, cache[2])
+        return self._bvh_cache[2]
+
+    @property
+    def nbytes(self):
+        """Memory used by the mesh arrays and derived caches, in bytes
+
+        Arrays mapped from a file or shared memory are counted too, since
+        their pages take memory once touched.
+        """
+        total = np.asarray(self.vertices).nbytes + self._faces.nbytes + self.edges.nbytes
+        for attribute in (self.normals, self.uvs, self.colors):
+            if isinstance(attribute, np.ndarray):
+                total += attribute.nbytes
+        if self._normals_cache is not None:
+            total += sum(normals.nbytes for normals in self._normals_cache[1])
+        if self._half_edge_cache is not None:
+            total += self._half_edge_cache[1].nbytes
+        if self._bvh_cache is not None:
+            total += self._bvh_cache[2].nbytes
+        return int(total)
+
+    @property
+    def face_normals(self):
+        """Unit face normals as an (F, 3) array, recalculated when stale"""
+        return self.calculate_normals()[0]
+
+    @property
+    def vertex_normals(self):
+        """Area-weighted unit vertex normals as an (N, 3) array"""
+        return self.calculate_normals()[1]
 
     def calculate_normals(self):
-        """Calculate face and vertex normals"""
-        # Will implement later
-        pass
+        """Calculate face and vertex normals
+
+        Face normals use Newell's method, so they are robust for n-gons and
+        slightly non-planar faces. Vertex normals are the area-weighted sum of
+        the normals of the faces around each vertex. Results are cached until
+        the vertex or topology version changes.
+
+        Returns a (face_normals, vertex_normals) tuple.
+        """
+        key = (self.vertex_version, self.topology_version)
+        if self._normals_cache is not None and self._normals_cache[0] == key:
+            return self._normals_cache[1]
+
+        vertices = np.asarray(self.vertices, dtype=float).reshape(-1, 3)
+        faces = self.faces
+
+        # Newell's method: sum over the edges (i, j) of each face of
+        # (y_i - y_j)(z_i + z_j), (z_i - z_j)(x_i + x_j), (x_i - x_j)(y_i + y_j)
+        corners = vertices[faces.indices]
+        following = corners[faces.next_corners]
+        diff = corners - following
+        total = corners + following
+        terms = np.empty_like(corners)
+        terms[:, 0] = diff[:, 1] * total[:, 2]
+        terms[:, 1] = diff[:, 2] * total[:, 0]
+        terms[:, 2] = diff[:, 0] * total[:, 1]
+
+        if faces.arity is not None:
+            area_normals = terms.reshape(len(faces), faces.arity, 3).sum(axis=1)
+        elif len(faces) > 0:
+            area_normals = np.add.reduceat(terms, faces.offsets[:-1], axis=0)
+        else:
+            area_normals = np.zeros((0, 3))
+
+        # The Newell vector's length is twice the face area, so summing the
+        # raw vectors per vertex gives area-weighted vertex normals
+        vertex_normals = np.empty((len(vertices), 3))
+        corner_normals = area_normals[faces.corner_faces]
+        for axis in range(3):
+            vertex_normals[:, axis] = np.bincount(
+                faces.indices, weights=corner_normals[:, axis], minlength=len(vertices))
+
+        face_normals = _normalize_rows(area_normals)
+        vertex_normals = _normalize_rows(vertex_normals)
+
+        self._normals_cache = (key, (face_normals, vertex_normals))
+        return face_normals, vertex_normals
 
     def create_primitive(self, primitive_type, size=1.0):
         """Create a primitive shape"""
@@ -29,7 +239,12 @@ class Mesh(SceneObject):
     # In mesh.py, update the _create_cube method:
 
     def _create_cube(self, size):
-        """Create a cube mesh"""
+        """Create a cube mesh
+
+        Faces are wound counter-clockwise seen from outside, so face normals
+        point outward and neighboring faces traverse shared edges in
+        opposite directions.
+        """
         half = size / 2  # Use full size - removed the 0.2 reduction factor
         self.vertices = np.array([
             [-half, -half, -half],  # 0: back bottom left
@@ -43,11 +258,11 @@ class Mesh(SceneObject):
         ], dtype=float)
 
         self.faces = [
-            (0, 1, 2, 3),  # back
+            (0, 3, 2, 1),  # back
             (4, 5, 6, 7),  # front
             (0, 1, 5, 4),  # bottom
             (2, 3, 7, 6),  # top
-            (0, 3, 7, 4),  # left
+            (0, 4, 7, 3),  # left
             (1, 2, 6, 5)  # right
         ]
 
@@ -61,14 +276,14 @@ class Mesh(SceneObject):
         """Create a sphere mesh using latitude/longitude method"""
         radius = size / 2
 
-        # Clear previous data
-        self.vertices = []
-        self.edges = []
-        self.faces = []
+        # Build plain lists first, then store them in compact form
+        vertices = []
+        edges = []
+        faces = []
 
         # Create vertices
         # Add top vertex
-        self.vertices.append([0, radius, 0])
+        vertices.append([0, radius, 0])
 
         # Create ring vertices
         for i in range(rings):
@@ -81,21 +296,18 @@ class Mesh(SceneObject):
                 y = radius * np.cos(phi)
                 z = radius * np.sin(phi) * np.sin(theta)
 
-                self.vertices.append([x, y, z])
+                vertices.append([x, y, z])
 
         # Add bottom vertex
-        self.vertices.append([0, -radius, 0])
-
-        # Convert vertices to numpy array
-        self.vertices = np.array(self.vertices, dtype=float)
+        vertices.append([0, -radius, 0])
 
         # Create edges and faces
         # Top cap
         for i in range(segments):
-            self.edges.append((0, i + 1))
+            edges.append((0, i + 1))
             next_i = (i + 1) % segments
-            self.edges.append((i + 1, next_i + 1))
-            self.faces.append((0, i + 1, next_i + 1))
+            edges.append((i + 1, next_i + 1))
+            faces.append((0, next_i + 1, i + 1))
 
         # Middle rings
         for ring in range(rings - 1):
@@ -109,18 +321,28 @@ class Mesh(SceneObject):
                 next_in_next_ring = next_ring_start + (i + 1) % segments
 
                 # Add edges
-                self.edges.append((current, next_in_ring))
-                self.edges.append((current, current_next_ring))
+                edges.append((current, next_in_ring))
+                edges.append((current, current_next_ring))
 
                 # Add face
-                self.faces.append((current, next_in_ring, next_in_next_ring, current_next_ring))
+                faces.append((current, next_in_ring, next_in_next_ring, current_next_ring))
 
         # Bottom cap
         bottom_idx = 1 + rings * segments
         for i in range(segments):
             ring_idx = 1 + (rings - 1) * segments + i
-            self.edges.append((ring_idx, bottom_idx))
+            edges.append((ring_idx, bottom_idx))
             next_i = (i + 1) % segments
             next_ring_idx = 1 + (rings - 1) * segments + next_i
-            self.edges.append((ring_idx, next_ring_idx))
-            self.faces.append((bottom_idx, next_ring_idx, ring_idx))
\ No newline at end of file
+            edges.append((ring_idx, next_ring_idx))
+            faces.append((bottom_idx, ring_idx, next_ring_idx))
+
+        self.vertices = np.array(vertices, dtype=float)
+        self.edges = edges
+        self.faces = faces
+
+
+def _normalize_rows(vectors):
+    """Normalize each row to unit length, leaving zero rows untouched"""
+    lengths = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(lengths > 0, lengths, 1.0)
@@ -1,17 +1,480 @@
-
 import numpy as np
+from core.face_array import FaceArray
+from core.half_edge import HalfEdgeMesh
+
 
 def extrude_face(mesh, face_idx, amount):
     """Extrude a face by a given amount"""
-    # Will implement later
-    pass
+    return extrude_faces(mesh, [face_idx], amount)
+
+
+def extrude_faces(mesh, face_indices, amount):
+    """Extrude a selection of faces as one region
+
+    Faces in the selection stay connected to each other: only vertices on the
+    border of the region (or shared with unselected faces) are duplicated,
+    and a side quad is added along every border edge. Vertices are moved
+    along the average normal of the selected faces around them. The mesh is
+    modified in place and returned.
+    """
+    face_indices = np.unique(np.asarray(face_indices, dtype=np.int64))
+    if len(face_indices) == 0:
+        return mesh
+
+    vertices = np.asarray(mesh.vertices, dtype=float)
+    faces = mesh.faces
+    topology = mesh.get_half_edges()
+    vertex_count = len(vertices)
+    origin = topology.vertex
+
+    selected = np.zeros(len(faces), dtype=bool)
+    selected[face_indices] = True
+    in_region = selected[topology.face]
+
+    # Border half-edges: selected side of an edge whose other side is
+    # unselected or missing
+    twin = topology.twin
+    other_selected = np.where(twin >= 0, selected[topology.face[np.maximum(twin, 0)]], False)
+    border = np.flatnonzero(in_region & ~other_selected)
+    starts = origin[border]
+    ends = origin[topology.next[border]]
+
+    region = np.bincount(origin[in_region], minlength=vertex_count) > 0
+    shared = np.bincount(origin[~in_region], minlength=vertex_count) > 0
+    on_border = np.zeros(vertex_count, dtype=bool)
+    on_border[starts] = True
+    on_border[ends] = True
+    duplicate = region & (shared | on_border)
+
+    # Offset direction: normalized sum of the selected face normals
+    face_normals = mesh.face_normals
+    directions = np.empty((vertex_count, 3))
+    for axis in range(3):
+        directions[:, axis] = np.bincount(
+            origin[in_region], weights=face_normals[topology.face[in_region], axis],
+            minlength=vertex_count)
+    lengths = np.linalg.norm(directions, axis=1, keepdims=True)
+    offsets = amount * directions / np.where(lengths > 0, lengths, 1.0)
+
+    duplicated = np.flatnonzero(duplicate)
+    remap = np.arange(vertex_count, dtype=np.int32)
+    remap[duplicated] = vertex_count + np.arange(len(duplicated), dtype=np.int32)
+
+    new_vertices = np.concatenate([vertices, vertices[duplicated] + offsets[duplicated]])
+    moved = np.flatnonzero(region & ~duplicate)
+    new_vertices[moved] += offsets[moved]
+
+    # Selected faces now use the moved copies; side quads run
+    # (a, b, b', a') so they share edge directions with both neighbors
+    indices = faces.indices.copy()
+    indices[in_region] = remap[indices[in_region]]
+    sides = np.stack([starts, ends, remap[ends], remap[starts]], axis=1)
+
+    offsets_csr = np.concatenate([faces.offsets, faces.offsets[-1] + 4 * np.arange(1, len(sides) + 1)])
+    new_faces = FaceArray.from_csr(offsets_csr, np.concatenate([indices, sides.ravel()]))
+    _replace_geometry(mesh, new_vertices, new_faces)
+    return mesh
+
 
 def bevel_edge(mesh, edge_idx, amount):
     """Bevel an edge by a given amount"""
-    # Will implement later
-    pass
+    return bevel_edges(mesh, [edge_idx], amount)
+
+
+def bevel_edges(mesh, edge_indices, amount):
+    """Chamfer a selection of edges with a single segment
+
+    ``edge_indices`` index ``mesh.get_edges()``. Each edge is replaced by a
+    new face between two offset copies of it, one in each of its faces.
+    Selected edges may form chains and loops: where two of them meet, all
+    faces on one side of the chain share one offset vertex, slid
+    ``amount`` along the unselected edge on that side (along their average
+    if there are several, or into the face between the two edges if there
+    are none). At the free ends of a chain the offset vertices slide along
+    the other edge of each of the two faces; an end with three edges is
+    moved onto the bevel, ends with more edges keep a corner at their old
+    position. Edges and their endpoints must be away from open boundaries,
+    and at most two selected edges may meet at a vertex. The mesh is
+    modified in place and returned.
+    """
+    edge_indices = np.unique(np.asarray(edge_indices, dtype=np.int64))
+    if len(edge_indices) == 0:
+        return mesh
+
+    vertices = np.asarray(mesh.vertices, dtype=float)
+    faces = mesh.faces
+    topology = mesh.get_half_edges()
+    origin = topology.vertex
+    next_half_edge = topology.next
+    prev = topology.prev
+    twin = topology.twin
+    vertex_count = len(vertices)
+
+    h = _find_half_edges(mesh, topology, edge_indices)
+    t = twin[h]
+    if np.any(t < 0):
+        raise ValueError("Only edges between two faces can be beveled")
+    selected = np.zeros(len(origin), dtype=bool)
+    selected[h] = True
+    selected[t] = True
+
+    # Every selected edge has one half-edge leaving each endpoint
+    selected_count = np.bincount(origin[selected], minlength=vertex_count)
+    if np.any(selected_count > 2):
+        raise ValueError("At most two beveled edges may meet at a vertex")
+    open_boundary = twin < 0
+    open_vertex = np.zeros(vertex_count, dtype=bool)
+    open_vertex[origin[open_boundary]] = True
+    open_vertex[origin[next_half_edge[open_boundary]]] = True
+    if np.any(open_vertex & (selected_count > 0)):
+        raise ValueError("Only edges away from open boundaries can be beveled")
+
+    # Corners are half-edges: corner h sits at origin[h] in face[h]. Around a
+    # vertex, rotating forward crosses the corner's incoming edge and
+    # rotating back crosses its outgoing edge
+    def rotate(corners):
+        return twin[prev[corners]]
+
+    def rotate_back(corners):
+        return next_half_edge[twin[corners]]
+
+    # Unit vectors from a corner's vertex along its outgoing/incoming edge
+    def to_next(corners):
+        return _normalize(vertices[origin[next_half_edge[corners]]] - vertices[origin[corners]])
+
+    def to_prev(corners):
+        return _normalize(vertices[origin[prev[corners]]] - vertices[origin[corners]])
+
+    # Each corner emits the vertex next to its incoming edge, then the one
+    # next to its outgoing edge (once if they are the same)
+    slot_in = origin.astype(np.int32)
+    slot_out = slot_in.copy()
+
+    # Chain vertices: the two selected edges split the faces around the
+    # vertex into two sectors. A corner's sector is named after the corner
+    # found by rotating back until the outgoing edge is selected
+    chain = np.flatnonzero(selected_count[origin] == 2)
+    head = np.arange(len(origin))
+    head[chain] = np.where(selected[chain], chain, rotate_back(chain))
+    while True:
+        jumped = head[head[chain]]
+        if np.array_equal(jumped, head[chain]):
+            break
+        head[chain] = jumped
+
+    heads = chain[selected[chain]]
+    heads = heads[np.argsort(origin[heads], kind="stable")]
+    sector = np.full(len(origin), -1, dtype=np.int64)
+    sector[heads] = np.arange(len(heads))
+    inner = chain[~selected[chain]]
+    inner_sector = sector[head[inner]]
+    inner_count = np.bincount(inner_sector, minlength=len(heads))
+    directions = _normalize(_sum_by_vertex(inner_sector, to_next(inner), len(heads)))
+    # A sector of one face: step along both selected edges into it
+    single = inner_count == 0
+    directions[single] = to_next(heads[single]) + to_prev(heads[single])
+    sector_positions = vertices[origin[heads]] + amount * directions
+
+    # The first sector of a vertex moves it, the second is a new vertex
+    keeps = np.zeros(len(heads), dtype=bool)
+    keeps[0::2] = True
+    sector_vertices = origin[heads].astype(np.int32)
+    sector_vertices[~keeps] = vertex_count + np.arange(len(heads) // 2, dtype=np.int32)
+    slot_in[chain] = sector_vertices[sector[head[chain]]]
+    slot_out[chain] = slot_in[chain]
+
+    # Chain ends: the corner before the edge (first face) and after it
+    # (second face) each get a vertex slid along their other edge, which
+    # the faces across those edges get spliced in next to the end vertex
+    first = np.flatnonzero(selected & (selected_count[origin] == 1))
+    second = next_half_edge[twin[first]]
+    across_first = rotate(first)
+    across_second = rotate_back(second)
+    if np.any(across_first == second):
+        raise ValueError("Beveled edge ends need at least three edges")
+    ends = origin[first]
+    simple = across_first == across_second
+    first_positions = vertices[ends] + amount * to_prev(first)
+    second_positions = vertices[ends] + amount * to_next(second)
+
+    base = vertex_count + len(heads) // 2
+    moved_end = ends.astype(np.int32)
+    moved_end[~simple] = base + np.arange(int((~simple).sum()), dtype=np.int32)
+    other_end = base + int((~simple).sum()) + np.arange(len(first), dtype=np.int32)
+    slot_in[first] = moved_end
+    slot_out[first] = moved_end
+    slot_in[second] = other_end
+    slot_out[second] = other_end
+    slot_out[across_first] = moved_end
+    slot_in[across_second] = other_end
+
+    new_vertices = np.concatenate([vertices, sector_positions[~keeps], first_positions[~simple],
+                                   second_positions])
+    new_vertices[origin[heads[keeps]]] = sector_positions[keeps]
+    new_vertices[ends[simple]] = first_positions[simple]
+
+    # Rebuilt faces, in the original face order
+    two = slot_in != slot_out
+    sizes = np.bincount(topology.face, weights=1 + two, minlength=len(faces)).astype(np.int64)
+    emit = np.stack([np.ones(len(origin), dtype=bool), two], axis=1)
+    corner_vertices = np.stack([slot_in, slot_out], axis=1)
+
+    # Bevel faces: second side, first side and the kept end corners
+    kept_corner = np.zeros(vertex_count, dtype=bool)
+    kept_corner[ends[~simple]] = True
+    a = origin[h]
+    b = origin[t]
+    bevel = np.stack([slot_in[next_half_edge[h]], slot_out[h], a,
+                      slot_in[next_half_edge[t]], slot_out[t], b], axis=1)
+    bevel_emit = np.ones_like(bevel, dtype=bool)
+    bevel_emit[:, 2] = kept_corner[a]
+    bevel_emit[:, 5] = kept_corner[b]
+
+    all_sizes = np.concatenate([sizes, bevel_emit.sum(axis=1)])
+    offsets = np.zeros(len(all_sizes) + 1, dtype=np.int64)
+    np.cumsum(all_sizes, out=offsets[1:])
+    indices = np.concatenate([corner_vertices[emit], bevel[bevel_emit]])
+
+    _replace_geometry(mesh, new_vertices, FaceArray.from_csr(offsets, indices))
+    return mesh
+
+
+def _find_half_edges(mesh, topology, edge_indices):
+    """Half-edge of each mesh.get_edges() entry, found by its endpoint pair"""
+    vertex_count = topology.vertex_count
+    edge_pairs = mesh.get_edges()[edge_indices].astype(np.int64)
+    wanted = edge_pairs.min(axis=1) * vertex_count + edge_pairs.max(axis=1)
+
+    ends = topology.edge_vertices().astype(np.int64)
+    keys = ends.min(axis=1) * vertex_count + ends.max(axis=1)
+    order = np.argsort(keys)
+    pos = np.minimum(np.searchsorted(keys[order], wanted), len(keys) - 1)
+    if np.any(keys[order][pos] != wanted):
+        raise ValueError("Edge is not part of any face")
+    return topology.edge_half_edge[order[pos]]
+
+
+def _normalize(vectors):
+    """Scale rows to unit length, leaving zero rows as they are"""
+    lengths = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(lengths > 0, lengths, 1.0)
+
+
+def _replace_geometry(mesh, vertices, faces):
+    """Store new vertices and faces and rebuild the edge list"""
+    mesh.vertices = vertices
+    mesh.faces = faces
+    mesh.edges = mesh.get_half_edges().edge_vertices()
+
 
 def subdivide(mesh, level=1):
-    """Subdivide a mesh to increase detail"""
-    # Will implement later
-    pass
+    """Subdivide a mesh to increase detail
+
+    Pure triangle meshes use Loop subdivision, everything else uses
+    Catmull-Clark (which turns every face into quads). Each level is a
+    handful of array operations over the half-edge structure, and the
+    half-edges of the result are derived from the previous level instead
+    of being rebuilt. The mesh is modified in place and returned.
+    """
+    if level <= 0 or len(mesh.faces) == 0:
+        return mesh
+
+    vertices = np.asarray(mesh.vertices, dtype=float)
+    triangles = mesh.faces.arity == 3
+    topology = mesh.get_half_edges()
+
+    for _ in range(level):
+        if triangles:
+            vertices, topology = _loop_step(vertices, topology)
+        else:
+            vertices, topology = _catmull_clark_step(vertices, topology)
+
+    width = 3 if triangles else 4
+    mesh.vertices = vertices
+    mesh.set_half_edges(topology, FaceArray(topology.vertex.reshape(-1, width)))
+    return mesh
+
+
+def _edge_arrays(topology):
+    """Per-edge first half-edge, endpoints, twin and boundary flag"""
+    half_edges = topology.edge_half_edge
+    twins = topology.twin[half_edges]
+    starts = topology.vertex[half_edges]
+    ends = topology.vertex[topology.next[half_edges]]
+    return half_edges, starts, ends, twins, twins < 0
+
+
+def _sum_by_vertex(indices, values, count):
+    """Sum rows of values into count buckets"""
+    result = np.empty((count, values.shape[1]))
+    for axis in range(values.shape[1]):
+        result[:, axis] = np.bincount(indices, weights=values[:, axis], minlength=count)
+    return result
+
+
+def _boundary_vertex_points(vertices, starts, ends, boundary, smooth):
+    """Apply the boundary curve rule (6 P + A + B) / 8 along open edges
+
+    Vertices with exactly two boundary edges get the rule, vertices where
+    more boundaries meet keep their position. Updates smooth in place.
+    """
+    count = len(vertices)
+    b_starts, b_ends = starts[boundary], ends[boundary]
+    ends_all = np.concatenate([b_starts, b_ends])
+    neighbors = vertices[np.concatenate([b_ends, b_starts])]
+    boundary_count = np.bincount(ends_all, minlength=count)
+    neighbor_sum = _sum_by_vertex(ends_all, neighbors, count)
+
+    curve = boundary_count == 2
+    smooth[curve] = (6 * vertices[curve] + neighbor_sum[curve]) / 8
+    corner = boundary_count > 2
+    smooth[corner] = vertices[corner]
+
+
+def _twin_through(twin, lookup, scale, offset):
+    """Map twins h -> scale * lookup[twin[h]] + offset, keeping -1 for none"""
+    has_twin = twin >= 0
+    return np.where(has_twin, scale * lookup[np.maximum(twin, 0)] + offset, -1).astype(np.int32)
+
+
+def _catmull_clark_step(vertices, topology):
+    """One level of Catmull-Clark subdivision
+
+    Returns the new vertices and the half-edges of the new quads. Corner h
+    of the old mesh becomes quad h with half-edges 4h .. 4h + 3.
+    """
+    vertex_count = len(vertices)
+    face_count = topology.face_count
+    edge_count = topology.edge_count
+    half_edge_count = topology.half_edge_count
+    origin = topology.vertex
+    corner_face = topology.face
+    next_half_edge = topology.next
+    prev = topology.prev
+
+    # Face points: centroid of every face
+    sizes = np.bincount(corner_face, minlength=face_count)
+    face_points = _sum_by_vertex(corner_face, vertices[origin], face_count)
+    face_points /= np.maximum(sizes, 1)[:, None]
+
+    # Edge points: average of the endpoints and the two adjacent face points,
+    # or the plain midpoint on a boundary
+    half_edges, starts, ends, twins, boundary = _edge_arrays(topology)
+    midpoints = (vertices[starts] + vertices[ends]) / 2
+    other_face = corner_face[np.maximum(twins, 0)]
+    edge_points = np.where(
+        boundary[:, None], midpoints,
+        (midpoints + (face_points[corner_face[half_edges]] + face_points[other_face]) / 2) / 2)
+
+    # Vertex points: (Q + 2R + (n - 3) P) / n, with Q the average of the
+    # surrounding face points and R the average of the edge midpoints
+    ends_all = np.concatenate([starts, ends])
+    valence = np.bincount(ends_all, minlength=vertex_count)
+    face_valence = np.bincount(origin, minlength=vertex_count)
+    q = _sum_by_vertex(origin, face_points[corner_face], vertex_count)
+    r = _sum_by_vertex(ends_all, np.concatenate([midpoints, midpoints]), vertex_count)
+    n = np.maximum(valence, 1)[:, None].astype(float)
+    smooth = (q / np.maximum(face_valence, 1)[:, None] + 2 * r / n + (n - 3) * vertices) / n
+
+    # Isolated vertices stay where they are
+    smooth[valence == 0] = vertices[valence == 0]
+    _boundary_vertex_points(vertices, starts, ends, boundary, smooth)
+
+    # Quad h is (vertex, edge point after it, face point, edge point before it)
+    edge_base = vertex_count
+    face_base = vertex_count + edge_count
+    new_vertex = np.empty((half_edge_count, 4), dtype=np.int32)
+    new_vertex[:, 0] = origin
+    new_vertex[:, 1] = edge_base + topology.edge
+    new_vertex[:, 2] = face_base + corner_face
+    new_vertex[:, 3] = edge_base + topology.edge[prev]
+
+    quad_starts = 4 * np.arange(half_edge_count, dtype=np.int32)
+    new_next = quad_starts[:, None] + np.array([1, 2, 3, 0], dtype=np.int32)
+
+    # Outer half-edges pair with the neighboring quads across the old edge,
+    # inner ones with the quads before and after in the same old face
+    new_twin = np.empty((half_edge_count, 4), dtype=np.int32)
+    new_twin[:, 0] = _twin_through(topology.twin, next_half_edge, 4, 3)
+    new_twin[:, 1] = 4 * next_half_edge + 2
+    new_twin[:, 2] = 4 * prev + 1
+    new_twin[:, 3] = _twin_through(topology.twin[prev], np.arange(half_edge_count), 4, 0)
+
+    new_topology = HalfEdgeMesh(
+        new_vertex.ravel(), new_next.ravel(), new_twin.ravel(),
+        np.repeat(np.arange(half_edge_count, dtype=np.int32), 4), quad_starts,
+        vertex_count + edge_count + face_count)
+    return np.concatenate([smooth, edge_points, face_points]), new_topology
+
+
+def _loop_step(vertices, topology):
+    """One level of Loop subdivision on a triangle mesh
+
+    Returns the new vertices and the half-edges of the new triangles. Corner
+    h of the old mesh becomes triangle h, and the middle of old face f
+    becomes triangle H + f.
+    """
+    vertex_count = len(vertices)
+    face_count = topology.face_count
+    half_edge_count = topology.half_edge_count
+    origin = topology.vertex
+    next_half_edge = topology.next
+    prev = topology.prev
+
+    # Edge points: 3/8 of each endpoint plus 1/8 of the two opposite
+    # corners, or the plain midpoint on a boundary
+    half_edges, starts, ends, twins, boundary = _edge_arrays(topology)
+    opposite = vertices[origin[prev[half_edges]]]
+    other_opposite = vertices[origin[prev[np.maximum(twins, 0)]]]
+    edge_sum = vertices[starts] + vertices[ends]
+    edge_points = np.where(
+        boundary[:, None], edge_sum / 2,
+        0.375 * edge_sum + 0.125 * (opposite + other_opposite))
+
+    # Vertex points: (1 - n * beta) P + beta * sum of neighbors (Loop's beta)
+    ends_all = np.concatenate([starts, ends])
+    valence = np.bincount(ends_all, minlength=vertex_count)
+    neighbor_sum = _sum_by_vertex(ends_all, vertices[np.concatenate([ends, starts])], vertex_count)
+    n = np.maximum(valence, 1).astype(float)
+    beta = (0.625 - (0.375 + 0.25 * np.cos(2 * np.pi / n)) ** 2) / n
+    smooth = (1 - n * beta)[:, None] * vertices + beta[:, None] * neighbor_sum
+
+    smooth[valence == 0] = vertices[valence == 0]
+    _boundary_vertex_points(vertices, starts, ends, boundary, smooth)
+
+    # Position of every half-edge within its triangle (0, 1 or 2)
+    first = topology.face_half_edge
+    position = np.empty(half_edge_count, dtype=np.int32)
+    position[first] = 0
+    position[next_half_edge[first]] = 1
+    position[next_half_edge[next_half_edge[first]]] = 2
+    center_slot = 3 * topology.face + position
+
+    edge_base = vertex_count
+    center_base = 3 * half_edge_count
+    new_count = center_base + 3 * face_count
+
+    # Corner triangle h is (vertex, edge point after it, edge point before it);
+    # the center triangle joins the three edge points of the old face
+    new_vertex = np.empty(new_count, dtype=np.int32)
+    corners = new_vertex[:center_base].reshape(-1, 3)
+    corners[:, 0] = origin
+    corners[:, 1] = edge_base + topology.edge
+    corners[:, 2] = edge_base + topology.edge[prev]
+    new_vertex[center_base + center_slot] = edge_base + topology.edge
+
+    triangle_starts = 3 * np.arange(half_edge_count + face_count, dtype=np.int32)
+    new_next = (triangle_starts[:, None] + np.array([1, 2, 0], dtype=np.int32)).ravel()
+
+    new_twin = np.empty(new_count, dtype=np.int32)
+    corner_twins = new_twin[:center_base].reshape(-1, 3)
+    corner_twins[:, 0] = _twin_through(topology.twin, next_half_edge, 3, 2)
+    corner_twins[:, 1] = center_base + center_slot[prev]
+    corner_twins[:, 2] = _twin_through(topology.twin[prev], np.arange(half_edge_count), 3, 0)
+    new_twin[center_base + center_slot] = 3 * next_half_edge + 1
+
+    new_topology = HalfEdgeMesh(
+        new_vertex, new_next, new_twin,
+        np.repeat(np.arange(half_edge_count + face_count, dtype=np.int32), 3), triangle_starts,
+        vertex_count + topology.edge_count)
+    return np.concatenate([smooth, edge_points]), new_topology
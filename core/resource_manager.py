@@ -1,18 +1,365 @@
+import hashlib
+import itertools
+import os
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from core.io import meshbin
+from core.io.mesh_io import MeshIO
+
+# Source formats that are converted to .meshbin on first load
+CACHED_FORMATS = (".obj", ".stl")
+
+# Priorities for load_resource_async; lower values are loaded first
+PRIORITY_URGENT = 0  # Something the user just asked for
+PRIORITY_NORMAL = 50
+PRIORITY_PREFETCH = 100  # Speculative loads
+
 
 class ResourceManager:
-    def __init__(self):
-        self.resources = {}
+    """Loaded resources kept in a least-recently-used cache
+
+    Every resource is charged its ``nbytes``. Once the total goes over
+    ``memory_budget`` (None for no limit) the least recently used resources
+    that are not pinned are evicted. An evicted resource remembers where it
+    came from, so get_resource loads it again on the next request; for
+    imported meshes that is a memory map of the .meshbin cache entry.
+    """
+
+    def __init__(self, cache_dir=None, cache_imports=True, memory_budget=None, loader_threads=2):
+        # Ordered from least to most recently used
+        self.resources = OrderedDict()
+        self.memory_budget = memory_budget
+        self.pinned = set()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "reloads": 0}
+        self._sizes = {}
+        self._sources = {}  # Resource id -> resource type, for reloading
+        # Imported meshes are stored here as .meshbin files so the next load
+        # is a memory map instead of a parse
+        self.cache_dir = cache_dir or os.path.join(os.path.expanduser("~"), ".cache", "mesh_editor")
+        self.cache_imports = cache_imports
+
+        # Background loading: a priority queue of jobs for the loader
+        # threads, and a queue of finished loads for the main thread
+        self.loader_threads = loader_threads
+        self._jobs = queue.PriorityQueue()
+        self._completed = queue.Queue()
+        self._job_order = itertools.count()  # FIFO among equal priorities
+        self._pending = {}  # Resource id -> Future of the queued load
+        self._workers = []
+        self._lock = threading.Lock()
 
     def load_resource(self, resource_type, path):
-        """Load a resource from disk"""
-        # Will implement later
-        pass
+        """Load a resource from disk
+
+        Meshes are loaded through MeshIO. OBJ and STL files are converted to
+        .meshbin in the cache directory on first load and opened from there
+        afterwards, as long as the source file's size and mtime match. The
+        absolute path is the resource id for get_resource.
+        """
+        if resource_type != "mesh":
+            raise ValueError(f"Unsupported resource type: {resource_type}")
+
+        resource_id = os.path.abspath(path)
+        if resource_id in self.resources:
+            self.stats["hits"] += 1
+            return self._touch(resource_id)
+
+        self.stats["misses"] += 1
+        resource = self._load_mesh(resource_id)
+        self._store(resource_id, resource_type, resource)
+        return resource
+
+    def load_resources(self, resource_type, paths, max_workers=None, progress=None):
+        """Load several resources, importing uncached files in parallel
+
+        Files that are already loaded or have a valid .meshbin cache entry
+        are opened directly; the rest go through MeshIO.import_batch and are
+        cached afterwards. Returns the resources in the order of ``paths``.
+        """
+        if resource_type != "mesh":
+            raise ValueError(f"Unsupported resource type: {resource_type}")
+
+        resource_ids = [os.path.abspath(path) for path in paths]
+        loaded = {}
+        pending = []
+        for resource_id in resource_ids:
+            if resource_id in loaded or resource_id in pending:
+                continue
+            if resource_id in self.resources:
+                self.stats["hits"] += 1
+                loaded[resource_id] = self._touch(resource_id)
+                continue
+            self.stats["misses"] += 1
+            cached = self._open_cached_mesh(resource_id) if self._is_cached_format(resource_id) else None
+            if cached is not None:
+                loaded[resource_id] = cached
+                self._store(resource_id, resource_type, cached)
+            else:
+                pending.append(resource_id)
+
+        if pending:
+            meshes = MeshIO.import_batch(pending, max_workers, progress)
+            for resource_id, mesh in zip(pending, meshes):
+                if self._is_cached_format(resource_id):
+                    self._write_cache(resource_id, mesh)
+                loaded[resource_id] = mesh
+                self._store(resource_id, resource_type, mesh)
+
+        # Keep the local references: with a small budget some of these may
+        # already have been evicted again
+        return [loaded[resource_id] for resource_id in resource_ids]
+
+    def load_resource_async(self, resource_type, path, priority=PRIORITY_NORMAL):
+        """Load a resource on a background thread
+
+        Returns a concurrent.futures.Future for the resource. Lower
+        ``priority`` values are loaded first, so a file the user just picked
+        (PRIORITY_URGENT) overtakes queued prefetches; requesting a file
+        that is already queued moves it up if the new priority is more
+        urgent. Cancelling the future before it starts drops the load.
+
+        The file is read on a loader thread, but the resource is only added
+        to the cache and the future only completes (running its done
+        callbacks) when the main thread calls process_completed, so waiting
+        on the future from the main thread would block forever.
+        """
+        if resource_type != "mesh":
+            raise ValueError(f"Unsupported resource type: {resource_type}")
+
+        resource_id = os.path.abspath(path)
+        if resource_id in self.resources:
+            self.stats["hits"] += 1
+            future = Future()
+            future.set_result(self._touch(resource_id))
+            return future
+
+        request = self._pending.get(resource_id)
+        if request is None or request.future.cancelled():
+            self.stats["misses"] += 1
+            request = _LoadRequest(resource_id, resource_type, priority)
+            self._pending[resource_id] = request
+        elif priority < request.priority:
+            # Queue the request again with the more urgent priority; the
+            # loader that reaches either entry first does the work
+            request.priority = priority
+        else:
+            return request.future
+
+        self._jobs.put((priority, next(self._job_order), request))
+        self._start_workers()
+        return request.future
+
+    def process_completed(self):
+        """Deliver finished background loads; call once per frame
+
+        Each loaded resource is stored in the cache and its future is
+        completed here, on the calling thread. Returns the ids of the
+        resources that finished loading.
+        """
+        finished = []
+        while True:
+            try:
+                request, resource, error = self._completed.get_nowait()
+            except queue.Empty:
+                break
+            if self._pending.get(request.resource_id) is request:
+                del self._pending[request.resource_id]
+            if error is not None:
+                request.future.set_exception(error)
+                continue
+            self._store(request.resource_id, request.resource_type, resource)
+            request.future.set_result(resource)
+            finished.append(request.resource_id)
+        return finished
+
+    def shutdown(self):
+        """Stop the loader threads, cancelling loads that have not started"""
+        for request in self._pending.values():
+            request.future.cancel()
+        for _ in self._workers:
+            self._jobs.put((float("inf"), next(self._job_order), None))
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
+
+    def _start_workers(self):
+        while len(self._workers) < self.loader_threads:
+            worker = threading.Thread(target=self._load_jobs, name="ResourceLoader", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _load_jobs(self):
+        """Loader thread: load queued files until a stop job arrives"""
+        while True:
+            _, _, request = self._jobs.get()
+            if request is None:
+                return
+
+            # Skip the second queue entry of a reprioritized request
+            with self._lock:
+                if request.started:
+                    continue
+                request.started = True
+            if not request.future.set_running_or_notify_cancel():
+                continue  # Cancelled while queued
+
+            resource, error = None, None
+            try:
+                resource = self._load_mesh(request.resource_id)
+            except Exception as exception:
+                error = exception
+            self._completed.put((request, resource, error))
+
+    def cache_path(self, path):
+        """Location of the .meshbin cache entry for a source file"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        key = hashlib.sha1(f"{path}|{stat.st_size}|{stat.st_mtime_ns}".encode("utf-8")).hexdigest()[:16]
+        stem = os.path.splitext(os.path.basename(path))[0]
+        return os.path.join(self.cache_dir, f"{stem}-{key}{meshbin.EXTENSION}")
+
+    def _is_cached_format(self, path):
+        return self.cache_imports and os.path.splitext(path)[1].lower() in CACHED_FORMATS
+
+    def _source_identity(self, path):
+        stat = os.stat(path)
+        return {"path": path, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def _open_cached_mesh(self, path):
+        """Open the cached copy of a mesh file, or return None if there is none"""
+        cached = self.cache_path(path)
+        if not os.path.exists(cached):
+            return None
+        try:
+            if meshbin.read_header(cached)["metadata"].get("source") == self._source_identity(path):
+                return meshbin.read_meshbin(cached)
+        except (OSError, ValueError):
+            pass  # Unreadable cache entry; it is overwritten by the next import
+        return None
+
+    def _write_cache(self, path, mesh):
+        """Store an imported mesh in the cache directory"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            meshbin.write_meshbin(mesh, self.cache_path(path), {"source": self._source_identity(path)})
+        except OSError:
+            pass  # Caching is an optimization; a read-only cache is not an error
+
+    def _load_mesh(self, path):
+        if self._is_cached_format(path):
+            return self._load_cached_mesh(path)
+        return MeshIO.import_file(path)
+
+    def _load_cached_mesh(self, path):
+        """Open the cached copy of a mesh file, creating it if needed"""
+        mesh = self._open_cached_mesh(path)
+        if mesh is None:
+            mesh = MeshIO.import_file(path)
+            self._write_cache(path, mesh)
+        return mesh
 
     def get_resource(self, resource_id):
-        """Get a loaded resource"""
-        return self.resources.get(resource_id)
+        """Get a loaded resource, reloading it if it was evicted
+
+        Returns None for ids that were never loaded or were unloaded.
+        """
+        if resource_id in self.resources:
+            self.stats["hits"] += 1
+            return self._touch(resource_id)
+
+        self.stats["misses"] += 1
+        if resource_id not in self._sources:
+            return None
+        self.stats["reloads"] += 1
+        resource = self._load_mesh(resource_id)
+        self._store(resource_id, self._sources[resource_id], resource)
+        return resource
 
     def unload_resource(self, resource_id):
-        """Unload a resource to free memory"""
+        """Unload a resource to free memory
+
+        Unlike an eviction this forgets the resource, so get_resource
+        returns None for it afterwards.
+        """
+        self._sources.pop(resource_id, None)
+        self.pinned.discard(resource_id)
+        if resource_id in self.resources:
+            del self.resources[resource_id]
+            del self._sizes[resource_id]
+
+    def pin_resource(self, resource_id):
+        """Keep a loaded resource in memory regardless of the budget"""
         if resource_id in self.resources:
+            self.pinned.add(resource_id)
+
+    def unpin_resource(self, resource_id):
+        """Let a pinned resource be evicted again"""
+        self.pinned.discard(resource_id)
+        self._evict()
+
+    def set_memory_budget(self, memory_budget):
+        """Change the budget in bytes (None for no limit), evicting as needed"""
+        self.memory_budget = memory_budget
+        self._evict()
+
+    @property
+    def memory_usage(self):
+        """Bytes charged for the loaded resources
+
+        Sizes are measured when a resource is stored or used, so edits made
+        since then (such as a subdivision) are picked up on the next access.
+        """
+        return sum(self._sizes.values())
+
+    def _touch(self, resource_id):
+        """Mark a resource as most recently used and return it"""
+        self.resources.move_to_end(resource_id)
+        resource = self.resources[resource_id]
+        self._sizes[resource_id] = _resource_size(resource)
+        self._evict(keep=resource_id)
+        return resource
+
+    def _store(self, resource_id, resource_type, resource):
+        self.resources[resource_id] = resource
+        self.resources.move_to_end(resource_id)
+        self._sizes[resource_id] = _resource_size(resource)
+        self._sources[resource_id] = resource_type
+        self._evict(keep=resource_id)
+
+    def _evict(self, keep=None):
+        """Drop least recently used resources until the budget is met
+
+        Pinned resources and ``keep`` (the one just requested, which would
+        only be loaded again right away) are never evicted. Evicted
+        resources stay in _sources so they can be reloaded.
+        """
+        if self.memory_budget is None:
+            return
+        usage = self.memory_usage
+        for resource_id in list(self.resources):
+            if usage <= self.memory_budget:
+                break
+            if resource_id in self.pinned or resource_id == keep:
+                continue
+            usage -= self._sizes.pop(resource_id)
             del self.resources[resource_id]
+            self.stats["evictions"] += 1
+
+
+class _LoadRequest:
+    """A background load and the future it completes"""
+
+    def __init__(self, resource_id, resource_type, priority):
+        self.resource_id = resource_id
+        self.resource_type = resource_type
+        self.priority = priority
+        self.future = Future()
+        self.started = False
+
+
+def _resource_size(resource):
+    """Bytes a resource reports through its nbytes attribute (0 if none)"""
+    return int(getattr(resource, "nbytes", 0))
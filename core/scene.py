@@ -1,9 +1,12 @@
 
+from core.scene_graph import SceneGraph
 from core.scene_object import SceneObject
 
 class Scene:
     def __init__(self):
         self.root = SceneObject("Root")
+        # Flat arrays mirroring the hierarchy under root
+        self.graph = SceneGraph(self.root)
         self.selected_objects = []
         self.active_camera = None
         self.lights = []
@@ -21,8 +24,10 @@ class Scene:
             obj.parent.remove_child(obj)
 
     def update(self, dt):
-        """Update all objects in the scene"""
-        self.root.update(dt)
+        """Update all objects in the scene, then their world matrices"""
+        for obj in self.graph.updatable:
+            obj.update(dt)
+        self.graph.update()
 
     def select_object(self, obj, add_to_selection=False):
         """Select an object in the scene"""
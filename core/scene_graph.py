@@ -0,0 +1,233 @@
+
+import numpy as np
+
+from core.io.buffers import GrowableArray
+from core.scene_object import SceneObject
+from core.transform import compose_trs
+
+
+class SceneGraph:
+    """Flattened array copy of a scene hierarchy
+
+    Every object under ``root`` (including the root) gets a slot with its
+    parent slot, depth, local position/rotation/scale, local matrix and
+    world matrix. SceneObject.add_child and remove_child keep the arrays in
+    sync: added subtrees are appended and removed ones leave holes that are
+    compacted once they make up half of the slots. Transform edits only flag
+    their slot, and update() recomputes the world matrices of the flagged
+    subtrees level by level, one batched matmul per depth.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.rebuild()
+
+    def rebuild(self):
+        """Rebuild all arrays from the hierarchy, dropping holes"""
+        for obj in getattr(self, "objects", ()):
+            if obj is not None:
+                obj._scene_graph = None
+
+        self.objects = []
+        self._parent = GrowableArray(np.int32)
+        self._depth = GrowableArray(np.int32)
+        self._alive = GrowableArray(bool)
+        self._custom_update = GrowableArray(bool)
+        self._positions = GrowableArray(np.float64, 3)
+        self._rotations = GrowableArray(np.float64, 3)
+        self._scales = GrowableArray(np.float64, 3)
+        self._local = GrowableArray(np.float64, 16)
+        self._world = GrowableArray(np.float64, 16)
+        self._changed = set()
+        self._dead = 0
+        self._levels = None
+        self.add_subtree(self.root)
+
+    # ------------------------------------------------------------------
+    # Arrays
+    # ------------------------------------------------------------------
+    @property
+    def parent(self):
+        """Parent slot of every slot (-1 for the root)"""
+        return self._parent.view()
+
+    @property
+    def depth(self):
+        return self._depth.view()
+
+    @property
+    def alive(self):
+        """False for the holes left by removed objects"""
+        return self._alive.view()
+
+    @property
+    def positions(self):
+        return self._positions.view()
+
+    @property
+    def rotations(self):
+        return self._rotations.view()
+
+    @property
+    def scales(self):
+        return self._scales.view()
+
+    @property
+    def local_matrices(self):
+        return self._local.view().reshape(-1, 4, 4)
+
+    @property
+    def world_matrices(self):
+        """(N, 4, 4) world matrices, current as of the last update()"""
+        return self._world.view().reshape(-1, 4, 4)
+
+    # ------------------------------------------------------------------
+    # Structure
+    # ------------------------------------------------------------------
+    def add_subtree(self, obj):
+        """Append slots for obj and its descendants (parents first)"""
+        if obj.parent is not None and obj.parent._scene_graph is self:
+            parent_index = obj.parent._graph_index
+            depth = int(self._depth.view()[parent_index]) + 1
+        else:
+            parent_index, depth = -1, 0
+
+        objects, parents, depths = [], [], []
+        stack = [(obj, parent_index, depth)]
+        while stack:
+            obj, parent_index, depth = stack.pop()
+            index = len(self.objects) + len(objects)
+            objects.append(obj)
+            parents.append(parent_index)
+            depths.append(depth)
+            obj._scene_graph = self
+            obj._graph_index = index
+            stack.extend((child, index, depth + 1) for child in reversed(obj.children))
+
+        first = len(self.objects)
+        self.objects.extend(objects)
+        self._parent.append(parents)
+        self._depth.append(depths)
+        self._alive.append(np.ones(len(objects), dtype=bool))
+        self._custom_update.append([type(obj).update is not SceneObject.update for obj in objects])
+        for array in (self._positions, self._rotations, self._scales, self._local, self._world):
+            array.append(np.zeros((len(objects), array.columns)))
+        self._changed.update(range(first, len(self.objects)))
+        self._levels = None
+
+    def remove_subtree(self, obj):
+        """Free the slots of obj and its descendants"""
+        alive = self._alive.view()
+        stack = [obj]
+        while stack:
+            obj = stack.pop()
+            if obj._scene_graph is not self:
+                continue
+            index = obj._graph_index
+            alive[index] = False
+            self.objects[index] = None
+            self._changed.discard(index)
+            obj._scene_graph = None
+            self._dead += 1
+            stack.extend(obj.children)
+        self._levels = None
+
+        if self._dead > len(self.objects) // 2:
+            self.rebuild()
+
+    def transform_changed(self, obj):
+        """Flag an object's local transform for the next update()"""
+        self._changed.add(obj._graph_index)
+
+    def _build_levels(self):
+        """Group live slots by depth and find the objects update(dt) starts at"""
+        alive_slots = np.flatnonzero(self.alive)
+        depth = self.depth[alive_slots]
+        order = alive_slots[np.argsort(depth, kind="stable")]
+        counts = np.bincount(depth) if len(depth) else np.zeros(0, dtype=np.int64)
+        self._levels = [level for level in np.split(order, np.cumsum(counts)[:-1]) if len(level)]
+
+        # SceneObject.update recurses into the children, so only objects
+        # with their own update method whose ancestors all use the default
+        # one need to be called; the rest are reached through them
+        parent = self.parent
+        custom = self._custom_update.view()
+        covered = np.zeros(len(self.objects), dtype=bool)
+        for level in self._levels[1:]:
+            parents = parent[level]
+            covered[level] = covered[parents] | custom[parents]
+        starts = np.flatnonzero(custom & ~covered & self.alive)
+        self._updatable = [self.objects[i] for i in starts.tolist()]
+        self._drawable = [obj for obj in self.objects
+                          if obj is not None and hasattr(obj, 'vertices') and hasattr(obj, 'edges')]
+
+    def levels(self):
+        """Live slots grouped by depth, root level first"""
+        if self._levels is None:
+            self._build_levels()
+        return self._levels
+
+    @property
+    def updatable(self):
+        """Objects Scene.update calls update(dt) on"""
+        self.levels()
+        return self._updatable
+
+    @property
+    def drawable(self):
+        """Mesh-like objects (with vertices and edges) in slot order"""
+        self.levels()
+        return self._drawable
+
+    # ------------------------------------------------------------------
+    # Evaluation
+    # ------------------------------------------------------------------
+    def update(self):
+        """Recompute the world matrices of changed objects and their subtrees
+
+        Returns the number of world matrices that were recomputed.
+        """
+        levels = self.levels()
+        if not self._changed:
+            return 0
+
+        changed = np.fromiter(self._changed, dtype=np.int64, count=len(self._changed))
+        changed.sort()
+        self._changed = set()
+        positions, rotations, scales = self.positions, self.rotations, self.scales
+        for index in changed.tolist():
+            transform = self.objects[index].transform
+            positions[index] = transform.position
+            rotations[index] = transform.rotation
+            scales[index] = transform.scale
+        local = self.local_matrices
+        local[changed] = compose_trs(positions[changed], rotations[changed], scales[changed])
+
+        # A slot is dirty if its own transform or any ancestor's changed;
+        # parents are always finished a level before their children
+        dirty = np.zeros(len(self.objects), dtype=bool)
+        dirty[changed] = True
+        parent = self.parent
+        world = self.world_matrices
+        updated = 0
+        for level in levels:
+            parents = parent[level]
+            has_parent = parents >= 0
+            level_dirty = dirty[level]
+            level_dirty[has_parent] |= dirty[parents[has_parent]]
+            dirty[level] = level_dirty
+
+            slots = level[level_dirty]
+            if len(slots) == 0:
+                continue
+            slot_parents = parent[slots]
+            roots = slot_parents < 0
+            world[slots[roots]] = local[slots[roots]]
+            children = slots[~roots]
+            world[children] = world[slot_parents[~roots]] @ local[children]
+            updated += len(slots)
+        return updated
+
+    def get_world_matrix(self, obj):
+        """World matrix of an object in this graph, as of the last update()"""
+        return self.world_matrices[obj._graph_index]
@@ -1,6 +1,6 @@
 
 import numpy as np
-from core.transform import Transform, combine_transforms
+from core.transform import Transform
 
 class SceneObject:
     def __init__(self, name="Object"):
@@ -9,27 +9,91 @@ class SceneObject:
         self.children = []
         self.visible = True
         self.selected = False
+        # World matrix cache. A dirty object always has a dirty subtree,
+        # so invalidation stops at the first object that is already dirty
+        self._world_matrix = None
+        self._world_dirty = True
+        # Flattened SceneGraph this object belongs to, and its slot there
+        self._scene_graph = None
+        self._graph_index = -1
+        self._transform = None
         self.transform = Transform()
 
+    @property
+    def transform(self):
+        return self._transform
+
+    @transform.setter
+    def transform(self, transform):
+        if self._transform is not None:
+            self._transform.remove_listener(self._on_transform_changed)
+        self._transform = transform
+        transform.add_listener(self._on_transform_changed)
+        self._on_transform_changed(transform)
+
+    def _on_transform_changed(self, transform):
+        self.mark_world_dirty()
+        if self._scene_graph is not None:
+            self._scene_graph.transform_changed(self)
+
+    def mark_world_dirty(self):
+        """Invalidate the cached world matrix of this object and its subtree"""
+        stack = [self]
+        while stack:
+            obj = stack.pop()
+            if obj._world_dirty and obj is not self:
+                continue
+            obj._world_dirty = True
+            stack.extend(obj.children)
+
     def add_child(self, child):
         """Add a child object"""
         if child.parent:
             child.parent.remove_child(child)
         child.parent = self
         self.children.append(child)
+        child.mark_world_dirty()
+        if self._scene_graph is not None:
+            self._scene_graph.add_subtree(child)
 
     def remove_child(self, child):
         """Remove a child object"""
         if child in self.children:
             self.children.remove(child)
             child.parent = None
+            child.mark_world_dirty()
+            if child._scene_graph is not None:
+                child._scene_graph.remove_subtree(child)
+
+    def get_world_matrix(self):
+        """Get the 4x4 world matrix (parent world matrix times local matrix)
+
+        Cached per object and recomputed only when this object or one of
+        its ancestors changed since the last call.
+        """
+        if not self._world_dirty:
+            return self._world_matrix
+
+        # Collect the dirty chain up to the first clean ancestor, then
+        # update it top down (iterative, so deep hierarchies are fine)
+        chain = []
+        obj = self
+        while obj is not None and obj._world_dirty:
+            chain.append(obj)
+            obj = obj.parent
+        matrix = obj._world_matrix if obj is not None else None
+        for obj in reversed(chain):
+            local = obj.transform.get_matrix()
+            matrix = local if matrix is None else matrix @ local
+            obj._world_matrix = matrix
+            obj._world_dirty = False
+        return matrix
 
     def get_world_transform(self):
-        """Get the world transformation matrix"""
-        if self.parent:
-            parent_transform = self.parent.get_world_transform()
-            return combine_transforms(parent_transform, self.transform)
-        return self.transform
+        """Get the world transform (decomposed from the world matrix)"""
+        if self.parent is None:
+            return self.transform
+        return Transform.from_matrix(self.get_world_matrix())
 
     def update(self, dt):
         """Update this object and all children"""
@@ -0,0 +1,58 @@
+
+import numpy as np
+
+# How a new set of hits combines with an existing selection mask
+SELECTION_MODES = ("replace", "add", "subtract")
+
+
+def points_in_rect(points, corner, opposite):
+    """Mask of the (N, 2) points inside the rectangle spanned by two corners"""
+    points = np.asarray(points)
+    low = np.minimum(corner, opposite)
+    high = np.maximum(corner, opposite)
+    return np.all((points >= low) & (points <= high), axis=1)
+
+
+def points_in_circle(points, center, radius):
+    """Mask of the (N, 2) points within ``radius`` of ``center``"""
+    offsets = np.asarray(points, dtype=float) - np.asarray(center, dtype=float)
+    return np.einsum("ij,ij->i", offsets, offsets) <= radius * radius
+
+
+def points_in_polygon(points, polygon):
+    """Mask of the (N, 2) points inside a closed polygon (even-odd rule)
+
+    Casts a ray from every point towards +x and counts the polygon edges it
+    crosses; the loop runs over the K edges with all points at once, after
+    dropping the points outside the polygon's bounding box.
+    """
+    points = np.asarray(points, dtype=float)
+    polygon = np.asarray(polygon, dtype=float).reshape(-1, 2)
+    inside = np.zeros(len(points), dtype=bool)
+    if len(polygon) < 3 or len(points) == 0:
+        return inside
+
+    candidates = np.flatnonzero(points_in_rect(points, polygon.min(axis=0), polygon.max(axis=0)))
+    x, y = points[candidates, 0], points[candidates, 1]
+    crossings = np.zeros(len(candidates), dtype=bool)
+    for (x0, y0), (x1, y1) in zip(polygon.tolist(), np.roll(polygon, -1, axis=0).tolist()):
+        # Half-open in y so a vertex shared by two edges is counted once
+        straddles = (y0 > y) != (y1 > y)
+        if y1 != y0:
+            crossing_x = x0 + (y - y0) * (x1 - x0) / (y1 - y0)
+            crossings ^= straddles & (x < crossing_x)
+    inside[candidates] = crossings
+    return inside
+
+
+def combine_selection(mask, hits, mode):
+    """Apply a boolean ``hits`` mask to a selection ``mask`` in place"""
+    if mode == "replace":
+        mask[:] = hits
+    elif mode == "add":
+        mask |= hits
+    elif mode == "subtract":
+        mask &= ~hits
+    else:
+        raise ValueError(f"Unknown selection mode: {mode}")
+    return mask
@@ -6,6 +6,8 @@ class Settings:
             "show_normals": False,
             "show_grid": True,
             "backface_culling": True,
+            "render_backend": "polygon",  # "polygon" or "zbuffer"
+            "partial_redraw": False,  # Redraw only changed overlay rectangles
         }
 
         self.editor_settings = {
@@ -15,6 +17,13 @@ class Settings:
             "snap_to_grid": False,
         }
 
+        self.resource_settings = {
+            "cache_dir": None,  # Defaults to ~/.cache/mesh_editor
+            "cache_imports": True,  # Convert imported OBJ/STL files to .meshbin
+            "memory_budget": 2 << 30,  # Bytes of loaded resources; None for no limit
+            "loader_threads": 2,  # Threads for load_resource_async
+        }
+
         self.ui_settings = {
             "theme": "dark",
             "font_size": 14,
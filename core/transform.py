@@ -3,41 +3,249 @@ import numpy as np
 import math
 
 class Transform:
-    def __init__(self):
+    """Position, Euler rotation (radians) and scale of an object
+
+    The components are stored as read-only arrays and replaced through
+    their setters, which notify the listeners (scene objects use this to
+    invalidate cached world matrices). Edit them by assignment, e.g.
+    ``transform.position = transform.position + delta``.
+
+    The rotation can be stored as Euler angles or, after assigning
+    ``quaternion`` (or with ``use_quaternion``), as a unit quaternion
+    (w, x, y, z), which composes and interpolates without gimbal issues.
+    Both views are always readable.
+    """
+
+    def __init__(self, use_quaternion=False):
+        self._listeners = []
+        self._matrix = None
+        self._quaternion = None
         self.position = np.array([0.0, 0.0, 0.0])
-        self.rotation = np.array([0.0, 0.0, 0.0])  # Euler angles
+        if use_quaternion:
+            self.quaternion = np.array([1.0, 0.0, 0.0, 0.0])
+        else:
+            self.rotation = np.array([0.0, 0.0, 0.0])  # Euler angles
         self.scale = np.array([1.0, 1.0, 1.0])
 
-    def get_matrix(self):
-        """Get the transformation matrix"""
-        # Create translation matrix
-        trans_mat = np.identity(4)
-        trans_mat[0:3, 3] = self.position
+    @property
+    def position(self):
+        return self._position
+
+    @position.setter
+    def position(self, position):
+        self._position = _frozen_vector(position)
+        self.mark_changed()
+
+    @property
+    def rotation(self):
+        """Euler angles (x, y, z) in radians"""
+        if self._rotation is None:
+            self._rotation = _frozen_vector(matrix_to_euler(quaternion_to_matrix(self._quaternion)[0]))
+        return self._rotation
+
+    @rotation.setter
+    def rotation(self, rotation):
+        self._rotation = _frozen_vector(rotation)
+        self._quaternion = None
+        self.mark_changed()
+
+    @property
+    def quaternion(self):
+        """Rotation as a unit quaternion (w, x, y, z)"""
+        if self._quaternion is not None:
+            return self._quaternion
+        return euler_to_quaternion(self._rotation)[0]
 
-        # Create rotation matrices for X, Y, Z
-        rot_x = np.identity(4)
-        rot_y = np.identity(4)
-        rot_z = np.identity(4)
+    @quaternion.setter
+    def quaternion(self, quaternion):
+        quaternion = np.array(quaternion, dtype=float).reshape(4)
+        quaternion /= np.linalg.norm(quaternion)
+        quaternion.flags.writeable = False
+        self._quaternion = quaternion
+        self._rotation = None  # Derived from the quaternion when read
+        self.mark_changed()
 
-        cx, sx = math.cos(self.rotation[0]), math.sin(self.rotation[0])
-        cy, sy = math.cos(self.rotation[1]), math.sin(self.rotation[1])
-        cz, sz = math.cos(self.rotation[2]), math.sin(self.rotation[2])
+    @property
+    def scale(self):
+        return self._scale
 
-        rot_x[1:3, 1:3] = np.array([[cx, -sx], [sx, cx]])
-        rot_y[0:3:2, 0:3:2] = np.array([[cy, -sy], [sy, cy]])
-        rot_z[0:2, 0:2] = np.array([[cz, -sz], [sz, cz]])
+    @scale.setter
+    def scale(self, scale):
+        self._scale = _frozen_vector(scale)
+        self.mark_changed()
 
-        # Create scale matrix
-        scale_mat = np.identity(4)
-        np.fill_diagonal(scale_mat[0:3, 0:3], self.scale)
+    def add_listener(self, callback):
+        """Call ``callback(transform)`` whenever a component changes"""
+        self._listeners.append(callback)
 
-        # Combine matrices: T * R * S
-        return trans_mat @ rot_z @ rot_y @ rot_x @ scale_mat
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def mark_changed(self):
+        """Notify listeners that the transform changed"""
+        self._matrix = None
+        for callback in self._listeners:
+            callback(self)
+
+    def get_matrix(self):
+        """Get the transformation matrix T * R * S
+
+        Cached (as a read-only array) until a component changes.
+        """
+        if self._matrix is None:
+            rotation = self._quaternion if self._quaternion is not None else self._rotation
+            matrix = compose_trs(self.position[None], rotation[None], self.scale[None])[0]
+            matrix.flags.writeable = False
+            self._matrix = matrix
+        return self._matrix
+
+    @classmethod
+    def from_matrix(cls, matrix):
+        """Decompose a 4x4 affine matrix into a Transform
+
+        Exact for matrices built as T * R * S. Shear (from a rotated child
+        of a non-uniformly scaled parent) cannot be represented and is
+        dropped.
+        """
+        matrix = np.asarray(matrix, dtype=float)
+        linear = matrix[0:3, 0:3]
+        scale = np.linalg.norm(linear, axis=0)
+        # A mirrored matrix gets a negative x scale
+        if np.linalg.det(linear) < 0:
+            scale[0] = -scale[0]
+        rotation = linear / np.where(scale != 0, scale, 1.0)
+
+        transform = cls()
+        transform.position = matrix[0:3, 3]
+        transform.rotation = matrix_to_euler(rotation)
+        transform.scale = scale
+        return transform
 
 def combine_transforms(t1, t2):
-    """Combine two transforms"""
-    result = Transform()
-    result.position = t1.position + t2.position
-    result.rotation = t1.rotation + t2.rotation
-    result.scale = t1.scale * t2.scale
-    return result
+    """Combine two transforms: t2 applied in the space of t1"""
+    return Transform.from_matrix(t1.get_matrix() @ t2.get_matrix())
+
+def compose_trs(positions, rotations, scales, out=None):
+    """Build (N, 4, 4) matrices T * R * S for N transforms at once
+
+    ``rotations`` holds Euler angles (N, 3) in the order used by
+    Transform, or unit quaternions (N, 4) as (w, x, y, z). The entries are
+    written in closed form straight into ``out`` (allocated if None), with
+    no per-axis 4x4 matrices or matrix products.
+    """
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+    scales = np.asarray(scales, dtype=float).reshape(-1, 3)
+    rotations = np.asarray(rotations, dtype=float)
+    if out is None:
+        out = np.empty((len(positions), 4, 4))
+
+    if rotations.shape[-1] == 4:
+        out[:, 0:3, 0:3] = quaternion_to_matrix(rotations)
+    else:
+        out[:, 0:3, 0:3] = euler_to_matrix(rotations)
+    out[:, 0:3, 0:3] *= scales[:, None, :]  # Scale the columns
+    out[:, 0:3, 3] = positions
+    out[:, 3, 0:3] = 0.0
+    out[:, 3, 3] = 1.0
+    return out
+
+def euler_to_matrix(rotations):
+    """(N, 3, 3) rotation matrices for Euler angles, R = Rz * Ry * Rx
+
+    Matches Transform: the y rotation turns z towards -x.
+    """
+    rotations = np.asarray(rotations, dtype=float).reshape(-1, 3)
+    cx, cy, cz = np.cos(rotations).T
+    sx, sy, sz = np.sin(rotations).T
+
+    matrices = np.empty((len(rotations), 3, 3))
+    matrices[:, 0, 0] = cz * cy
+    matrices[:, 0, 1] = -cz * sy * sx - sz * cx
+    matrices[:, 0, 2] = -cz * sy * cx + sz * sx
+    matrices[:, 1, 0] = sz * cy
+    matrices[:, 1, 1] = -sz * sy * sx + cz * cx
+    matrices[:, 1, 2] = -sz * sy * cx - cz * sx
+    matrices[:, 2, 0] = sy
+    matrices[:, 2, 1] = cy * sx
+    matrices[:, 2, 2] = cy * cx
+    return matrices
+
+def matrix_to_euler(rotation):
+    """Euler angles of a 3x3 rotation matrix (inverse of euler_to_matrix)"""
+    # R[2, 0] = sin(y) with Transform's y rotation
+    sy = rotation[2, 0]
+    if abs(sy) < 1.0 - 1e-9:
+        return (math.atan2(rotation[2, 1], rotation[2, 2]), math.asin(sy),
+                math.atan2(rotation[1, 0], rotation[0, 0]))
+    # Gimbal lock: only x - z (or x + z) is defined, put it all in x
+    return (math.atan2(-rotation[1, 2], rotation[1, 1]), math.copysign(math.pi / 2, sy), 0.0)
+
+def quaternion_to_matrix(quaternions):
+    """(N, 3, 3) rotation matrices for (N, 4) quaternions (w, x, y, z)"""
+    quaternions = np.asarray(quaternions, dtype=float).reshape(-1, 4)
+    w, x, y, z = quaternions.T
+    # Dividing by the squared norm makes this exact for unnormalized input
+    s = 2.0 / np.maximum(np.einsum("ij,ij->i", quaternions, quaternions), 1e-300)
+
+    matrices = np.empty((len(quaternions), 3, 3))
+    matrices[:, 0, 0] = 1.0 - s * (y * y + z * z)
+    matrices[:, 0, 1] = s * (x * y - w * z)
+    matrices[:, 0, 2] = s * (x * z + w * y)
+    matrices[:, 1, 0] = s * (x * y + w * z)
+    matrices[:, 1, 1] = 1.0 - s * (x * x + z * z)
+    matrices[:, 1, 2] = s * (y * z - w * x)
+    matrices[:, 2, 0] = s * (x * z - w * y)
+    matrices[:, 2, 1] = s * (y * z + w * x)
+    matrices[:, 2, 2] = 1.0 - s * (x * x + y * y)
+    return matrices
+
+def quaternion_multiply(q1, q2):
+    """Hamilton products q1 * q2 of (N, 4) quaternions (apply q2, then q1)"""
+    w1, x1, y1, z1 = np.asarray(q1, dtype=float).reshape(-1, 4).T
+    w2, x2, y2, z2 = np.asarray(q2, dtype=float).reshape(-1, 4).T
+    return np.stack([
+        w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
+        w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+        w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+        w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2,
+    ], axis=1)
+
+def euler_to_quaternion(rotations):
+    """(N, 4) quaternions for Euler angles in Transform's convention"""
+    half = np.asarray(rotations, dtype=float).reshape(-1, 3) / 2
+    zeros = np.zeros(len(half))
+    qx = np.stack([np.cos(half[:, 0]), np.sin(half[:, 0]), zeros, zeros], axis=1)
+    # Transform's y rotation is a standard one by -y
+    qy = np.stack([np.cos(half[:, 1]), zeros, -np.sin(half[:, 1]), zeros], axis=1)
+    qz = np.stack([np.cos(half[:, 2]), zeros, zeros, np.sin(half[:, 2])], axis=1)
+    return quaternion_multiply(qz, quaternion_multiply(qy, qx))
+
+def slerp(q0, q1, t):
+    """Spherical linear interpolation between (N, 4) unit quaternions
+
+    ``t`` is a scalar or (N,) array; takes the shorter arc.
+    """
+    q0 = np.asarray(q0, dtype=float).reshape(-1, 4)
+    q1 = np.asarray(q1, dtype=float).reshape(-1, 4)
+    t = np.broadcast_to(np.asarray(t, dtype=float), (len(q0),))[:, None]
+
+    cos_angle = np.einsum("ij,ij->i", q0, q1)[:, None]
+    q1 = np.where(cos_angle < 0, -q1, q1)
+    cos_angle = np.abs(cos_angle)
+
+    # Nearly parallel quaternions fall back to a normalized lerp
+    angle = np.arccos(np.clip(cos_angle, -1.0, 1.0))
+    sin_angle = np.sin(angle)
+    close = sin_angle < 1e-6
+    safe = np.where(close, 1.0, sin_angle)
+    w0 = np.where(close, 1.0 - t, np.sin((1.0 - t) * angle) / safe)
+    w1 = np.where(close, t, np.sin(t * angle) / safe)
+    result = w0 * q0 + w1 * q1
+    return result / np.linalg.norm(result, axis=1, keepdims=True)
+
+def _frozen_vector(values):
+    """Copy values into a read-only float 3-vector"""
+    vector = np.array(values, dtype=float).reshape(3)
+    vector.flags.writeable = False
+    return vector
@@ -9,6 +9,17 @@ from core.commands import MoveObjectCommand, ScaleObjectCommand
 
 
 class DesktopApp(SceneObject):  # Make DesktopApp a SceneObject
+    # Events that always change what is on screen
+    REDRAW_EVENTS = (
+        pygame.MOUSEBUTTONDOWN,
+        pygame.MOUSEBUTTONUP,
+        pygame.MOUSEWHEEL,
+        pygame.KEYDOWN,
+        pygame.VIDEOEXPOSE,
+        pygame.WINDOWEXPOSED,
+        pygame.WINDOWRESTORED,
+    )
+
     def __init__(self, engine):
         super().__init__(name="DesktopApp")  # Initialize base class
         self.engine = engine
@@ -29,6 +40,11 @@ class DesktopApp(SceneObject):  # Make DesktopApp a SceneObject
         self.renderer.show_gizmos = False
         self.renderer.active_axis = None
 
+        # Last seen state, compared every tick to decide whether to redraw
+        self._last_command_version = None
+        self._last_view_key = None
+        self._last_active_axis = None
+
         # Add this app to the scene graph so input handler can find it
         engine.scene.add_object(self)
 
@@ -45,6 +61,8 @@ class DesktopApp(SceneObject):  # Make DesktopApp a SceneObject
         # Initialize renderer settings
         self.renderer.scale = 100  # Increase scale for better visibility
         self.renderer.translate = [self.width // 2, self.height // 2]  # Center of screen
+        self.renderer.render_backend = self.engine.settings.render_settings.get("render_backend", "polygon")
+        self.renderer.partial_redraw = self.engine.settings.render_settings.get("partial_redraw", False)
 
         # Set default view to isometric
         self.renderer.set_standard_view("home")
@@ -72,9 +90,20 @@ class DesktopApp(SceneObject):  # Make DesktopApp a SceneObject
                     # If not handled by UI, pass to input handler
                     self.input_handler.handle_event(event, self.engine)
 
+                # Clicks, keys, zooming and drags (orbit, pan, edits) all
+                # change the frame; plain mouse moves only affect hover state
+                if event.type in self.REDRAW_EVENTS or (
+                        event.type == pygame.MOUSEMOTION and self.input_handler.dragging):
+                    self.renderer.mark_dirty()
+
             # Update
             self.engine.update(dt)
-            self.ui_manager.update(dt)
+
+            # Hand over files loaded in the background since the last frame
+            if self.engine.resource_manager.process_completed():
+                self.renderer.mark_dirty()
+            for rect in self.ui_manager.update(dt):
+                self.renderer.mark_dirty(rect)
 
             # Check if we need to update display information based on input handler state
             if self.renderer.show_gizmos and self.engine.scene.selected_objects:
@@ -89,16 +118,53 @@ class DesktopApp(SceneObject):  # Make DesktopApp a SceneObject
                 command = self.ui_manager.command_queue.pop(0)
                 self._handle_command(command)
 
-            # Render
-            self.screen.fill((20, 20, 30))  # Dark background
-            self.renderer.render(self.engine.scene.active_camera)
-            self.ui_manager.draw(self.screen)
-            pygame.display.flip()
+            # Render only when something changed since the last frame
+            self._check_for_changes()
+            if self.renderer.needs_redraw:
+                self.screen.fill((20, 20, 30))  # Dark background
+                self.renderer.render(self.engine.scene.active_camera)
+                self.ui_manager.draw(self.screen)
+                pygame.display.flip()
+            elif self.renderer.dirty_rects:
+                self._redraw_rects(self.renderer.dirty_rects)
+
+            self.renderer.needs_redraw = False
+            self.renderer.dirty_rects = []
 
+        self.engine.resource_manager.shutdown()
         pygame.quit()
 
+    def _check_for_changes(self):
+        """Mark the frame dirty if commands, the view or gizmo hover changed"""
+        command_version = self.engine.command_manager.version
+        view_key = self.renderer._view_key()
+        if command_version != self._last_command_version or view_key != self._last_view_key:
+            self.renderer.mark_dirty()
+        self._last_command_version = command_version
+        self._last_view_key = view_key
+
+        # Hovering a gizmo axis only changes the gizmo's highlight
+        if self.renderer.active_axis != self._last_active_axis:
+            self.renderer.mark_dirty(self.renderer.get_gizmo_rect())
+        self._last_active_axis = self.renderer.active_axis
+
+    def _redraw_rects(self, rects):
+        """Redraw the overlays inside the given rectangles only"""
+        if self.renderer.scene_frame is None:
+            self.renderer.mark_dirty()
+            return
+
+        for rect in rects:
+            self.screen.set_clip(rect)
+            self.screen.blit(self.renderer.scene_frame, rect, rect)
+            self.renderer.draw_overlays(self.screen)
+            self.ui_manager.draw(self.screen)
+        self.screen.set_clip(None)
+        pygame.display.update(rects)
+
     def _handle_command(self, command):
         """Handle commands from UI"""
+        self.renderer.mark_dirty()
         if command == "activate_move":
             self.renderer.transform_mode = "move"
             self.renderer.show_gizmos = True
@@ -1,6 +1,7 @@
 import pygame
 import numpy as np
 from core.commands import MoveVerticesCommand, MoveObjectCommand, ScaleObjectCommand, DeleteObjectCommand
+from core.selection import combine_selection
 
 
 class DesktopInputHandler:
@@ -13,11 +14,17 @@ class DesktopInputHandler:
 
         # Selection state
         self.selection_mode = "object"  # "object", "vertex", "edge", "face"
-        self.selected_vertices = set()
         self.selected_edges = set()
         self.selected_faces = set()
         self.selection_radius = 10  # Pixels
 
+        # Vertex selection tools: "click", "box", "lasso" or "paint"
+        self.selection_tool = "click"
+        self.brush_radius = 25  # Pixels, for the paint tool
+        self.select_through = False  # Also select vertices hidden behind surfaces
+        self.region = None  # Box/lasso/paint gesture in progress
+        self.vertex_drag = None  # Alt-drag of the selected vertices in progress
+
         # Active mesh
         self.active_mesh = None
 
@@ -29,6 +36,13 @@ class DesktopInputHandler:
         # Separate rotation matrices for object and view
         self.view_rotation = np.identity(3)  # View/camera rotation
 
+    @property
+    def selected_vertices(self):
+        """Sorted indices of the selected vertices of the active mesh"""
+        if self.active_mesh is None:
+            return np.zeros(0, dtype=np.int64)
+        return self.active_mesh.selected_vertex_indices()
+
     def _get_renderer(self, engine):
         """Helper to get the renderer from the engine"""
         for app in engine.scene.root.children:
@@ -43,6 +57,7 @@ class DesktopInputHandler:
             if 0 <= button_idx < len(self.mouse_buttons):
                 self.mouse_buttons[button_idx] = True
             self.drag_start = event.pos
+            self.mouse_position = event.pos
 
             # Get renderer
             renderer = self._get_renderer(engine)
@@ -74,7 +89,9 @@ class DesktopInputHandler:
 
             # Handle selecting elements based on selection mode
             if button_idx == 0 and not self.modifiers["alt"]:  # Left click without Alt
-                if not self.dragging_gizmo:
+                if self._uses_region():
+                    self._begin_region(engine)
+                elif not self.dragging_gizmo:
                     self._handle_selection(engine)
             else:
                 self._handle_click(engine, event.button)
@@ -95,7 +112,10 @@ class DesktopInputHandler:
             if self.dragging:
                 if self.dragging_gizmo:
                     self._handle_gizmo_drag(engine)
-                elif self.modifiers["alt"] and self.selection_mode == "vertex" and self.selected_vertices:
+                elif self.region is not None:
+                    self._update_region(engine)
+                elif self.vertex_drag is not None or (
+                        self.modifiers["alt"] and self.selection_mode == "vertex" and len(self.selected_vertices)):
                     # Manipulate vertices when Alt is pressed
                     self._handle_vertex_manipulation(engine)
                 else:
@@ -109,6 +129,10 @@ class DesktopInputHandler:
             self.dragging = False
             self.dragging_gizmo = False
             self.active_gizmo_axis = None
+            if self.region is not None:
+                self._finish_region(engine)
+            if self.vertex_drag is not None:
+                self._finish_vertex_manipulation(engine)
 
         elif event.type == pygame.MOUSEWHEEL:
             # Handle mouse wheel scrolling for zoom
@@ -242,91 +266,215 @@ class DesktopInputHandler:
             return
 
         # Find the active mesh
+        if not self._find_active_mesh(engine):
+            return
+
+        # One vectorized query against the projection the renderer drew
+        closest_idx = renderer.pick_vertex(self.active_mesh, self.mouse_position, self.selection_radius)
+
+        # Handle the selection
+        if closest_idx >= 0:
+            mask = self.active_mesh.vertex_selection
+            if self.modifiers["shift"]:
+                # Toggle the vertex selection
+                mask[closest_idx] = not mask[closest_idx]
+            else:
+                # Clear selection if shift is not held
+                mask[:] = False
+                mask[closest_idx] = True
+
+            print(f"Selected vertices: {np.count_nonzero(mask)}")
+
+    def _find_active_mesh(self, engine):
+        """Use the first mesh in the scene if no mesh is active yet"""
         if not self.active_mesh:
-            for obj in engine.scene.root.children:
-                if hasattr(obj, 'vertices') and len(obj.vertices) > 0:
+            for obj in engine.scene.graph.drawable:
+                if len(obj.vertices) > 0:
                     self.active_mesh = obj
                     break
+        return self.active_mesh
 
-        if not self.active_mesh:
-            return
+    def _uses_region(self):
+        """Whether a left drag draws a selection region in the current mode"""
+        if self.selection_mode == "vertex":
+            return self.selection_tool != "click"
+        # Faces and edges are box selected through the id buffers
+        return self.selection_mode in ("edge", "face") and self.selection_tool == "box"
 
-        # Get projected vertex positions
-        vertices = self.active_mesh.vertices.copy()
-        renderer._rotate_vertices(vertices)
+    def _begin_region(self, engine):
+        """Start a box, lasso or paint selection at the mouse position"""
+        renderer = self._get_renderer(engine)
+        if not renderer or not self._find_active_mesh(engine):
+            return
 
-        # Find the closest vertex to mouse position
-        closest_idx = -1
-        closest_dist = float('inf')
+        # Ctrl removes from the selection, Shift adds to it
+        if self.modifiers["ctrl"]:
+            mode = "subtract"
+        elif self.modifiers["shift"]:
+            mode = "add"
+        else:
+            mode = "replace"
+        self.region = {"tool": self.selection_tool, "mode": mode, "points": [self.mouse_position]}
+
+        if self.selection_tool == "paint":
+            # Each brush dab adds to (or removes from) what the stroke has
+            # painted so far
+            if mode == "replace":
+                self.active_mesh.vertex_selection[:] = False
+                self.region["mode"] = "add"
+            self._paint(renderer, self.mouse_position)
+        self._update_overlay(renderer)
+
+    def _update_region(self, engine):
+        """Extend the current region to the mouse position"""
+        renderer = self._get_renderer(engine)
+        if not renderer:
+            return
 
-        for i, v in enumerate(vertices):
-            # Project the vertex to screen space
-            z_depth = v[2] + 5
-            if z_depth <= 0.1:  # Avoid division by zero
-                z_depth = 0.1
-            factor = 200 / z_depth
-            x = v[0] * renderer.scale * factor + renderer.translate[0]
-            y = v[1] * renderer.scale * factor + renderer.translate[1]
+        region = self.region
+        tool = region["tool"]
+        if tool == "box":
+            region["points"] = [region["points"][0], self.mouse_position]
+        elif tool == "lasso":
+            last = region["points"][-1]
+            if abs(self.mouse_position[0] - last[0]) + abs(self.mouse_position[1] - last[1]) >= 3:
+                region["points"].append(self.mouse_position)
+        elif tool == "paint":
+            self._paint(renderer, self.mouse_position)
+        self._update_overlay(renderer)
+
+    def _finish_region(self, engine):
+        """Apply a finished box or lasso to the selection"""
+        region, self.region = self.region, None
+        renderer = self._get_renderer(engine)
+        if not renderer:
+            return
+        renderer.selection_overlay = None
 
-            # Calculate distance to mouse
-            dx = x - self.mouse_position[0]
-            dy = y - self.mouse_position[1]
-            dist = (dx * dx + dy * dy) ** 0.5
+        if self.selection_mode in ("edge", "face"):
+            self._finish_element_box(renderer, region)
+            return
 
-            if dist < self.selection_radius and dist < closest_dist:
-                closest_dist = dist
-                closest_idx = i
+        if region["tool"] == "box":
+            start, end = region["points"][0], region["points"][-1]
+            hits = renderer.region_vertices(self.active_mesh, "box", (start, end), self.select_through)
+        elif region["tool"] == "lasso":
+            if len(region["points"]) < 3:
+                return
+            hits = renderer.region_vertices(self.active_mesh, "lasso", region["points"], self.select_through)
+        else:
+            hits = None  # Painting is applied while dragging
+
+        mask = self.active_mesh.vertex_selection
+        if hits is not None:
+            combine_selection(mask, hits, region["mode"])
+        print(f"Selected vertices: {np.count_nonzero(mask)}")
+
+    def _finish_element_box(self, renderer, region):
+        """Apply a finished box to the face or edge selection"""
+        kind = self.selection_mode
+        selected = self.selected_faces if kind == "face" else self.selected_edges
+        start, end = region["points"][0], region["points"][-1]
+        hits = renderer.region_ids(self.active_mesh, kind, start, end).tolist()
+
+        if region["mode"] == "replace":
+            selected.clear()
+            selected.update(hits)
+        elif region["mode"] == "add":
+            selected.update(hits)
+        else:
+            selected.difference_update(hits)
+        print(f"Selected {kind}s: {len(selected)}")
+
+    def _paint(self, renderer, position):
+        """Apply one brush dab of the paint tool"""
+        hits = renderer.region_vertices(self.active_mesh, "circle", (position, self.brush_radius),
+                                        self.select_through)
+        combine_selection(self.active_mesh.vertex_selection, hits, self.region["mode"])
+
+    def _update_overlay(self, renderer):
+        tool, points = self.region["tool"], self.region["points"]
+        if tool == "box":
+            renderer.selection_overlay = ("box", (points[0], points[-1]))
+        elif tool == "lasso":
+            renderer.selection_overlay = ("lasso", list(points))
+        else:
+            renderer.selection_overlay = ("circle", (self.mouse_position, self.brush_radius))
 
-        # Handle the selection
-        if closest_idx >= 0:
-            if not self.modifiers["shift"]:
-                # Clear selection if shift is not held
-                self.selected_vertices.clear()
+    def _select_edge(self, engine):
+        """Select the edge under the mouse cursor"""
+        self._select_element(engine, "edge", self.selected_edges, self.selection_radius)
 
-            # Toggle the vertex selection
-            if closest_idx in self.selected_vertices:
-                self.selected_vertices.remove(closest_idx)
-            else:
-                self.selected_vertices.add(closest_idx)
+    def _select_face(self, engine):
+        """Select the face under the mouse cursor"""
+        self._select_element(engine, "face", self.selected_faces)
 
-            print(f"Selected vertices: {self.selected_vertices}")
+    def _select_element(self, engine, kind, selected, radius=0):
+        """Toggle the face or edge under the cursor in the ``selected`` set"""
+        renderer = self._get_renderer(engine)
+        if not renderer:
+            return
 
-    def _select_edge(self, engine):
-        """Select an edge under the mouse cursor"""
-        # Placeholder - will implement later
-        pass
+        # A pixel read from the renderer's id buffer
+        hit = renderer.pick_id(self.mouse_position, kind, radius)
+        if hit is None:
+            return
+        mesh, index = hit
+
+        if mesh is not self.active_mesh:
+            self.active_mesh = mesh
+            self.selected_edges.clear()
+            self.selected_faces.clear()
+        elif not self.modifiers["shift"]:
+            # Clear selection if shift is not held
+            selected.clear()
+
+        # Toggle the element selection
+        if index in selected:
+            selected.remove(index)
+        else:
+            selected.add(index)
 
-    def _select_face(self, engine):
-        """Select a face under the mouse cursor"""
-        # Placeholder - will implement later
-        pass
+        print(f"Selected {kind}s: {len(selected)}")
 
     def _select_object(self, engine):
-        """Select an object under the mouse cursor"""
+        """Select the object under the mouse cursor"""
         # Get renderer
         renderer = self._get_renderer(engine)
         if not renderer:
             return
 
-        # Simple object selection - select the first mesh
-        for obj in engine.scene.root.children:
-            if hasattr(obj, 'vertices') and len(obj.vertices) > 0:
-                self.active_mesh = obj
+        # Cast a ray through the cursor against every mesh's BVH
+        hit = renderer.pick(self.mouse_position)
+        if hit is None:
+            if not self.modifiers["shift"]:
                 engine.scene.clear_selection()
-                engine.scene.select_object(obj)
-                print(f"Selected object: {obj.name}")
-                return
-
-    def _handle_vertex_manipulation(self, engine):
-        """Manipulate selected vertices"""
-        if not self.active_mesh or not self.selected_vertices:
             return
 
-        # Get renderer
+        obj = hit[0]
+        self.active_mesh = obj
+        engine.scene.select_object(obj, add_to_selection=self.modifiers["shift"])
+        print(f"Selected object: {obj.name}")
+
+    def _handle_vertex_manipulation(self, engine):
+        """Move the selected vertices along with the mouse"""
         renderer = self._get_renderer(engine)
-        if not renderer:
+        if not renderer or not self.active_mesh:
             return
 
+        mesh = self.active_mesh
+        renderer.scene.graph.update()
+        if self.vertex_drag is None:
+            # The selection and its positions are taken once per gesture
+            indices = self.selected_vertices
+            if not len(indices):
+                return
+            _, _, depth = renderer.get_projection(mesh)
+            self.vertex_drag = {"mesh": mesh, "indices": indices,
+                                "old_positions": mesh.vertices[indices].copy(),
+                                "depth": float(depth[indices].mean())}
+        drag = self.vertex_drag
+
         # Calculate movement in screen space
         dx = self.mouse_position[0] - self.drag_start[0]
         dy = self.mouse_position[1] - self.drag_start[1]
@@ -334,22 +482,20 @@ class DesktopInputHandler:
         # Update drag start
         self.drag_start = self.mouse_position
 
-        # Scale movement based on view scale
-        world_dx = dx / renderer.scale
-        world_dy = dy / renderer.scale
-
-        # Create a command to move vertices
-        old_positions = {idx: self.active_mesh.vertices[idx].copy() for idx in self.selected_vertices}
-
-        # Determine movement direction based on view orientation
-        # This is simplified and would need to be improved based on view rotation
-        for idx in self.selected_vertices:
-            self.active_mesh.vertices[idx, 0] += world_dx * 0.1  # X movement
-            self.active_mesh.vertices[idx, 1] -= world_dy * 0.1  # Y movement (inverted for screen coords)
-
-        # Create a command for undo/redo
-        new_positions = {idx: self.active_mesh.vertices[idx].copy() for idx in self.selected_vertices}
-        command = MoveVerticesCommand(self.active_mesh, old_positions, new_positions)
+        # Pixels to view space at the depth of the selection, so the
+        # vertices follow the cursor, then back through the view rotation
+        # and the object's world matrix into mesh space
+        view_delta = np.array([dx, dy, 0.0]) * drag["depth"] / (200 * renderer.scale)
+        model_matrix = renderer._get_model_matrix(mesh)
+        linear = np.asarray(renderer.rotation_matrix, dtype=float) @ model_matrix[0:3, 0:3]
+        mesh.vertices[drag["indices"]] += np.linalg.solve(linear, view_delta)
+        mesh.mark_vertices_changed()
+
+    def _finish_vertex_manipulation(self, engine):
+        """Record a finished vertex drag as one undoable command"""
+        drag, self.vertex_drag = self.vertex_drag, None
+        mesh, indices = drag["mesh"], drag["indices"]
+        command = MoveVerticesCommand(mesh, indices, drag["old_positions"], mesh.vertices[indices])
         engine.command_manager.execute(command)
 
     def _handle_click(self, engine, button):
@@ -430,6 +576,7 @@ class DesktopInputHandler:
             for i in range(len(vertices)):
                 # Apply the rotation
                 vertices[i] = np.dot(new_rotation, vertices[i])
+            self.active_mesh.mark_vertices_changed()
 
         # Middle mouse button: pan (move in screen space)
         elif self.mouse_buttons[1]:
@@ -490,6 +637,23 @@ class DesktopInputHandler:
         elif key == pygame.K_4:
             self.selection_mode = "face"
             print("Selection mode: Face")
+        # Selection tools (edges and faces only use the box)
+        elif key == pygame.K_v:
+            self.selection_tool = "click" if self.selection_tool == "box" else "box"
+            print(f"Selection tool: {self.selection_tool}")
+        elif key == pygame.K_l:
+            self.selection_tool = "click" if self.selection_tool == "lasso" else "lasso"
+            print(f"Selection tool: {self.selection_tool}")
+        elif key == pygame.K_c:
+            self.selection_tool = "click" if self.selection_tool == "paint" else "paint"
+            print(f"Selection tool: {self.selection_tool}")
+        elif key == pygame.K_x:
+            self.select_through = not self.select_through
+            print(f"Select through surfaces: {self.select_through}")
+        elif key == pygame.K_LEFTBRACKET:
+            self.brush_radius = max(2, self.brush_radius - 5)
+        elif key == pygame.K_RIGHTBRACKET:
+            self.brush_radius += 5
         # Undo/Redo
         elif key == pygame.K_z and self.modifiers["ctrl"]:
             engine.undo()
@@ -599,7 +763,7 @@ class DesktopInputHandler:
 
     def _delete_selected_vertices(self, engine):
         """Delete selected vertices (placeholder)"""
-        if not self.active_mesh or not self.selected_vertices:
+        if not self.active_mesh or not len(self.selected_vertices):
             return
 
         print(f"Would delete vertices: {self.selected_vertices}")
@@ -1,5 +1,22 @@
+import weakref
+
 import pygame
 import numpy as np
+from core.selection import points_in_circle, points_in_polygon, points_in_rect
+from ui.desktop.screen_grid import ScreenGrid
+from ui.desktop.zbuffer_rasterizer import ZBufferRasterizer
+
+# Meshes with at least this many vertices are picked through a ScreenGrid
+GRID_PICK_THRESHOLD = 200_000
+
+# Projected coordinates are clipped to this range before the int32 cast
+SCREEN_LIMIT = 1 << 30
+
+# Element ids are stored as 24-bit RGB colors (0 is the background)
+MAX_ID_BUFFER_ELEMENTS = (1 << 24) - 1
+# Relative inverse depth back faces lose in the id buffers, so front faces
+# win where the two meet at a silhouette
+BACK_FACE_DEPTH_BIAS = 0.01
 
 
 class DesktopRenderer:
@@ -25,6 +42,11 @@ class DesktopRenderer:
         self.enable_backface_culling = False
         self.show_grid = True
 
+        # "polygon" draws faces with pygame in painter's order, "zbuffer"
+        # rasterizes them into NumPy buffers blitted once per frame
+        self.render_backend = "polygon"
+        self.rasterizer = None
+
         # Transformation gizmos
         self.show_gizmos = False
         self.transform_mode = None  # "move" or "scale"
@@ -38,6 +60,29 @@ class DesktopRenderer:
         self.show_orientation_gizmo = True
         self.view_buttons = []  # Will store the view buttons (position, radius, type)
 
+        # Floor grid geometry, built once; projections are cached per view
+        self._build_floor_grid()
+
+        # Per-mesh vertex projections from the last draw, reused for picking
+        # and for the next frame while the view and the mesh are unchanged
+        self._projections = weakref.WeakKeyDictionary()
+
+        # Region being drawn by a selection tool: ("box", (start, end)),
+        # ("lasso", points) or ("circle", (center, radius)), or None
+        self.selection_overlay = None
+        self.selected_vertex_color = (255, 255, 255)
+        # Offscreen face and edge id buffers, used for picking, box
+        # selection and to skip hidden vertices
+        self._id_buffers = {}
+
+        # Redraw tracking: the app only renders when something marked the
+        # frame dirty. With partial_redraw, small overlay changes redraw just
+        # their rectangles on top of a saved copy of the scene
+        self.needs_redraw = True
+        self.dirty_rects = []
+        self.partial_redraw = False
+        self.scene_frame = None
+
     def init(self):
         """Initialize renderer resources"""
         # Create a font for gizmo labels if pygame font is initialized
@@ -64,8 +109,20 @@ class DesktopRenderer:
             return
 
         # Render all meshes in the scene
-        self._render_scene_objects(surface)
+        if self.render_backend == "zbuffer":
+            self._begin_zbuffer(surface)
+            self._render_scene_objects(surface)
+            pygame.surfarray.blit_array(surface, self.rasterizer.color)
+        else:
+            self._render_scene_objects(surface)
+
+        # Keep the scene without overlays so dirty rectangles can be redrawn
+        self.scene_frame = surface.copy() if self.partial_redraw else None
 
+        self.draw_overlays(surface)
+
+    def draw_overlays(self, surface):
+        """Draw the gizmos that sit on top of the scene"""
         # Draw transformation gizmos if active
         if self.show_gizmos and self.scene.selected_objects:
             self._draw_transformation_gizmos(surface)
@@ -74,69 +131,64 @@ class DesktopRenderer:
         if self.show_orientation_gizmo:
             self._draw_orientation_gizmo(surface)
 
-    def _render_scene_objects(self, surface):
-        """Render all objects in the scene"""
-        # Start with root object's children
-        for obj in self.scene.root.children:
-            self._render_object(surface, obj)
+        if self.selection_overlay is not None:
+            self._draw_selection_overlay(surface)
+
+    def _draw_selection_overlay(self, surface):
+        """Outline the region of the active box, lasso or paint tool"""
+        shape, data = self.selection_overlay
+        color = (255, 255, 255)
+        if shape == "box":
+            (x0, y0), (x1, y1) = data
+            rect = pygame.Rect(min(x0, x1), min(y0, y1), abs(x1 - x0), abs(y1 - y0))
+            pygame.draw.rect(surface, color, rect, 1)
+        elif shape == "lasso" and len(data) >= 2:
+            pygame.draw.lines(surface, color, len(data) >= 3, data, 1)
+        elif shape == "circle":
+            center, radius = data
+            pygame.draw.circle(surface, color, center, int(radius), 1)
+
+    def mark_dirty(self, rect=None):
+        """Request a redraw of the whole frame, or of one screen rectangle"""
+        if rect is None or not self.partial_redraw:
+            self.needs_redraw = True
+        else:
+            self.dirty_rects.append(pygame.Rect(rect))
 
-    def _render_object(self, surface, obj):
-        """Render a single object and its children"""
-        # If it's a mesh, render it
-        if hasattr(obj, 'vertices') and hasattr(obj, 'edges'):
-            self._render_mesh(surface, obj)
+    def get_gizmo_rect(self):
+        """Get the screen rectangle covered by the transformation gizmo"""
+        if not self.scene.selected_objects or not self.show_gizmos:
+            return None
 
-        # Render all children
-        for child in obj.children:
-            self._render_object(surface, child)
+        obj = self.scene.selected_objects[0]
+        if not hasattr(obj, 'transform'):
+            return None
+
+        rotated_pos = np.dot(self.rotation_matrix, obj.transform.position)
+        screen_pos, _ = self._project_vertices(rotated_pos.reshape(1, 3))
+        x, y = screen_pos[0].tolist()
+
+        # Axis length plus room for arrowheads and scale handles
+        reach = 50 + 12
+        return pygame.Rect(x - reach, y - reach, 2 * reach, 2 * reach)
+
+    def _render_scene_objects(self, surface):
+        """Render all meshes in the scene"""
+        # The scene graph keeps the meshes in a flat list, so there is no
+        # recursive walk or per-node type check each frame. Updating it is
+        # free unless a transform changed since Scene.update
+        self.scene.graph.update()
+        for mesh in self.scene.graph.drawable:
+            self._render_mesh(surface, mesh)
 
     def _render_mesh(self, surface, mesh):
         """Render a mesh object with shading"""
         if len(mesh.vertices) == 0:
             return
 
-        # Make a copy of the vertices for transformation
-        vertices = mesh.vertices.copy()
-
-        # Apply object's own transformation matrix - THIS IS THE KEY CHANGE
-        if hasattr(mesh, 'transform'):
-            # Create transformation matrix
-            transform_matrix = np.identity(4)
-
-            # Apply scale
-            scale_matrix = np.identity(4)
-            np.fill_diagonal(scale_matrix[0:3, 0:3], mesh.transform.scale)
-            transform_matrix = np.dot(transform_matrix, scale_matrix)
-
-            # Apply rotation (simplified for now)
-            # Full implementation would use mesh.transform.rotation
-
-            # Apply position
-            transform_matrix[0:3, 3] = mesh.transform.position
-
-            # Apply transformation to vertices
-            for i in range(len(vertices)):
-                # Convert to homogeneous coordinates
-                v_homo = np.append(vertices[i], 1.0)
-                # Apply transformation
-                v_transformed = np.dot(transform_matrix, v_homo)
-                # Convert back to 3D coordinates
-                vertices[i] = v_transformed[0:3]
-
-        # Apply view rotation
-        self._rotate_vertices(vertices)
-
-        # Project vertices to 2D
-        projected = []
-        for v in vertices:
-            # Simple perspective projection
-            z_depth = v[2] + 5
-            if z_depth <= 0.1:  # Avoid division by zero or negative values
-                z_depth = 0.1
-            factor = 200 / z_depth
-            x = v[0] * self.scale * factor + self.translate[0]
-            y = v[1] * self.scale * factor + self.translate[1]
-            projected.append((int(x), int(y)))
+        # Transform and project all vertices in one batched pass (or reuse
+        # the projection if nothing changed since it was made)
+        vertices, screen, depth = self.get_projection(mesh)
 
         # Set color based on selection state
         base_color = (220, 220, 100) if mesh.selected else (
@@ -144,63 +196,29 @@ class DesktopRenderer:
         outline_color = (255, 255, 0) if mesh.selected else (30, 30, 30)  # Bright yellow outline for selected objects
         outline_width = 2 if mesh.selected else 1  # Thicker outline for selected objects
 
-        # Calculate face properties and determine visibility
-        if hasattr(mesh, 'faces') and len(mesh.faces) > 0:
-            # Collection to store all face data for sorting
-            all_faces = []
-
-            for face_idx, face in enumerate(mesh.faces):
-                if len(face) >= 3:  # Need at least 3 points for a face
-                    # Calculate the face normal (using first 3 vertices)
-                    v0 = vertices[face[0]]
-                    v1 = vertices[face[1]]
-                    v2 = vertices[face[2]]
-
-                    # Calculate edges
-                    edge1 = v1 - v0
-                    edge2 = v2 - v0
-
-                    # Calculate normal using cross product
-                    normal = np.cross(edge1, edge2)
-
-                    # Normalize normal vector
-                    normal_length = np.linalg.norm(normal)
-                    if normal_length > 0:
-                        normal = normal / normal_length
-
-                    # Calculate face center for depth sorting
-                    center = np.mean([vertices[i] for i in face], axis=0)
-                    z_depth = center[2]
-
-                    # Viewing direction (from camera to face)
-                    view_dir = np.array([0, 0, 1])
-
-                    # Determine face visibility
-                    dot_product = np.dot(normal, view_dir)
-                    is_front_face = dot_product < 0
-
-                    # Always render the face if backface culling is disabled
-                    if not self.enable_backface_culling or is_front_face:
-                        # Calculate lighting intensity
-                        light_dir = np.array([0.5, -0.7, 1.0])  # Light from top-right-front
-                        light_dir = light_dir / np.linalg.norm(light_dir)
-
-                        # Use absolute dot product to ensure all faces are lit
-                        intensity = abs(np.dot(normal, light_dir))
-                        intensity = max(0.3, min(1.0, intensity))  # Higher ambient light
-
-                        # Apply lighting to color
-                        color = tuple(int(c * intensity) for c in base_color)
+        if self.render_backend == "zbuffer":
+            self._rasterize_mesh(mesh, vertices, screen, depth, base_color, outline_color, outline_width)
+            return
 
-                        # Store face data for sorting
-                        face_points = [projected[i] for i in face]
-                        all_faces.append((face_points, color, z_depth, is_front_face))
+        projected = screen.tolist()
 
-            # Sort faces by depth (furthest first)
-            all_faces.sort(key=lambda f: f[2], reverse=True)
+        # Calculate face properties and determine visibility
+        if hasattr(mesh, 'faces') and len(mesh.faces) > 0:
+            # Cull, shade and depth sort every face in one batched pass
+            order, colors = self._shade_faces(mesh, vertices, base_color)
+            faces = mesh.faces
+            colors = colors[order].tolist()
+
+            # Gather the screen points of the visible faces, furthest first
+            if faces.arity is not None:
+                all_points = screen[faces.array[order]].tolist()
+            else:
+                corner_points = screen[faces.indices].tolist()
+                bounds = faces.offsets.tolist()
+                all_points = [corner_points[bounds[i]:bounds[i + 1]] for i in order.tolist()]
 
             # Draw faces
-            for face_points, color, _, _ in all_faces:
+            for face_points, color in zip(all_points, colors):
                 if not self.wireframe_mode:
                     pygame.draw.polygon(surface, color, face_points)
                 # Always draw edges for better visibility
@@ -273,6 +291,124 @@ class DesktopRenderer:
             for point in projected:
                 pygame.draw.circle(surface, vertex_color, point, vertex_size)
 
+            # Selected vertices on top, in their own color
+            for point in screen[mesh.vertex_selection].tolist():
+                pygame.draw.circle(surface, self.selected_vertex_color, point, vertex_size + 1)
+
+    def _begin_zbuffer(self, surface):
+        """Prepare the rasterizer buffers for a new frame"""
+        width, height = surface.get_size()
+        if self.rasterizer is None:
+            self.rasterizer = ZBufferRasterizer(width, height)
+        elif (self.rasterizer.width, self.rasterizer.height) != (width, height):
+            self.rasterizer.resize(width, height)
+
+        # Start from what is already drawn (background and grid)
+        self.rasterizer.clear(pygame.surfarray.pixels3d(surface))
+
+    def _rasterize_mesh(self, mesh, vertices, screen, depth, base_color, outline_color, outline_width):
+        """Render a mesh into the z-buffer rasterizer"""
+        faces = mesh.faces
+        inv_depth = 1.0 / depth
+
+        if len(faces) > 0:
+            visible, colors = self._shade_faces(mesh, vertices, base_color, sort=False)
+            face_mask = np.zeros(len(faces), dtype=bool)
+            face_mask[visible] = True
+
+            if not self.wireframe_mode:
+                triangles, tri_faces = faces.triangulate()
+                keep = face_mask[tri_faces]
+                triangles, tri_faces = triangles[keep], tri_faces[keep]
+                self.rasterizer.draw_triangles(
+                    screen[triangles], inv_depth[triangles], colors[tri_faces])
+
+            # Outline every visible face, like the polygon backend
+            corner_mask = face_mask[faces.corner_faces]
+            starts = faces.indices[corner_mask]
+            ends = faces.indices[faces.next_corners][corner_mask]
+            self.rasterizer.draw_lines(screen[starts], screen[ends], inv_depth[starts], inv_depth[ends],
+                                       outline_color, outline_width)
+
+        elif len(mesh.edges) > 0:
+            edges = mesh.edges.array
+            edges = edges[(edges < len(screen)).all(axis=1)]
+            self.rasterizer.draw_lines(screen[edges[:, 0]], screen[edges[:, 1]],
+                                       inv_depth[edges[:, 0]], inv_depth[edges[:, 1]],
+                                       outline_color, outline_width)
+
+        if self.show_vertices:
+            vertex_color = (255, 100, 0) if mesh.selected else (255, 0, 0)
+            self.rasterizer.draw_points(screen, inv_depth, vertex_color, 3 if mesh.selected else 2)
+            selection = mesh.vertex_selection
+            if selection.any():
+                self.rasterizer.draw_points(screen[selection], inv_depth[selection],
+                                            self.selected_vertex_color, 4 if mesh.selected else 3)
+
+    def _shade_faces(self, mesh, vertices, base_color, sort=True):
+        """Cull, light and depth sort all faces of a mesh at once
+
+        Takes the view space vertices of the mesh. Returns the indices of
+        the faces to draw, ordered furthest first (or in face order when
+        ``sort`` is False), and an (F, 3) int array of lit colors for every
+        face.
+        """
+        faces = mesh.faces
+        normals = self._view_face_normals(mesh)
+
+        # Need at least 3 points for a face
+        visible = faces.sizes >= 3
+        if self.enable_backface_culling:
+            visible &= self._front_facing(mesh, vertices, normals)
+
+        # Light from top-right-front, using the absolute dot product so all
+        # faces are lit, with a higher ambient floor
+        light_dir = np.array([0.5, -0.7, 1.0])
+        light_dir /= np.linalg.norm(light_dir)
+        intensity = np.clip(np.abs(normals @ light_dir), 0.3, 1.0)
+        colors = (intensity[:, None] * np.asarray(base_color, dtype=float)).astype(int)
+
+        if not sort:
+            return np.flatnonzero(visible), colors
+
+        # Face centers for depth sorting
+        corner_depths = vertices[faces.indices, 2]
+        if faces.arity is not None:
+            depths = corner_depths.reshape(len(faces), faces.arity).mean(axis=1)
+        else:
+            depths = np.add.reduceat(corner_depths, faces.offsets[:-1]) / faces.sizes
+
+        # Sort by depth, furthest first; stable so ties keep face order
+        order = np.argsort(-depths, kind="stable")
+        order = order[visible[order]]
+        return order, colors
+
+    def _view_face_normals(self, mesh):
+        """Unit face normals of a mesh in view space, as an (F, 3) array"""
+        # Bring the cached model space normals into view space. Normals
+        # transform with the inverse transpose; the determinant sign keeps
+        # the winding-based orientation under mirroring scales
+        linear = np.asarray(self.rotation_matrix, dtype=float) @ self._get_model_matrix(mesh)[0:3, 0:3]
+        normal_matrix = np.linalg.pinv(linear).T * np.sign(np.linalg.det(linear) or 1.0)
+        normals = mesh.face_normals @ normal_matrix.T
+        lengths = np.linalg.norm(normals, axis=1)
+        normals /= np.where(lengths > 0, lengths, 1.0)[:, None]
+        return normals
+
+    def _front_facing(self, mesh, vertices, normals=None):
+        """Mask of the faces whose front side the camera sees
+
+        Takes the view space vertices of the mesh. A face is front facing
+        when its normal points against the ray from the eye at (0, 0, -5)
+        to its first corner, so faces off to the side are judged with the
+        same perspective they are drawn with.
+        """
+        if normals is None:
+            normals = self._view_face_normals(mesh)
+        faces = mesh.faces
+        to_face = vertices[faces.indices[faces.offsets[:-1]]] - np.array([0.0, 0.0, -5.0])
+        return np.einsum("ij,ij->i", normals, to_face) < 0
+
     def _draw_transformation_gizmos(self, surface):
         """Draw 3D transformation gizmos for the selected object"""
         if not self.scene.selected_objects:
@@ -540,6 +676,8 @@ class DesktopRenderer:
             self.orbit_angle_horizontal = -np.pi / 4  # -45 degrees
             self.orbit_angle_vertical = np.arctan(1 / np.sqrt(2))  # ~35.264 degrees
 
+        self.mark_dirty()
+
         print(f"View changed to: {view_type}")
 
     def orbit_camera(self, delta_h, delta_v):
@@ -553,105 +691,389 @@ class DesktopRenderer:
 
     def _rotate_vertices(self, vertices):
         """Apply rotation to vertices using rotation matrix"""
-        # Apply the stored rotation matrix to each vertex
-        for i in range(len(vertices)):
-            vertices[i] = np.dot(self.rotation_matrix, vertices[i])
+        # Row vectors, so v' = R v becomes V' = V R^T for the whole array
+        vertices[:] = vertices @ np.asarray(self.rotation_matrix, dtype=float).T
+
+    def _get_model_matrix(self, obj):
+        """Get the 4x4 model matrix used to place an object in the world"""
+        # World matrices (parents, rotation and all) come precomputed from
+        # the scene graph; objects outside the scene use their own cache
+        if obj._scene_graph is self.scene.graph:
+            return self.scene.graph.get_world_matrix(obj)
+        return obj.get_world_matrix()
+
+    def screen_to_ray(self, pos, obj=None):
+        """Unproject a screen position into a ray
+
+        Returns (origin, direction) in world space, or in the model space of
+        ``obj`` if given. Every point ``origin + t * direction`` projects to
+        ``pos``, and ``t`` is the view depth used by _project_vertices, so
+        distances along rays compare across objects.
+        """
+        focal = 200 * self.scale
+        origin = np.array([0.0, 0.0, -5.0])  # The eye: depth 0
+        direction = np.array([(pos[0] - self.translate[0]) / focal,
+                              (pos[1] - self.translate[1]) / focal, 1.0])
+
+        linear = np.asarray(self.rotation_matrix, dtype=float)
+        offset = np.zeros(3)
+        if obj is not None:
+            model_matrix = self._get_model_matrix(obj)
+            offset = linear @ model_matrix[0:3, 3]
+            linear = linear @ model_matrix[0:3, 0:3]
+        inverse = np.linalg.inv(linear)
+        return inverse @ (origin - offset), inverse @ direction
+
+    def pick(self, pos, meshes=None):
+        """Find the nearest mesh surface under a screen position
+
+        Casts the ray through ``pos`` against the BVH of every mesh (or of
+        ``meshes``). Returns (mesh, face index, depth) or None.
+        """
+        self.scene.graph.update()
+        if meshes is None:
+            meshes = self.scene.graph.drawable
+
+        best = None
+        for mesh in meshes:
+            if len(mesh.vertices) == 0 or len(mesh.faces) == 0:
+                continue
+            origin, direction = self.screen_to_ray(pos, mesh)
+            bvh = mesh.get_bvh()
+            # Only surfaces past the near clamp of the projection count
+            depth, triangle = bvh.intersect(origin, direction, t_min=0.1)
+            if triangle[0] >= 0 and (best is None or depth[0] < best[2]):
+                best = (mesh, int(bvh.triangle_faces[triangle[0]]), float(depth[0]))
+        return best
+
+    def get_projection(self, mesh):
+        """View space vertices, screen positions and depths of a mesh
+
+        Returns the (N, 3), (N, 2) and (N,) arrays used to draw the mesh.
+        They are cached per mesh, keyed by the view, the mesh's world matrix
+        and its vertex version, so picking reads exactly what was drawn.
+        The arrays are shared; do not modify them.
+        """
+        key = (self._view_key(), mesh.vertex_version, self._get_model_matrix(mesh).tobytes())
+        cached = self._projections.get(mesh)
+        if cached is not None and cached["key"] == key:
+            return cached["vertices"], cached["screen"], cached["depth"]
+
+        vertices = self._transform_vertices(mesh)
+        screen, depth = self._project_vertices(vertices)
+        self._projections[mesh] = {"key": key, "vertices": vertices, "screen": screen, "depth": depth}
+        return vertices, screen, depth
+
+    def pick_vertex(self, mesh, pos, radius):
+        """Index of the vertex drawn nearest to a screen position
+
+        Only vertices within ``radius`` pixels count; ties go to the one in
+        front. Returns -1 if there is none. Large meshes are searched
+        through a ScreenGrid built once per projection.
+        """
+        _, screen, depth = self.get_projection(mesh)
+        if len(screen) >= GRID_PICK_THRESHOLD:
+            cached = self._projections[mesh]
+            grid = cached.get("grid")
+            if grid is None or grid.cell_size != max(float(radius), 1.0):
+                grid = cached["grid"] = ScreenGrid(screen, radius)
+            candidates = grid.query(pos, radius)
+        else:
+            candidates = np.arange(len(screen))
+
+        offsets = screen[candidates] - np.asarray(pos)
+        distances = np.einsum("ij,ij->i", offsets, offsets)
+        within = distances <= radius * radius
+        if not np.any(within):
+            return -1
+        candidates, distances = candidates[within], distances[within]
+        best = np.lexsort((depth[candidates], distances))[0]
+        return int(candidates[best])
+
+    def get_depth_buffer(self):
+        """Inverse depth of the nearest surface at every pixel, indexed [x, y]
+
+        This is the depth of the face id buffer (0 where nothing is drawn),
+        so it is kept until the view, the window size or any mesh changes.
+        """
+        return self._get_id_pass("face")["rasterizer"].depth
+
+    def get_id_buffer(self, kind):
+        """Index of the face or edge drawn at every pixel, indexed [x, y]
+
+        ``kind`` is "face" or "edge". Returns (ids, meshes, offsets): ids is
+        an int32 image of scene-wide element ids (-1 where there is none),
+        and the elements of ``meshes[k]`` have ids ``offsets[k]`` up to
+        ``offsets[k + 1]``. Edges index Mesh.get_edges(), which falls back to
+        the edges of the faces. Back faces are left out only with backface
+        culling, and edges are drawn only where no surface hides them.
+        """
+        id_pass = self._get_id_pass(kind)
+        return id_pass["ids"], id_pass["meshes"], id_pass["offsets"]
+
+    def pick_id(self, pos, kind, radius=0):
+        """Mesh and index of the face or edge drawn at a screen position
+
+        With a ``radius``, the nearest element within that many pixels is
+        taken, which makes one pixel wide edges easier to hit. Returns
+        (mesh, index) or None.
+        """
+        ids, meshes, offsets = self.get_id_buffer(kind)
+        x, y = int(pos[0]), int(pos[1])
+        left, top = max(x - radius, 0), max(y - radius, 0)
+        window = ids[left:x + radius + 1, top:y + radius + 1]
+        hits = np.argwhere(window >= 0)
+        if len(hits) == 0:
+            return None
 
-    def _draw_floor_grid(self, surface):
-        """Draw a 3D floor grid on the XZ plane (y=0)"""
+        # Nearest covered pixel of the window, within the radius
+        offsets_xy = hits + (left - x, top - y)
+        distances = np.einsum("ij,ij->i", offsets_xy, offsets_xy)
+        nearest = int(np.argmin(distances))
+        if distances[nearest] > radius * radius:
+            return None
+        element = int(window[hits[nearest, 0], hits[nearest, 1]])
+        k = int(np.searchsorted(offsets, element, side="right")) - 1
+        return meshes[k], element - int(offsets[k])
+
+    def region_ids(self, mesh, kind, corner, opposite):
+        """Sorted indices of the faces or edges of a mesh visible in a box
+
+        One np.unique over the id buffer slice covered by the rectangle, so
+        only elements with at least one visible pixel are found.
+        """
+        ids, meshes, offsets = self.get_id_buffer(kind)
+        (x0, y0), (x1, y1) = corner, opposite
+        box = ids[max(min(x0, x1), 0):max(x0, x1) + 1, max(min(y0, y1), 0):max(y0, y1) + 1]
+        found = np.unique(box)
+        if mesh not in meshes:
+            return np.zeros(0, dtype=np.int64)
+        k = meshes.index(mesh)
+        low, high = np.searchsorted(found, offsets[k:k + 2])
+        return found[low:high].astype(np.int64) - offsets[k]
+
+    def _get_id_pass(self, kind):
+        """Rasterize every mesh's faces or edges with their ids as colors
+
+        The pass is redone only when the window size, the view or a mesh
+        (its vertices, topology or world matrix) changed since the last one.
+        """
+        surface = pygame.display.get_surface()
+        width, height = surface.get_size() if surface is not None else (self.width, self.height)
+        self.scene.graph.update()
+        meshes = [mesh for mesh in self.scene.graph.drawable if len(mesh.vertices)]
+        key = (width, height, self._view_key(), self.enable_backface_culling,
+               tuple((id(mesh), mesh.vertex_version, mesh.topology_version,
+                      self._get_model_matrix(mesh).tobytes()) for mesh in meshes))
+        id_pass = self._id_buffers.get(kind)
+        if id_pass is not None and id_pass["key"] == key:
+            return id_pass
+
+        counts = [len(mesh.faces) if kind == "face" else len(mesh.get_edges()) for mesh in meshes]
+        offsets = np.zeros(len(meshes) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        if offsets[-1] > MAX_ID_BUFFER_ELEMENTS:
+            raise ValueError(f"Too many {kind}s for an id buffer: {offsets[-1]}")
+
+        rasterizer = id_pass["rasterizer"] if id_pass is not None else ZBufferRasterizer(width, height)
+        if (rasterizer.width, rasterizer.height) != (width, height):
+            rasterizer.resize(width, height)
+        rasterizer.clear()
+
+        # Back faces are only left out when the render culls them too.
+        # Otherwise they are pushed slightly away, so where a back face
+        # meets a front face at the silhouette (same depth) the front face
+        # wins. In the edge pass the faces are background that hides the
+        # edges behind them; edges of back faces only are pushed the same
+        # way, with less line bias, so they beat their own face but not a
+        # front face at the silhouette
+        front = {}
+        for mesh, offset in zip(meshes, offsets.tolist()):
+            vertices, screen, depth = self.get_projection(mesh)
+            if len(mesh.faces) == 0:
+                continue
+            front[mesh] = self._front_facing(mesh, vertices)
+            triangles, tri_faces = mesh.faces.triangulate()
+            if self.enable_backface_culling:
+                keep = front[mesh][tri_faces]
+                triangles, tri_faces = triangles[keep], tri_faces[keep]
+            push = np.where(front[mesh][tri_faces], 1.0, 1.0 - BACK_FACE_DEPTH_BIAS)
+            colors = (_encode_ids(tri_faces + offset) if kind == "face"
+                      else np.zeros((len(triangles), 3), dtype=np.uint8))
+            rasterizer.draw_triangles(screen[triangles], (1.0 / depth)[triangles] * push[:, None], colors)
+        if kind == "edge":
+            for mesh, offset in zip(meshes, offsets.tolist()):
+                edges = mesh.get_edges()
+                if len(edges) == 0:
+                    continue
+                _, screen, depth = self.get_projection(mesh)
+                inv_depth = 1.0 / depth
+                facing = np.ones(len(edges), dtype=bool)
+                if mesh in front:
+                    edge_faces = mesh.get_edge_faces()
+                    bordered = edge_faces >= 0
+                    facing = ~bordered.any(axis=1) | (bordered & front[mesh][np.maximum(edge_faces, 0)]).any(axis=1)
+
+                groups = [(facing, 1.0, 0.01)]
+                if not self.enable_backface_culling:
+                    groups.append((~facing, 1.0 - BACK_FACE_DEPTH_BIAS, BACK_FACE_DEPTH_BIAS / 2))
+                for mask, push, bias in groups:
+                    indices = np.flatnonzero(mask)
+                    starts, ends = edges[indices, 0], edges[indices, 1]
+                    rasterizer.draw_lines(screen[starts], screen[ends],
+                                          inv_depth[starts] * push, inv_depth[ends] * push,
+                                          _encode_ids(indices + offset), bias=bias)
+
+        id_pass = {"key": key, "rasterizer": rasterizer, "ids": _decode_ids(rasterizer.color),
+                   "meshes": meshes, "offsets": offsets}
+        self._id_buffers[kind] = id_pass
+        return id_pass
+
+    def region_vertices(self, mesh, shape, data, through=False, bias=0.01):
+        """Mask of a mesh's vertices drawn inside a screen region
+
+        ``shape`` and ``data`` describe the region as in selection_overlay.
+        Unless ``through`` is set, vertices hidden behind a surface (by more
+        than ``bias`` of their depth) are left out, using get_depth_buffer.
+        """
+        _, screen, depth = self.get_projection(mesh)
+        if shape == "box":
+            inside = points_in_rect(screen, *data)
+        elif shape == "lasso":
+            inside = points_in_polygon(screen, data)
+        elif shape == "circle":
+            inside = points_in_circle(screen, *data)
+        else:
+            raise ValueError(f"Unknown selection region: {shape}")
+
+        if through or not inside.any():
+            return inside
+
+        buffer = self.get_depth_buffer()
+        candidates = np.flatnonzero(inside)
+        px, py = screen[candidates, 0], screen[candidates, 1]
+        on_screen = (px >= 0) & (px < buffer.shape[0]) & (py >= 0) & (py < buffer.shape[1])
+        visible = np.zeros(len(candidates), dtype=bool)
+        nearest = buffer[px[on_screen], py[on_screen]]
+        visible[on_screen] = (1.0 / depth[candidates[on_screen]]) * (1.0 + bias) >= nearest
+        inside[candidates] = visible
+        return inside
+
+    def _transform_vertices(self, mesh):
+        """Transform mesh vertices to view space as an (N, 3) array"""
+        vertices = np.asarray(mesh.vertices, dtype=float).reshape(-1, 3)
+
+        # Fold the model matrix and the view rotation into a single affine
+        # transform so the whole array is processed with one matmul
+        model_matrix = self._get_model_matrix(mesh)
+        rotation = np.asarray(self.rotation_matrix, dtype=float)
+        linear = rotation @ model_matrix[0:3, 0:3]
+        offset = rotation @ model_matrix[0:3, 3]
+
+        return vertices @ linear.T + offset
+
+    def _project_vertices(self, vertices):
+        """Project view space vertices to the screen
+
+        Returns an (N, 2) int32 array of screen coordinates and the (N,)
+        array of clamped depths used for the perspective divide.
+        """
+        # Simple perspective projection, matching the single point path
+        depth = np.maximum(vertices[:, 2] + 5, 0.1)
+        factor = (200 * self.scale) / depth
+
+        screen = np.empty((len(vertices), 2), dtype=np.int32)
+        # Truncate towards zero like int() did in the per-vertex loop,
+        # clipped first so points near the depth clamp cannot wrap around
+        screen[:, 0] = np.clip(vertices[:, 0] * factor + self.translate[0], -SCREEN_LIMIT, SCREEN_LIMIT)
+        screen[:, 1] = np.clip(vertices[:, 1] * factor + self.translate[1], -SCREEN_LIMIT, SCREEN_LIMIT)
+        return screen, depth
+
+    def _view_key(self):
+        """Hashable snapshot of the view state used to key cached projections"""
+        return (np.asarray(self.rotation_matrix, dtype=float).tobytes(), float(self.scale),
+                tuple(self.translate))
+
+    def _build_floor_grid(self):
+        """Build the floor grid geometry on the XZ plane (y=0)"""
         # Grid settings
         grid_size = 10  # Grid extends from -grid_size to +grid_size
         grid_spacing = 1.0  # Space between grid lines
 
-        # Create grid lines
-        grid_lines = []
-
-        # X-axis grid lines (parallel to X-axis)
-        for i in range(-grid_size, grid_size + 1):
-            # Line from (-grid_size, 0, i) to (grid_size, 0, i)
-            z = i * grid_spacing
-            start = np.array([-grid_size * grid_spacing, 0, z])
-            end = np.array([grid_size * grid_spacing, 0, z])
-            grid_lines.append((start, end))
-
-        # Z-axis grid lines (parallel to Z-axis)
-        for i in range(-grid_size, grid_size + 1):
-            # Line from (i, 0, -grid_size) to (i, 0, grid_size)
-            x = i * grid_spacing
-            start = np.array([x, 0, -grid_size * grid_spacing])
-            end = np.array([x, 0, grid_size * grid_spacing])
-            grid_lines.append((start, end))
-
-        # Transform and project grid lines
-        for start, end in grid_lines:
-            # Apply rotation
-            start_rotated = np.dot(self.rotation_matrix, start)
-            end_rotated = np.dot(self.rotation_matrix, end)
-
-            # Check if the line is in front of the camera
-            start_z = start_rotated[2] + 5
-            end_z = end_rotated[2] + 5
-
-            # Skip lines that are behind or too close to the camera
-            if start_z <= 0.1 and end_z <= 0.1:
-                continue
-
-            # Handle case where part of line crosses the camera plane
-            if start_z <= 0.1:
-                # Move the start point to be slightly in front of camera
-                t = (0.1 - start_z) / (end_z - start_z)
-                start_rotated = start_rotated + t * (end_rotated - start_rotated)
-                start_z = 0.1
-
-            if end_z <= 0.1:
-                # Move the end point to be slightly in front of camera
-                t = (0.1 - end_z) / (start_z - end_z)
-                end_rotated = end_rotated + t * (start_rotated - end_rotated)
-                end_z = 0.1
-
-            # Project to 2D
-            factor_start = 200 / start_z
-            factor_end = 200 / end_z
-
-            start_2d = (
-                int(start_rotated[0] * self.scale * factor_start + self.translate[0]),
-                int(start_rotated[1] * self.scale * factor_start + self.translate[1])
-            )
-
-            end_2d = (
-                int(end_rotated[0] * self.scale * factor_end + self.translate[0]),
-                int(end_rotated[1] * self.scale * factor_end + self.translate[1])
-            )
-
-            # Determine grid line color - highlight main axes
-            if (abs(start[0]) < 0.01 or abs(start[2]) < 0.01):
-                # Main axes (X and Z) get brighter colors
-                if abs(start[0]) < 0.01:  # Z-axis (blue)
-                    color = (50, 50, 180)
-                else:  # X-axis (red)
-                    color = (180, 50, 50)
-                line_width = 2
-            else:
-                # Regular grid lines
-                color = (80, 80, 80)
-                line_width = 1
+        offsets = np.arange(-grid_size, grid_size + 1) * grid_spacing
+        extent = grid_size * grid_spacing
+        count = len(offsets)
+
+        # (L, 2, 3) line endpoints: lines parallel to the X-axis first,
+        # then lines parallel to the Z-axis
+        lines = np.zeros((2 * count, 2, 3))
+        lines[:count, 0, 0] = -extent
+        lines[:count, 1, 0] = extent
+        lines[:count, :, 2] = offsets[:, None]
+        lines[count:, :, 0] = offsets[:, None]
+        lines[count:, 0, 2] = -extent
+        lines[count:, 1, 2] = extent
+
+        # Main axes get brighter colors: the line at x=0 is the Z-axis
+        # (blue), the line at z=0 is the X-axis (red)
+        styles = [((80, 80, 80), 1)] * (2 * count)
+        styles[int(np.argmin(np.abs(offsets)))] = ((180, 50, 50), 2)
+        styles[count + int(np.argmin(np.abs(offsets)))] = ((50, 50, 180), 2)
+
+        self._grid_lines = lines
+        self._grid_styles = styles
+        self._grid_cache = None
+
+    def _project_floor_grid(self):
+        """Project the floor grid, reusing the last result if the view is unchanged
+
+        Returns a list of (start_2d, end_2d, color, width) segments and the
+        screen position of the origin.
+        """
+        key = self._view_key()
+        if self._grid_cache is not None and self._grid_cache[0] == key:
+            return self._grid_cache[1]
+
+        near = 0.1
+        rotated = self._grid_lines @ np.asarray(self.rotation_matrix, dtype=float).T
+        start, end = rotated[:, 0], rotated[:, 1]
+        start_z = start[:, 2] + 5
+        end_z = end[:, 2] + 5
+
+        # Skip lines that are entirely behind or too close to the camera
+        keep = (start_z > near) | (end_z > near)
+
+        # Move endpoints behind the near plane onto it
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t_start = np.where(keep & (start_z <= near), (near - start_z) / (end_z - start_z), 0.0)
+            t_end = np.where(keep & (end_z <= near), (near - end_z) / (start_z - end_z), 0.0)
+        clipped_start = start + t_start[:, None] * (end - start)
+        clipped_end = end + t_end[:, None] * (start - end)
+        clipped_start[:, 2] = np.maximum(start_z, near) - 5
+        clipped_end[:, 2] = np.maximum(end_z, near) - 5
+
+        start_2d, _ = self._project_vertices(clipped_start)
+        end_2d, _ = self._project_vertices(clipped_end)
+        segments = [(tuple(s), tuple(e), color, width)
+                    for s, e, (color, width), visible
+                    in zip(start_2d.tolist(), end_2d.tolist(), self._grid_styles, keep.tolist())
+                    if visible]
+
+        # Center point; rotation leaves the origin in place, in front of the camera
+        origin_2d, _ = self._project_vertices(np.zeros((1, 3)))
+        origin = tuple(origin_2d[0].tolist())
+
+        self._grid_cache = (key, (segments, origin))
+        return segments, origin
 
-            # Draw the line
+    def _draw_floor_grid(self, surface):
+        """Draw a 3D floor grid on the XZ plane (y=0)"""
+        segments, origin = self._project_floor_grid()
+        for start_2d, end_2d, color, line_width in segments:
             pygame.draw.line(surface, color, start_2d, end_2d, line_width)
 
         # Draw center point
-        origin_3d = np.array([0, 0, 0])
-        origin_rotated = np.dot(self.rotation_matrix, origin_3d)
-
-        # Check if origin is in front of camera
-        origin_z = origin_rotated[2] + 5
-        if origin_z > 0.1:
-            factor_origin = 200 / origin_z
-            origin_2d = (
-                int(origin_rotated[0] * self.scale * factor_origin + self.translate[0]),
-                int(origin_rotated[1] * self.scale * factor_origin + self.translate[1])
-            )
-            pygame.draw.circle(surface, (255, 255, 0), origin_2d, 4)
+        pygame.draw.circle(surface, (255, 255, 0), origin, 4)
 
     def get_axis_at_screen_pos(self, mouse_pos):
         """Get the axis (if any) at the given screen position"""
@@ -733,4 +1155,16 @@ class DesktopRenderer:
         elif min_dist == y_dist:
             return "y"
         else:
-            return "z"
\ No newline at end of file
+            return "z"
+
+
+def _encode_ids(ids):
+    """RGB colors for element ids (id + 1, so black means no element)"""
+    values = np.asarray(ids, dtype=np.int64) + 1
+    return (np.stack([values >> 16, values >> 8, values], axis=-1) & 0xFF).astype(np.uint8)
+
+
+def _decode_ids(color):
+    """Element ids from an RGB buffer written with _encode_ids, -1 for none"""
+    color = color.astype(np.int32)
+    return ((color[..., 0] << 16) | (color[..., 1] << 8) | color[..., 2]) - 1
@@ -83,13 +83,18 @@ class DesktopUIManager:
         pass
 
     def update(self, dt):
-        """Update UI state"""
+        """Update UI state and return the rects of buttons that changed"""
         # Check mouse hover
         mouse_pos = pygame.mouse.get_pos()
 
         # Update button hover state
+        changed = []
         for button in self.buttons:
-            button['hover'] = button['rect'].collidepoint(mouse_pos)
+            hover = bool(button['rect'].collidepoint(mouse_pos))
+            if hover != button.get('hover', False):
+                changed.append(button['rect'])
+            button['hover'] = hover
+        return changed
 
     def get_transform_values(self):
         """Get the current transformation values"""
@@ -0,0 +1,45 @@
+import numpy as np
+
+
+class ScreenGrid:
+    """Spatial hash of 2D screen points for radius queries
+
+    Points are bucketed into square cells and sorted by cell key, so a query
+    only looks at the few cells overlapping the search square, each found
+    with a binary search. Building costs one sort; it pays off once several
+    queries run against the same projection (hovering, brush painting) or
+    the point count is in the millions.
+    """
+
+    def __init__(self, points, cell_size):
+        points = np.asarray(points)
+        self.cell_size = max(float(cell_size), 1.0)
+        self.points = points
+        cells = np.floor(points / self.cell_size).astype(np.int64)
+        self.origin = cells.min(axis=0) if len(cells) else np.zeros(2, dtype=np.int64)
+        cells -= self.origin
+        self.rows = int(cells[:, 1].max()) + 1 if len(cells) else 1
+
+        keys = cells[:, 0] * self.rows + cells[:, 1]
+        self.order = np.argsort(keys, kind="stable")
+        self.keys = keys[self.order]
+
+    def query(self, pos, radius):
+        """Indices of the points within ``radius`` of ``pos``"""
+        low = np.floor((np.asarray(pos, dtype=float) - radius) / self.cell_size).astype(np.int64) - self.origin
+        high = np.floor((np.asarray(pos, dtype=float) + radius) / self.cell_size).astype(np.int64) - self.origin
+        low = np.maximum(low, 0)
+        high[1] = min(high[1], self.rows - 1)
+        if np.any(high < low):
+            return np.zeros(0, dtype=np.int64)
+
+        # Cells of one column are consecutive keys, so each column of the
+        # search square is a single key range
+        columns = np.arange(low[0], high[0] + 1)
+        starts = np.searchsorted(self.keys, columns * self.rows + low[1], side="left")
+        stops = np.searchsorted(self.keys, columns * self.rows + high[1], side="right")
+        candidates = np.concatenate([self.order[a:b] for a, b in zip(starts.tolist(), stops.tolist())])
+
+        offsets = self.points[candidates] - np.asarray(pos, dtype=float)
+        within = np.einsum("ij,ij->i", offsets, offsets) <= radius * radius
+        return candidates[within]
@@ -0,0 +1,263 @@
+import numpy as np
+
+
+class ZBufferRasterizer:
+    """Software rasterizer that draws into NumPy color and depth buffers
+
+    Buffers are indexed ``[x, y]`` so the color buffer can be handed straight
+    to ``pygame.surfarray.blit_array``. Depth is stored as inverse view depth
+    (1 / z), which interpolates linearly in screen space; 0 means empty and
+    larger values are nearer.
+
+    Small triangles are expanded to the pixels of their bounding box and
+    resolved in bulk. Large triangles are bucketed by screen tile and every
+    tile is filled with one broadcast edge-function evaluation, so there is
+    no per-triangle Python work in either path.
+    """
+
+    def __init__(self, width, height, tile_size=64, small_triangle_area=256, chunk_size=1 << 20):
+        self.tile_size = tile_size
+        self.small_triangle_area = small_triangle_area  # Bounding box pixels
+        self.chunk_size = chunk_size  # Pixel/triangle samples per batch
+        self.color = None
+        self.depth = None
+        self.resize(width, height)
+
+    @property
+    def width(self):
+        return self.depth.shape[0]
+
+    @property
+    def height(self):
+        return self.depth.shape[1]
+
+    def resize(self, width, height):
+        """Reallocate the buffers for a new viewport size"""
+        self.color = np.zeros((width, height, 3), dtype=np.uint8)
+        self.depth = np.zeros((width, height), dtype=np.float32)
+
+    def clear(self, background=None):
+        """Reset depth and fill the color buffer
+
+        ``background`` may be an RGB tuple or a (width, height, 3) array such
+        as ``pygame.surfarray.array3d(surface)``.
+        """
+        self.depth.fill(0)
+        if background is None:
+            self.color.fill(0)
+        else:
+            self.color[:] = background
+
+    # ------------------------------------------------------------------
+    # Triangles
+    # ------------------------------------------------------------------
+    def draw_triangles(self, points, inv_depths, colors):
+        """Rasterize triangles with depth testing
+
+        ``points`` is (T, 3, 2) screen coordinates, ``inv_depths`` is (T, 3)
+        inverse view depth per corner and ``colors`` is (T, 3) RGB.
+        """
+        points = np.asarray(points, dtype=float)
+        inv_depths = np.asarray(inv_depths, dtype=float)
+        colors = np.asarray(colors, dtype=np.uint8)
+        if len(points) == 0:
+            return
+
+        xs = points[:, :, 0]
+        ys = points[:, :, 1]
+        x0, x1, x2 = xs[:, 0], xs[:, 1], xs[:, 2]
+        y0, y1, y2 = ys[:, 0], ys[:, 1], ys[:, 2]
+        area = (x1 - x0) * (y2 - y0) - (y1 - y0) * (x2 - x0)
+
+        # Screen-clipped integer bounding boxes
+        xmin = np.maximum(np.floor(xs.min(axis=1)), 0).astype(np.int64)
+        xmax = np.minimum(np.ceil(xs.max(axis=1)), self.width - 1).astype(np.int64)
+        ymin = np.maximum(np.floor(ys.min(axis=1)), 0).astype(np.int64)
+        ymax = np.minimum(np.ceil(ys.max(axis=1)), self.height - 1).astype(np.int64)
+
+        keep = (area != 0) & (xmin <= xmax) & (ymin <= ymax)
+        if not np.any(keep):
+            return
+        keep = np.flatnonzero(keep)
+
+        # Barycentric coordinates and inverse depth are affine in screen
+        # space: value = a * px + b * py + c, one (a, b, c) per triangle
+        inv_area = 1.0 / area[keep]
+        corners = [(x0[keep], y0[keep]), (x1[keep], y1[keep]), (x2[keep], y2[keep])]
+        planes = np.empty((len(keep), 4, 3))
+        for i in range(3):
+            ax, ay = corners[(i + 1) % 3]
+            bx, by = corners[(i + 2) % 3]
+            planes[:, i, 0] = -(by - ay) * inv_area
+            planes[:, i, 1] = (bx - ax) * inv_area
+            planes[:, i, 2] = ((by - ay) * ax - (bx - ax) * ay) * inv_area
+        planes[:, 3] = np.einsum("tij,ti->tj", planes[:, 0:3], inv_depths[keep])
+
+        tri_colors = colors[keep]
+        xmin, xmax, ymin, ymax = xmin[keep], xmax[keep], ymin[keep], ymax[keep]
+        box_width = xmax - xmin + 1
+        box_area = box_width * (ymax - ymin + 1)
+
+        small = box_area <= self.small_triangle_area
+        if np.any(small):
+            self._fill_small(planes[small], tri_colors[small], xmin[small], ymin[small],
+                             box_width[small], box_area[small])
+        if not np.all(small):
+            large = ~small
+            self._fill_tiled(planes[large], tri_colors[large], xmin[large], xmax[large],
+                             ymin[large], ymax[large])
+
+    def _fill_small(self, planes, colors, xmin, ymin, box_width, box_area):
+        """Rasterize triangles by testing every pixel of their bounding box"""
+        starts = np.zeros(len(planes) + 1, dtype=np.int64)
+        np.cumsum(box_area, out=starts[1:])
+
+        # Split the triangle list into batches of at most chunk_size samples
+        bounds = np.searchsorted(starts, np.arange(0, starts[-1], self.chunk_size), side="right") - 1
+        bounds = np.unique(np.append(bounds, len(planes)))
+
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            tri = np.repeat(np.arange(lo, hi), box_area[lo:hi])
+            local = np.arange(starts[hi] - starts[lo], dtype=np.int64) - (starts[tri] - starts[lo])
+            px = xmin[tri] + local % box_width[tri]
+            py = ymin[tri] + local // box_width[tri]
+
+            inside, inv_depth = _evaluate(planes, tri, px, py)
+            self._resolve(px[inside], py[inside], inv_depth[inside], colors[tri[inside]])
+
+    def _fill_tiled(self, planes, colors, xmin, xmax, ymin, ymax):
+        """Rasterize large triangles tile by tile with broadcast edge tests"""
+        size = self.tile_size
+        tiles_x = (self.width + size - 1) // size
+
+        # Expand every triangle into the tiles its bounding box overlaps
+        tx0, tx1 = xmin // size, xmax // size
+        ty0, ty1 = ymin // size, ymax // size
+        span_x = tx1 - tx0 + 1
+        counts = span_x * (ty1 - ty0 + 1)
+        tri = np.repeat(np.arange(len(planes)), counts)
+        starts = np.repeat(np.cumsum(counts) - counts, counts)
+        local = np.arange(len(tri), dtype=np.int64) - starts
+        tile_ids = (ty0[tri] + local // span_x[tri]) * tiles_x + tx0[tri] + local % span_x[tri]
+
+        # Bucket (tile, triangle) pairs by tile
+        order = np.argsort(tile_ids, kind="stable")
+        tri, tile_ids = tri[order], tile_ids[order]
+        tiles, first = np.unique(tile_ids, return_index=True)
+        last = np.append(first[1:], len(tile_ids))
+
+        for tile, lo, hi in zip(tiles.tolist(), first.tolist(), last.tolist()):
+            left, top = (tile % tiles_x) * size, (tile // tiles_x) * size
+            right, bottom = min(left + size, self.width), min(top + size, self.height)
+            px = np.repeat(np.arange(left, right), bottom - top)
+            py = np.tile(np.arange(top, bottom), right - left)
+
+            # Views of the tile in the buffers; px/py are in the same order
+            tile_depth = self.depth[left:right, top:bottom]
+            tile_color = self.color[left:right, top:bottom]
+
+            step = max(1, self.chunk_size // len(px))
+            for start in range(lo, hi, step):
+                batch = tri[start:min(start + step, hi)]
+                inside, inv_depth = _evaluate(planes, batch[:, None], px[None, :], py[None, :])
+                inv_depth = np.where(inside, inv_depth, 0.0)
+
+                # Nearest triangle per pixel within the batch
+                best = np.argmax(inv_depth, axis=0)
+                best_depth = inv_depth[best, np.arange(len(px))].reshape(tile_depth.shape)
+                best = best.reshape(tile_depth.shape)
+                closer = best_depth > tile_depth
+                tile_depth[closer] = best_depth[closer]
+                tile_color[closer] = colors[batch[best[closer]]]
+
+    def _resolve(self, px, py, inv_depth, colors):
+        """Depth test samples against the buffer and write the nearest ones"""
+        closer = inv_depth > self.depth[px, py]
+        px, py, inv_depth, colors = px[closer], py[closer], inv_depth[closer], colors[closer]
+
+        if len(px) > 0:
+            # Keep only the nearest sample for each pixel
+            flat = px * self.height + py
+            order = np.lexsort((-inv_depth, flat))
+            flat = flat[order]
+            first = np.ones(len(flat), dtype=bool)
+            first[1:] = flat[1:] != flat[:-1]
+            order = order[first]
+            px, py, inv_depth, colors = px[order], py[order], inv_depth[order], colors[order]
+
+        self.depth[px, py] = inv_depth
+        self.color[px, py] = colors
+
+    # ------------------------------------------------------------------
+    # Lines and points
+    # ------------------------------------------------------------------
+    def draw_lines(self, starts, ends, start_depths, end_depths, color, width=1, bias=0.01):
+        """Draw depth-tested line segments
+
+        Lines do not write depth, so they never hide each other. ``bias``
+        lets lines lying on a surface win against that surface. ``color`` is
+        one RGB triple, or an (L, 3) array with a color per line.
+        """
+        starts = np.asarray(starts, dtype=float)
+        ends = np.asarray(ends, dtype=float)
+        color = np.asarray(color, dtype=np.uint8)
+        if len(starts) == 0:
+            return
+
+        delta = ends - starts
+        steps = np.ceil(np.abs(delta).max(axis=1)).astype(np.int64) + 1
+        segment = np.repeat(np.arange(len(starts)), steps)
+        first = np.repeat(np.cumsum(steps) - steps, steps)
+        t = (np.arange(len(segment)) - first) / np.maximum(steps[segment] - 1, 1)
+
+        samples = starts[segment] + t[:, None] * delta[segment]
+        inv_depth = start_depths[segment] + t * (end_depths[segment] - start_depths[segment])
+        if color.ndim == 2:
+            color = color[segment]
+        self._stamp(np.rint(samples).astype(np.int64), inv_depth, color, _square_offsets(width), bias)
+
+    def draw_points(self, points, inv_depths, color, radius=2, bias=0.01):
+        """Draw depth-tested filled discs centered on the given points"""
+        points = np.asarray(points, dtype=np.int64)
+        if len(points) == 0:
+            return
+        self._stamp(points, np.asarray(inv_depths, dtype=float), color, _disc_offsets(radius), bias)
+
+    def _stamp(self, points, inv_depth, color, offsets, bias):
+        """Write ``color`` at every point plus offset that passes the depth test
+
+        ``color`` is one RGB triple or an array with one row per point.
+        """
+        px = (points[:, 0:1] + offsets[:, 0]).ravel()
+        py = (points[:, 1:2] + offsets[:, 1]).ravel()
+        inv_depth = np.repeat(inv_depth, len(offsets))
+
+        on_screen = (px >= 0) & (px < self.width) & (py >= 0) & (py < self.height)
+        px, py, inv_depth = px[on_screen], py[on_screen], inv_depth[on_screen]
+        visible = inv_depth * (1.0 + bias) >= self.depth[px, py]
+        if np.ndim(color) == 2:
+            color = np.repeat(color, len(offsets), axis=0)[on_screen][visible]
+        self.color[px[visible], py[visible]] = color
+
+
+def _evaluate(planes, tri, px, py):
+    """Evaluate barycentric inside test and inverse depth for samples"""
+    inside = None
+    for i in range(3):
+        weight = planes[tri, i, 0] * px + planes[tri, i, 1] * py + planes[tri, i, 2]
+        inside = weight >= -1e-9 if inside is None else inside & (weight >= -1e-9)
+    inv_depth = planes[tri, 3, 0] * px + planes[tri, 3, 1] * py + planes[tri, 3, 2]
+    return inside, inv_depth
+
+
+def _square_offsets(width):
+    """Pixel offsets covering a width x width square"""
+    grid = np.arange(max(1, width))
+    return np.stack(np.meshgrid(grid, grid, indexing="ij"), axis=-1).reshape(-1, 2)
+
+
+def _disc_offsets(radius):
+    """Pixel offsets covering a filled disc"""
+    grid = np.arange(-radius, radius + 1)
+    offsets = np.stack(np.meshgrid(grid, grid, indexing="ij"), axis=-1).reshape(-1, 2)
+    return offsets[(offsets ** 2).sum(axis=1) <= radius * radius]
@@ -76,7 +76,8 @@ class MobileApp:
                     {
                         "name": obj.name,
                         "vertices": obj.vertices.astype(float).tolist(),
-                        "faces": [list(face) for face in obj.faces],
+                        "faces": obj.faces.tolist(),
+                        "normals": obj.vertex_normals.astype(float).tolist(),
                         "transform": {
                             "position": obj.transform.position.astype(float).tolist(),
                             "rotation": obj.transform.rotation.astype(float).tolist(),